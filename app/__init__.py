@@ -1,10 +1,9 @@
 from flask import Flask
-from flask_migrate import Migrate
 from flask_login import LoginManager
 import os
 
 from .extensions import db
-from .models import Admin
+from .config import database_url, engine_options, configure_engine
 
 
 def create_app():
@@ -13,11 +12,14 @@ def create_app():
     # ------------------
     # Config
     # ------------------
-    db_url = os.getenv("DATABASE_URL", "").strip()
-    if db_url.startswith("postgres://"):
-        db_url = db_url.replace("postgres://", "postgresql://", 1)
-
+    db_url = database_url("DATABASE_URL")
     app.config["SQLALCHEMY_DATABASE_URI"] = db_url or "sqlite:///staff_scheduler.db"
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+
+    # optional read replica for GET pages (see app/replica.py)
+    replica_url = database_url("DATABASE_REPLICA_URL")
+    if replica_url:
+        app.config["SQLALCHEMY_BINDS"] = {"replica": {"url": replica_url, **engine_options(replica_url)}}
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-only-change-me")
 
@@ -25,15 +27,43 @@ def create_app():
     # Extensions
     # ------------------
     db.init_app(app)
-    Migrate(app, db)
+    with app.app_context():
+        # SQLite PRAGMAs (WAL, synchronous, busy_timeout, mmap, cache) on each new connection
+        configure_engine(db.engine, app.config["SQLALCHEMY_DATABASE_URI"])
+        if replica_url:
+            configure_engine(db.engines["replica"], replica_url)
+
+    from .startup import defer_migrate
+    defer_migrate(app)  # Flask-Migrate/alembic only for the CLI or on first use
+
+    from .templating import init_templating
+    init_templating(app)  # on-disk template bytecode + {% cache %} fragments
+
+    from .replica import RoutingSession, init_replica
+    from .live import init_live
+    from .main.dashboard import init_dashboard
+    from .profiling import init_profiling
+    from .metrics import init_metrics
+    init_replica(app)  # no-op without DATABASE_REPLICA_URL
+    init_live(app, RoutingSession)  # SSE change feed for open schedule pages
+    init_dashboard(RoutingSession)  # drop cached dashboard counters on assignment/request writes
+    init_profiling(app)  # no-op unless SQL_PROFILING=1
+    with app.app_context():
+        init_metrics(app, db.engines)  # /metrics (METRICS_ENABLED=0 turns it off)
+
+    from .compression import init_compression
+    init_compression(app)  # br/gzip responses (COMPRESSION_ENABLED=0 turns it off)
 
     login_manager = LoginManager()
     login_manager.login_view = "auth.login"
     login_manager.init_app(app)
 
+    from .auth.principals import load_principal
+
     @login_manager.user_loader
     def load_user(user_id):
-        return Admin.query.get(int(user_id))
+        # short-TTL in-process cache; invalidated when an admin is deactivated or re-passworded
+        return load_principal(int(user_id))
 
     # ------------------
     # Blueprints
@@ -47,8 +77,8 @@ def create_app():
     from .schedule import schedule_bp
     from .recurring_requests import recurring_requests_bp
     from .recurring_assignments import recurring_assignments_bp
-    from .schedule.routes import schedule_bp
-    
+    from .imports import imports_bp
+    from .feeds import feeds_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
@@ -58,13 +88,24 @@ def create_app():
     app.register_blueprint(requests_bp)
     app.register_blueprint(recurring_requests_bp)
     app.register_blueprint(recurring_assignments_bp)
+    app.register_blueprint(imports_bp)
+    app.register_blueprint(feeds_bp)
     app.register_blueprint(schedule_bp, url_prefix="/schedule")
 
 
     # ------------------
     # CLI Commands (ADMIN ONLY)
     # ------------------
-    from .cli import create_admin
+    from .cli import (
+        create_admin, set_admin_password, find_gaps, seed, import_csv, archive, replica_sync, startup_profile,
+    )
     app.cli.add_command(create_admin)
+    app.cli.add_command(set_admin_password)
+    app.cli.add_command(find_gaps)
+    app.cli.add_command(seed)
+    app.cli.add_command(import_csv)
+    app.cli.add_command(archive)
+    app.cli.add_command(replica_sync)
+    app.cli.add_command(startup_profile)
 
     return app
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""
+Hot/cold split for assignments and requests.
+
+`flask archive` moves rows that ended before a cutoff out of assignments/requests
+into assignments_archive/requests_archive (same ids, same columns), one batch per
+transaction, and records the cutoff in archive_state. The hot tables then hold
+only recent history plus the future, whatever the age of the database.
+
+Reads keep querying the hot tables and add the archive only when their date
+range starts before the cutoff. Writes are refused before the cutoff, so overlap
+checks against the hot table alone stay correct: every archived shift ended
+before anything that can still be booked.
+"""
+import heapq
+from datetime import date, datetime, time
+
+from flask import g
+from sqlalchemy import delete, exists, func, insert, literal, select
+
+from .extensions import db
+from .models import ArchiveState, Assignment, AssignmentArchive, Request as StaffRequest, RequestArchive
+
+DEFAULT_BATCH_SIZE = 5000
+_UNSET = object()
+
+
+# ------------------
+# read side
+# ------------------
+def archive_cutoff() -> datetime | None:
+    """Everything ending before this lives in the archive; None until the first run. Read once per request."""
+    cutoff = g.get("_archive_cutoff", _UNSET)
+    if cutoff is _UNSET:
+        cutoff = db.session.query(ArchiveState.cutoff).filter(ArchiveState.id == 1).scalar()
+        g._archive_cutoff = cutoff
+    return cutoff
+
+
+def reaches_archive(start_dt: datetime) -> bool:
+    """Does a query over [start_dt, ...) need the archive as well as the hot table?"""
+    cutoff = archive_cutoff()
+    return cutoff is not None and start_dt < cutoff
+
+
+def archived_assignments(since: datetime, *criteria, include_canceled: bool = False) -> list:
+    """
+    Archived assignments matching `criteria`, oldest first, for a range starting at
+    `since`. No query at all when the range doesn't reach the archive.
+    """
+    if not reaches_archive(since):
+        return []
+    q = AssignmentArchive.query.filter(*criteria)
+    if not include_canceled:
+        q = q.filter(AssignmentArchive.not_canceled())
+    return q.order_by(AssignmentArchive.start_datetime.asc()).all()
+
+
+def merged(hot: list, cold: list) -> list:
+    """
+    Both lists (each sorted by start) as one, sorted by start. Query the hot table
+    FIRST: a row moved between the two queries then shows up twice (dropped here)
+    instead of not at all.
+    """
+    if not cold:
+        return hot
+    hot_ids = {row.id for row in hot}
+    cold = [row for row in cold if row.id not in hot_ids]
+    return list(heapq.merge(cold, hot, key=lambda row: row.start_datetime))
+
+
+def archived_error(start_dt: datetime) -> str | None:
+    """Flash message for a write that would land in the archived (read-only) period."""
+    if reaches_archive(start_dt):
+        return f"Shifts before {archive_cutoff():%Y-%m-%d} are archived and read-only."
+    return None
+
+
+# ------------------
+# `flask archive`
+# ------------------
+def _move(hot_model, cold_model, where, batch_size: int, now: datetime) -> int:
+    """Move rows matching `where` in id order, committing after each batch."""
+    hot = hot_model.__table__
+    columns = list(hot.columns)  # the archive has the same columns + archived_at
+    moved = 0
+    while True:
+        ids = db.session.execute(
+            select(hot.c.id).where(*where).order_by(hot.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return moved
+        db.session.execute(
+            insert(cold_model.__table__).from_select(
+                [*(c.name for c in columns), "archived_at"],
+                select(*columns, literal(now, db.DateTime)).where(hot.c.id.in_(ids)),
+            )
+        )
+        db.session.execute(delete(hot).where(hot.c.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+
+
+def _request_where(cutoff: datetime) -> list:
+    # a request stays hot while an assignment that stays hot points at it (FK on Postgres)
+    hot_assignments = Assignment.__table__.c
+    referenced = exists().where(
+        hot_assignments.request_id == StaffRequest.__table__.c.id,
+        hot_assignments.end_datetime >= cutoff,
+    )
+    return [StaffRequest.__table__.c.end_datetime < cutoff, ~referenced]
+
+
+def pending(cutoff: datetime) -> dict:
+    """Rows `archive_before(cutoff)` would move right now."""
+    return {
+        "assignments": db.session.query(func.count(Assignment.id))
+        .filter(Assignment.end_datetime < cutoff).scalar(),
+        "requests": db.session.execute(
+            select(func.count()).select_from(StaffRequest.__table__).where(*_request_where(cutoff))
+        ).scalar(),
+    }
+
+
+def archive_before(cutoff: datetime, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Move assignments, then requests, that ended before `cutoff` into the archive.
+
+    The cutoff is published first (its own commit): from then on writes before it
+    are refused and reads before it consult the archive, so each later batch is
+    invisible to users except for its new location. The cutoff only moves forward
+    and never past today, so the recurring generators (which start at today) never
+    recreate an archived occurrence.
+    """
+    if cutoff > datetime.combine(date.today(), time.min):
+        raise ValueError("the cutoff can't be later than today")
+
+    state = db.session.get(ArchiveState, 1)
+    if state and cutoff < state.cutoff:
+        raise ValueError(f"already archived up to {state.cutoff:%Y-%m-%d}; the cutoff only moves forward")
+    if state is None:
+        state = ArchiveState(id=1, cutoff=cutoff)
+        db.session.add(state)
+    state.cutoff = cutoff
+    state.updated_at = datetime.utcnow()
+    db.session.commit()
+    g.pop("_archive_cutoff", None)
+
+    now = datetime.utcnow()
+    assignments = _move(
+        Assignment, AssignmentArchive, [Assignment.__table__.c.end_datetime < cutoff], batch_size, now
+    )
+    requests = _move(StaffRequest, RequestArchive, _request_where(cutoff), batch_size, now)
+    return {"assignments": assignments, "requests": requests}
@@ -0,0 +1,89 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from ..extensions import db
+from ..models import Assignment, Unit
+from ..utils.intervals import IntervalIndex
+
+MAX_BULK_DAYS = 62
+MAX_BULK_SHIFTS = 1000
+
+# same codes as the recurring forms; index == date.weekday()
+WEEKDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+def expand_shifts(
+    staff_ids: list[int],
+    date_from: date,
+    date_to: date,
+    weekdays: set[int],
+    start_time: str,
+    end_time: str,
+) -> list[tuple[int, datetime, datetime]]:
+    """(staff_id, start, end) for every staff on every matching day; end past midnight rolls over."""
+    sh, sm = map(int, start_time.split(":"))
+    eh, em = map(int, end_time.split(":"))
+    shifts = []
+    d = date_from
+    while d <= date_to:
+        if not weekdays or d.weekday() in weekdays:
+            start = datetime(d.year, d.month, d.day, sh, sm)
+            end = datetime(d.year, d.month, d.day, eh, em)
+            if end <= start:
+                end += timedelta(days=1)
+            shifts.extend((sid, start, end) for sid in staff_ids)
+        d += timedelta(days=1)
+    return shifts
+
+
+def find_conflicts(shifts: list[tuple[int, datetime, datetime]]) -> list[dict]:
+    """
+    Every shift that overlaps an existing non-canceled assignment of the same staff,
+    or another shift in the same batch. One range query for all staff, then
+    in-memory interval checks. Call after lock_staff() so the answer stays true
+    until commit.
+    """
+    if not shifts:
+        return []
+
+    staff_ids = {sid for sid, _, _ in shifts}
+    lo = min(start for _, start, _ in shifts)
+    hi = max(end for _, _, end in shifts)
+
+    rows = (
+        db.session.query(
+            Assignment.id, Assignment.staff_id, Assignment.start_datetime, Assignment.end_datetime, Unit.unit_name
+        )
+        .join(Unit, Unit.id == Assignment.unit_id)
+        .filter(
+            Assignment.staff_id.in_(staff_ids),
+            Assignment.not_canceled(),
+            Assignment.start_datetime < hi,
+            Assignment.end_datetime > lo,
+        )
+        .order_by(Assignment.staff_id, Assignment.start_datetime)
+        .all()
+    )
+    existing = IntervalIndex()
+    for row in rows:
+        existing.add(row.staff_id, row.start_datetime, row.end_datetime, row)
+
+    by_staff = defaultdict(list)
+    for sid, start, end in shifts:
+        by_staff[sid].append((start, end))
+
+    conflicts = []
+    for sid, batch in by_staff.items():
+        batch.sort()
+        batch_end = None  # latest end among earlier shifts of this batch
+        for start, end in batch:
+            if batch_end is not None and batch_end > start:
+                conflicts.append({"staff_id": sid, "start": start, "end": end, "with": None})
+            batch_end = end if batch_end is None else max(batch_end, end)
+
+            hit = existing.find(sid, start, end)
+            if hit is not None:
+                conflicts.append({"staff_id": sid, "start": start, "end": end, "with": hit[2]})
+
+    conflicts.sort(key=lambda c: (c["start"], c["staff_id"]))
+    return conflicts
@@ -0,0 +1,60 @@
+import time
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError
+
+from ..extensions import db
+from ..models import StaffLock
+
+LOCK_RETRIES = 8
+LOCK_BACKOFF_SECONDS = 0.05
+LOCK_BATCH = 500  # ids per multi-row upsert (keeps SQLite under its bind-parameter limit)
+
+
+def _upsert():
+    if db.session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(StaffLock)
+    return sqlite.insert(StaffLock)
+
+
+def _is_locked_error(exc: OperationalError) -> bool:
+    msg = str(exc.orig).lower()
+    return "locked" in msg or "busy" in msg
+
+
+def lock_staff(*staff_ids: int | None) -> None:
+    """
+    Take the per-staff booking lock for the rest of the current transaction.
+
+    Call this BEFORE the overlap check: once it returns, no other writer can book
+    the same staff until we commit or roll back. Writers for other staff are not
+    blocked on Postgres (row lock); SQLite has a single writer anyway, and we
+    retry with backoff if its busy timeout expires.
+    """
+    ids = sorted({sid for sid in staff_ids if sid})  # fixed order => no deadlocks
+    for i in range(0, len(ids), LOCK_BATCH):
+        # rows are upserted (and row-locked) in VALUES order, so batching keeps the order
+        stmt = (
+            _upsert()
+            .values([{"staff_id": sid, "version": 1} for sid in ids[i:i + LOCK_BATCH]])
+            .on_conflict_do_update(
+                index_elements=[StaffLock.staff_id],
+                set_={"version": StaffLock.version + 1},
+            )
+        )
+        for attempt in range(LOCK_RETRIES):
+            try:
+                db.session.execute(stmt)
+                break
+            except OperationalError as exc:
+                if not _is_locked_error(exc) or attempt == LOCK_RETRIES - 1:
+                    raise
+                time.sleep(LOCK_BACKOFF_SECONDS * (2 ** attempt))
+
+
+OVERLAP_CONSTRAINT = "ex_assignments_staff_no_overlap"
+
+
+def is_overlap_violation(exc: Exception) -> bool:
+    """True if an IntegrityError came from the Postgres no-overlap exclusion constraint."""
+    return OVERLAP_CONSTRAINT in str(getattr(exc, "orig", exc))
@@ -2,10 +2,19 @@ from datetime import datetime
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from datetime import timedelta
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 
 from . import assignments_bp
 from ..extensions import db
-from ..models import Assignment, Staff, Unit, Request
+from ..models import Assignment, AssignmentArchive, Staff, Unit, Request
+from ..archive import archive_cutoff, archived_assignments, archived_error, merged
+from ..periods import locked_error, locked_range_error
+from ..requests.coverage import counted_request_id, track_fill_change
+from ..feeds.versions import touch_feeds
+from ..live import note_change
+from .bulk import MAX_BULK_DAYS, MAX_BULK_SHIFTS, WEEKDAY_CODES, expand_shifts, find_conflicts
+from .locking import lock_staff, is_overlap_violation
 
 
 
@@ -20,7 +29,7 @@ def parse_dt(date_str: str, time_str: str) -> datetime:
 def has_overlap(staff_id: int, start_dt: datetime, end_dt: datetime, exclude_assignment_id: int | None = None) -> bool:
     q = Assignment.query.filter(
         Assignment.staff_id == staff_id,
-        Assignment.status != "Canceled",
+        Assignment.not_canceled(),
         Assignment.start_datetime < end_dt,
         start_dt < Assignment.end_datetime,
     )
@@ -39,25 +48,32 @@ def list_assignments():
     date_to = request.args.get("to")      # YYYY-MM-DD
     show_canceled = request.args.get("canceled") == "1"
 
-    q = Assignment.query
-
+    def filtered(model):
+        criteria = []
+        if staff_id:
+            criteria.append(model.staff_id == staff_id)
+        if unit_id:
+            criteria.append(model.unit_id == unit_id)
+        if date_from:
+            criteria.append(model.start_datetime >= datetime.strptime(date_from, "%Y-%m-%d"))
+        if date_to:
+            # include entire date_to day by going to 23:59
+            end_dt = datetime.strptime(date_to, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+            criteria.append(model.start_datetime <= end_dt)
+        return criteria
+
+    q = Assignment.query.filter(*filtered(Assignment))
     if not show_canceled:
-        q = q.filter(Assignment.status != "Canceled")
-
-    if staff_id:
-        q = q.filter(Assignment.staff_id == staff_id)
-    if unit_id:
-        q = q.filter(Assignment.unit_id == unit_id)
+        q = q.filter(Assignment.not_canceled())
+    assignments = q.order_by(Assignment.start_datetime.asc()).all()
 
+    # archived rows only when an explicit From date reaches back past the cutoff
     if date_from:
-        start_dt = datetime.strptime(date_from, "%Y-%m-%d")
-        q = q.filter(Assignment.start_datetime >= start_dt)
-    if date_to:
-        # include entire date_to day by going to 23:59
-        end_dt = datetime.strptime(date_to, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-        q = q.filter(Assignment.start_datetime <= end_dt)
-
-    assignments = q.order_by(Assignment.start_datetime.asc()).all()
+        assignments = merged(assignments, archived_assignments(
+            datetime.strptime(date_from, "%Y-%m-%d"),
+            *filtered(AssignmentArchive),
+            include_canceled=show_canceled,
+        ))
 
     staff_list = Staff.query.order_by(Staff.full_name.asc()).all()
     unit_list = Unit.query.order_by(Unit.unit_name.asc()).all()
@@ -72,25 +88,20 @@ def list_assignments():
         date_from=date_from or "",
         date_to=date_to or "",
         show_canceled=show_canceled,
+        archive_cutoff=archive_cutoff(),
     )
 
 
 @assignments_bp.get("/new")
 @login_required
 def new_assignment():
-    staff_list = Staff.query.filter_by(is_active=True).order_by(Staff.full_name.asc()).all()
-    unit_list = Unit.query.filter_by(is_active=True).order_by(Unit.unit_name.asc()).all()
-    requests = Request.query.order_by(Request.created_at.desc()).all()
-
+    # staff / unit / request pickers load on demand from the */lookup JSON endpoints
     request_id = request.args.get("request_id", type=int)
     req = Request.query.get(request_id) if request_id else None
 
     return render_template(
         "assignments/form.html",
         assignment=None,
-        staff_list=staff_list,
-        unit_list=unit_list,
-        requests=requests,
         req=req,  # <-- this is what drives the prefill
         status_options=STATUS_OPTIONS,
     )
@@ -108,6 +119,10 @@ def create_assignment():
     status = (request.form.get("status") or "Scheduled").strip()
     notes = (request.form.get("notes") or "").strip() or None
 
+    if not staff_id or not unit_id:
+        flash("Staff and unit are required.", "danger")
+        return redirect(url_for("assignments.new_assignment"))
+
     if status not in STATUS_OPTIONS:
         flash("Invalid status.", "danger")
         return redirect(url_for("assignments.new_assignment"))
@@ -122,7 +137,15 @@ def create_assignment():
     if end_dt <= start_dt:
         end_dt = end_dt + timedelta(days=1)
 
+    error = archived_error(start_dt) or locked_error(start_dt)
+    if error:
+        flash(error, "danger")
+        return redirect(url_for("assignments.new_assignment"))
+
+    # lock first, then check: the check and the insert must not interleave with another writer
+    lock_staff(staff_id)
     if has_overlap(staff_id, start_dt, end_dt):
+        db.session.rollback()
         flash("This staff already has an overlapping shift.", "danger")
         return redirect(url_for("assignments.new_assignment"))
 
@@ -137,7 +160,17 @@ def create_assignment():
         created_by_admin_id=current_user.id,
     )
     db.session.add(a)
-    db.session.commit()
+    track_fill_change(None, counted_request_id(request_id, status))
+    touch_feeds(staff_ids=[staff_id], unit_ids=[unit_id])
+    note_change("created", staff_id, unit_id, start_dt)
+    try:
+        db.session.commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        if not is_overlap_violation(exc):
+            raise
+        flash("This staff already has an overlapping shift.", "danger")
+        return redirect(url_for("assignments.new_assignment"))
 
     flash("Assignment created.", "success")
     return redirect(url_for("assignments.list_assignments"))
@@ -148,17 +181,10 @@ def create_assignment():
 def edit_assignment(assignment_id):
     a = Assignment.query.get_or_404(assignment_id)
 
-    # Allow selecting inactive staff/unit for existing records (history)
-    staff_list = Staff.query.order_by(Staff.full_name.asc()).all()
-    unit_list = Unit.query.order_by(Unit.unit_name.asc()).all()
-    requests = Request.query.order_by(Request.created_at.desc()).all()
-
+    # Pickers allow inactive staff/unit for existing records (history)
     return render_template(
         "assignments/form.html",
         assignment=a,
-        staff_list=staff_list,
-        unit_list=unit_list,
-        requests=requests,
         req=None,
         status_options=STATUS_OPTIONS,
     )
@@ -179,6 +205,10 @@ def update_assignment(assignment_id):
     status = (request.form.get("status") or "Scheduled").strip()
     notes = (request.form.get("notes") or "").strip() or None
 
+    if not staff_id or not unit_id:
+        flash("Staff and unit are required.", "danger")
+        return redirect(url_for("assignments.edit_assignment", assignment_id=assignment_id))
+
     if status not in STATUS_OPTIONS:
         flash("Invalid status.", "danger")
         return redirect(url_for("assignments.edit_assignment", assignment_id=assignment_id))
@@ -193,10 +223,22 @@ def update_assignment(assignment_id):
     if end_dt <= start_dt:
         end_dt = end_dt + timedelta(days=1)
 
-    if status != "Canceled" and has_overlap(staff_id, start_dt, end_dt, exclude_assignment_id=a.id):
-        flash("This staff already has an overlapping shift.", "danger")
+    error = archived_error(start_dt) or locked_error(a.start_datetime, start_dt)
+    if error:
+        flash(error, "danger")
         return redirect(url_for("assignments.edit_assignment", assignment_id=assignment_id))
 
+    if status != "Canceled":
+        lock_staff(staff_id)
+        if has_overlap(staff_id, start_dt, end_dt, exclude_assignment_id=a.id):
+            db.session.rollback()
+            flash("This staff already has an overlapping shift.", "danger")
+            return redirect(url_for("assignments.edit_assignment", assignment_id=assignment_id))
+
+    before = counted_request_id(a.request_id, a.status)
+    touch_feeds(staff_ids=[a.staff_id, staff_id], unit_ids=[a.unit_id, unit_id])
+    note_change("updated", a.staff_id, a.unit_id, a.start_datetime)  # where it was
+
     a.staff_id = staff_id
     a.unit_id = unit_id
     a.request_id = request_id
@@ -205,7 +247,16 @@ def update_assignment(assignment_id):
     a.status = status
     a.notes = notes
 
-    db.session.commit()
+    track_fill_change(before, counted_request_id(a.request_id, a.status))
+    note_change("canceled" if status == "Canceled" else "updated", staff_id, unit_id, start_dt)
+    try:
+        db.session.commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        if not is_overlap_violation(exc):
+            raise
+        flash("This staff already has an overlapping shift.", "danger")
+        return redirect(url_for("assignments.edit_assignment", assignment_id=assignment_id))
     flash("Assignment updated.", "success")
     return redirect(url_for("assignments.list_assignments"))
 
@@ -214,7 +265,129 @@ def update_assignment(assignment_id):
 @login_required
 def cancel_assignment(assignment_id):
     a = Assignment.query.get_or_404(assignment_id)
+    error = locked_error(a.start_datetime)
+    if error:
+        flash(error, "danger")
+        return redirect(url_for("assignments.list_assignments"))
+    before = counted_request_id(a.request_id, a.status)
     a.status = "Canceled"
+    track_fill_change(before, None)
+    touch_feeds(staff_ids=[a.staff_id], unit_ids=[a.unit_id])
+    note_change("canceled", a.staff_id, a.unit_id, a.start_datetime)
     db.session.commit()
     flash("Assignment canceled.", "success")
-    return redirect(url_for("assignments.list_assignments"))
\ No newline at end of file
+    return redirect(url_for("assignments.list_assignments"))
+
+
+def _render_bulk(form, conflicts=None):
+    staff_ids = form.get("staff_ids") or []
+    names = dict(db.session.query(Staff.id, Staff.full_name).filter(Staff.id.in_(staff_ids)).all()) if staff_ids else {}
+    unit = Unit.query.get(form["unit_id"]) if form.get("unit_id") else None
+    return render_template(
+        "assignments/bulk.html",
+        form=form,
+        selected_staff=[(sid, names[sid]) for sid in staff_ids if sid in names],
+        staff_names=names,
+        unit=unit,
+        conflicts=conflicts or [],
+        weekday_codes=WEEKDAY_CODES,
+        status_options=[s for s in STATUS_OPTIONS if s != "Canceled"],
+        max_days=MAX_BULK_DAYS,
+    )
+
+
+@assignments_bp.get("/bulk")
+@login_required
+def bulk_assignments():
+    return _render_bulk({"status": "Scheduled", "days": []})
+
+
+@assignments_bp.post("/bulk")
+@login_required
+def create_bulk_assignments():
+    form = {
+        "staff_ids": list(dict.fromkeys(request.form.getlist("staff_ids", type=int))),
+        "unit_id": request.form.get("unit_id", type=int),
+        "date_from": (request.form.get("date_from") or "").strip(),
+        "date_to": (request.form.get("date_to") or "").strip(),
+        "days": [c for c in request.form.getlist("days") if c in WEEKDAY_CODES],
+        "start_time": (request.form.get("start_time") or "").strip(),
+        "end_time": (request.form.get("end_time") or "").strip(),
+        "status": (request.form.get("status") or "Scheduled").strip(),
+        "notes": (request.form.get("notes") or "").strip() or None,
+    }
+
+    if not form["staff_ids"] or not form["unit_id"]:
+        flash("Pick at least one staff member and a unit.", "danger")
+        return _render_bulk(form)
+
+    if form["status"] not in STATUS_OPTIONS or form["status"] == "Canceled":
+        flash("Invalid status.", "danger")
+        return _render_bulk(form)
+
+    try:
+        date_from = datetime.strptime(form["date_from"], "%Y-%m-%d").date()
+        date_to = datetime.strptime(form["date_to"], "%Y-%m-%d").date()
+        parse_dt(form["date_from"], form["start_time"])
+        parse_dt(form["date_from"], form["end_time"])
+    except ValueError:
+        flash("Invalid date/time format.", "danger")
+        return _render_bulk(form)
+
+    if date_to < date_from or (date_to - date_from).days >= MAX_BULK_DAYS:
+        flash(f"Date range must run forwards and cover at most {MAX_BULK_DAYS} days.", "danger")
+        return _render_bulk(form)
+
+    error = archived_error(datetime.combine(date_from, datetime.min.time())) or locked_range_error(date_from, date_to)
+    if error:
+        flash(error, "danger")
+        return _render_bulk(form)
+
+    weekdays = {WEEKDAY_CODES.index(c) for c in form["days"]}
+    shifts = expand_shifts(form["staff_ids"], date_from, date_to, weekdays, form["start_time"], form["end_time"])
+    if not shifts:
+        flash("No dates in that range fall on the selected weekdays.", "danger")
+        return _render_bulk(form)
+    if len(shifts) > MAX_BULK_SHIFTS:
+        flash(f"That would create {len(shifts)} shifts; the limit is {MAX_BULK_SHIFTS} per batch.", "danger")
+        return _render_bulk(form)
+
+    # lock every staff first, then one range query + in-memory checks for the whole batch
+    lock_staff(*form["staff_ids"])
+    conflicts = find_conflicts(shifts)
+    if conflicts:
+        db.session.rollback()
+        flash(f"Nothing was created: {len(conflicts)} shift(s) overlap existing assignments.", "danger")
+        return _render_bulk(form, conflicts)
+
+    now = datetime.utcnow()
+    db.session.execute(insert(Assignment), [
+        {
+            "staff_id": sid,
+            "unit_id": form["unit_id"],
+            "request_id": None,
+            "start_datetime": start,
+            "end_datetime": end,
+            "status": form["status"],
+            "notes": form["notes"],
+            "created_by_admin_id": current_user.id,
+            "created_at": now,
+        }
+        for sid, start, end in shifts
+    ])
+    touch_feeds(staff_ids=form["staff_ids"], unit_ids=[form["unit_id"]])
+    for sid, start, _ in shifts:
+        note_change("created", sid, form["unit_id"], start)
+    try:
+        db.session.commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        if not is_overlap_violation(exc):
+            raise
+        flash("Nothing was created: a concurrent edit added an overlapping shift. Try again.", "danger")
+        return _render_bulk(form)
+
+    flash(f"Created {len(shifts)} assignment(s) for {len(form['staff_ids'])} staff.", "success")
+    return redirect(url_for(
+        "assignments.list_assignments", unit_id=form["unit_id"], **{"from": form["date_from"], "to": form["date_to"]}
+    ))
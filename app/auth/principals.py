@@ -0,0 +1,136 @@
+"""
+Short-TTL, in-process cache of logged-in admins for Flask-Login's user_loader.
+
+Cached entries are plain Principal snapshots (never ORM instances), so they are
+safe to share across requests and threads. Any committed change to an Admin's
+is_active or password_hash — from a route, a CLI command, anywhere — drops the
+cache in this process and touches an epoch file in the instance folder, which
+other worker processes check (one stat() per request) before trusting their cache.
+"""
+import os
+import threading
+import time
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from ..extensions import db
+from ..metrics import record_cache
+from ..models import Admin
+
+PRINCIPAL_TTL_SECONDS = 30
+EPOCH_FILENAME = "principals.epoch"
+
+_lock = threading.Lock()
+_cache: dict[int, tuple[float, "Principal"]] = {}
+_seen_epoch: int | None = None
+
+
+class Principal(UserMixin):
+    """Read-only snapshot of an active Admin; what current_user is for a logged-in request."""
+
+    def __init__(self, admin: Admin):
+        self.id = admin.id
+        self.email = admin.email
+        self.full_name = admin.full_name
+
+    def __repr__(self):
+        return f"<Principal {self.id} {self.email}>"
+
+
+def _epoch_path() -> str:
+    return os.path.join(current_app.instance_path, EPOCH_FILENAME)
+
+
+def _read_epoch() -> int:
+    try:
+        return os.stat(_epoch_path()).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def _bump_epoch() -> None:
+    path = _epoch_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a"):
+        pass
+    # strictly increasing, even when two bumps land in the same filesystem clock tick
+    ns = max(time.time_ns(), _read_epoch() + 1)
+    os.utime(path, ns=(ns, ns))
+
+
+def invalidate(admin_ids=None) -> None:
+    """Forget cached principals (all of them if admin_ids is None) here and in other workers."""
+    with _lock:
+        if admin_ids is None:
+            _cache.clear()
+        else:
+            for admin_id in admin_ids:
+                _cache.pop(admin_id, None)
+    if has_app_context():
+        _bump_epoch()
+
+
+def load_principal(user_id: int) -> Principal | None:
+    """user_loader body: cached Principal, or one DB read. Inactive admins get None."""
+    global _seen_epoch
+
+    epoch = _read_epoch()
+    now = time.monotonic()
+    with _lock:
+        if epoch != _seen_epoch:
+            _cache.clear()
+            _seen_epoch = epoch
+        hit = _cache.get(user_id)
+        if hit and hit[0] > now:
+            record_cache("principals", True)
+            return hit[1]
+    record_cache("principals", False)
+
+    admin = db.session.get(Admin, user_id)
+    if admin is None or not admin.is_active:
+        with _lock:
+            _cache.pop(user_id, None)
+        return None
+
+    principal = Principal(admin)
+    with _lock:
+        _cache[user_id] = (now + PRINCIPAL_TTL_SECONDS, principal)
+    return principal
+
+
+# ------------------
+# Invalidation hooks
+# ------------------
+_DIRTY_KEY = "principals_dirty"
+
+
+@event.listens_for(Admin, "after_update")
+def _admin_updated(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.is_active.history.has_changes() or state.attrs.password_hash.history.has_changes():
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault(_DIRTY_KEY, set()).add(target.id)
+
+
+@event.listens_for(Admin, "after_delete")
+def _admin_deleted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    # only after commit: invalidating earlier would let a concurrent reader re-cache the old row
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if dirty:
+        invalidate(dirty)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
@@ -41,4 +41,195 @@ def set_admin_password(email, password):
 
     admin.password_hash = generate_password_hash(password)
     db.session.commit()
-    click.echo("Password updated.")
\ No newline at end of file
+    click.echo("Password updated.")
+
+@click.command("find-gaps")
+@click.option("--days", default=7, show_default=True, help="Look-ahead horizon in days.")
+@with_appcontext
+def find_gaps(days):
+    """Reconcile request fill counters and list unfilled shifts."""
+    from .requests.coverage import run_gap_finder
+
+    changed, gaps = run_gap_finder(days)
+    click.echo(f"Reconciled {changed} request counter(s).")
+
+    if not gaps:
+        click.echo(f"No unfilled shifts in the next {days} day(s).")
+        return
+
+    for g in gaps:
+        r = g["r"]
+        click.echo(
+            f"{r.start_datetime:%a %Y-%m-%d %H:%M}-{r.end_datetime:%H:%M}  "
+            f"#{r.id}  {g['unit_name']}  {g['filled']}/{r.staff_needed}  short {g['shortfall']}"
+        )
+    click.echo(f"{len(gaps)} request(s) short by {sum(g['shortfall'] for g in gaps)} staff.")
+
+
+@click.command("seed")
+@click.option("--units", "n_units", default=20, show_default=True, help="Units to create.")
+@click.option("--staff", "n_staff", default=300, show_default=True, help="Staff to create.")
+@click.option("--years", default=2.0, show_default=True, help="Years of history before --end-date.")
+@click.option("--future-days", default=28, show_default=True, help="Days scheduled after --end-date.")
+@click.option("--seed", "seed_value", default=42, show_default=True, help="Random seed.")
+@click.option("--end-date", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Anchor date (default: today). Fix it to get identical data on every run.")
+@click.option("--chunk-size", default=5000, show_default=True, help="Rows per INSERT batch / commit.")
+@click.option("--yes", is_flag=True, help="Don't ask before adding to a non-empty database.")
+@with_appcontext
+def seed(n_units, n_staff, years, future_days, seed_value, end_date, chunk_size, yes):
+    """Generate synthetic units, staff, recurring rules and assignment/request history."""
+    import time
+    from datetime import date
+
+    from .models import Assignment
+    from .seed import seed_database
+
+    existing = Assignment.query.count()
+    if existing and not yes:
+        click.confirm(f"Database already has {existing} assignment(s). Add synthetic data anyway?", abort=True)
+
+    started = time.perf_counter()
+    counts = seed_database(
+        n_units=n_units,
+        n_staff=n_staff,
+        years=years,
+        future_days=future_days,
+        seed=seed_value,
+        end_date=end_date.date() if end_date else date.today(),
+        chunk_size=chunk_size,
+        progress=lambda c: click.echo(f"  {c['assignments']} assignments, {c['requests']} requests", err=True),
+    )
+    click.echo(
+        f"Seeded {counts['units']} units, {counts['staff']} staff, {counts['rules']} recurring rules, "
+        f"{counts['requests']} requests and {counts['assignments']} assignments "
+        f"in {time.perf_counter() - started:.1f}s."
+    )
+
+
+@click.command("import-csv")
+@click.argument("kind", type=click.Choice(["assignments", "requests"]))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--admin", "admin_email", help="Admin recorded as creator (default: first active admin).")
+@click.option("--chunk-size", default=5000, show_default=True, help="Rows per INSERT batch / commit.")
+@click.option("--rejects", "rejects_path", type=click.Path(dir_okay=False),
+              help="Rejected-rows report (default: PATH with .rejects.csv).")
+@with_appcontext
+def import_csv(kind, path, admin_email, chunk_size, rejects_path):
+    """Import assignments or requests from a CSV file."""
+    import os
+    import time
+
+    from .imports.csv_import import CsvImport, ImportFormatError, default_admin_id
+
+    if admin_email:
+        admin = Admin.query.filter_by(email=admin_email.strip().lower()).first()
+        admin_id = admin.id if admin else None
+    else:
+        admin_id = default_admin_id()
+    if not admin_id:
+        raise click.ClickException("Admin not found.")
+
+    rejects_path = rejects_path or f"{path.rsplit('.', 1)[0]}.rejects.csv"
+    started = time.perf_counter()
+    with open(path, newline="", encoding="utf-8-sig") as src, open(rejects_path, "w", newline="") as out:
+        try:
+            job = CsvImport(kind, admin_id=admin_id, chunk_size=chunk_size, rejects_out=out).run(src)
+        except ImportFormatError as exc:
+            raise click.ClickException(str(exc))
+
+    click.echo(f"Imported {job.imported} {kind} in {time.perf_counter() - started:.1f}s; {job.rejected} rejected.")
+    if job.rejected:
+        click.echo(f"Rejected rows: {rejects_path}")
+    else:
+        os.remove(rejects_path)
+
+
+@click.command("archive")
+@click.option("--before", "before", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Archive everything that ended before this date.")
+@click.option("--older-than-days", default=180, show_default=True,
+              help="Cutoff as days before today (ignored with --before).")
+@click.option("--batch-size", default=5000, show_default=True, help="Rows moved per transaction.")
+@click.option("--dry-run", is_flag=True, help="Only count what would be moved.")
+@with_appcontext
+def archive(before, older_than_days, batch_size, dry_run):
+    """Move past assignments and requests into the archive tables."""
+    import time
+    from datetime import date, datetime, timedelta
+
+    from .archive import archive_before, pending
+
+    cutoff = before or datetime.combine(date.today() - timedelta(days=older_than_days), datetime.min.time())
+    counts = pending(cutoff)
+    click.echo(
+        f"Cutoff {cutoff:%Y-%m-%d}: {counts['assignments']} assignment(s) and "
+        f"{counts['requests']} request(s) ended before it."
+    )
+    if dry_run:
+        return
+
+    started = time.perf_counter()
+    try:
+        moved = archive_before(cutoff, batch_size=batch_size)
+    except ValueError as exc:
+        raise click.ClickException(str(exc))
+    click.echo(
+        f"Archived {moved['assignments']} assignment(s) and {moved['requests']} request(s) "
+        f"in {time.perf_counter() - started:.1f}s."
+    )
+
+
+@click.command("replica-sync")
+@with_appcontext
+def replica_sync():
+    """Copy a SQLite primary into a SQLite DATABASE_REPLICA_URL (local testing only)."""
+    import sqlite3
+
+    engines = db.engines
+    if "replica" not in engines:
+        raise click.ClickException("DATABASE_REPLICA_URL is not set.")
+    primary, replica = engines[None].url, engines["replica"].url
+    if primary.get_backend_name() != "sqlite" or replica.get_backend_name() != "sqlite":
+        raise click.ClickException("replica-sync only copies SQLite files; use real replication for Postgres.")
+
+    engines["replica"].dispose()  # no pooled connection may hold the old file open
+    src, dst = sqlite3.connect(primary.database), sqlite3.connect(replica.database)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    click.echo(f"Copied {primary.database} -> {replica.database}")
+
+
+@click.command("startup-profile")
+@click.option("--top", default=20, show_default=True, help="Rows to show.")
+@click.option("--by", "group", type=click.Choice(["package", "module"]), default="package", show_default=True,
+              help="Sum self time per top-level package, or list modules by cumulative time.")
+def startup_profile(top, group):
+    """Profile a cold `import app` + create_app() (python -X importtime) in a fresh interpreter."""
+    from .startup import HEAVY_MODULES, by_package, measure_startup
+
+    result = measure_startup(importtime=True)
+    click.echo(
+        f"import app: {result['import_ms']:.0f} ms   create_app(): {result['factory_ms']:.0f} ms   "
+        f"total: {result['total_ms']:.0f} ms"
+    )
+    click.echo("")
+
+    if group == "package":
+        click.echo(f"{'package':<40} {'self ms':>9}")
+        for package, self_us in by_package(result["imports"])[:top]:
+            click.echo(f"{package:<40} {self_us / 1000:9.1f}")
+    else:
+        click.echo(f"{'module':<60} {'self ms':>9} {'cumul ms':>9}")
+        rows = sorted(result["imports"], key=lambda r: r["cumulative_us"], reverse=True)[:top]
+        for r in rows:
+            name = "  " * r["depth"] + r["module"]
+            click.echo(f"{name[:60]:<60} {r['self_us'] / 1000:9.1f} {r['cumulative_us'] / 1000:9.1f}")
+
+    if result["heavy"]:
+        click.echo("")
+        click.echo(f"Loaded at startup but should be lazy: {', '.join(result['heavy'])} "
+                   f"(watched: {', '.join(HEAVY_MODULES)})")
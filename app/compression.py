@@ -0,0 +1,192 @@
+"""
+Response compression: brotli or gzip, negotiated from Accept-Encoding.
+
+- text-like bodies only (HTML, CSV, JSON, iCalendar, ...); never archives or
+  images, never Server-Sent Events (each event must reach the page right away)
+- bodies under COMPRESS_MIN_SIZE bytes (default 500) go out as they are
+- streamed bodies (generators, send_file downloads) are compressed chunk by
+  chunk as they are produced; nothing waits for the whole body
+- schedule pages: the compressed bytes are kept in a small LRU keyed by a hash of
+  the page, so re-sending an unchanged page costs no compression, and the same
+  hash is the page's ETag, so a browser revalidating gets a 304
+
+Brotli is used when the `brotli` package is installed and the client accepts it;
+otherwise gzip. An existing strong ETag is made weak on compressed responses
+(If-None-Match still matches it; byte ranges no longer apply).
+
+    COMPRESSION_ENABLED=0       # off (e.g. when a proxy in front compresses)
+    COMPRESS_MIN_SIZE=500
+    COMPRESS_BR_QUALITY=5       # COMPRESS_CACHED_BR_QUALITY=9 for cached pages
+    COMPRESS_GZIP_LEVEL=6
+    COMPRESS_CACHE_MB=32
+"""
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+
+from .config import env_bool, env_int
+from .metrics import record_cache
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = frozenset({
+    "text/html",
+    "text/csv",
+    "text/plain",
+    "text/css",
+    "text/calendar",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+})
+# rendered pages identical for every viewer of the same URL: compressed once, ETag'd
+CACHED_ENDPOINTS = frozenset({
+    "schedule.biweekly_home",
+    "schedule.biweekly_by_unit",
+    "schedule.biweekly_by_staff",
+    "schedule.day_card",
+})
+
+
+class _CompressedCache:
+    """LRU of compressed bodies, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items: OrderedDict = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key, body: bytes) -> None:
+        if len(body) > self.max_bytes // 8:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self._bytes -= len(old)
+
+
+_cache = _CompressedCache(env_int("COMPRESS_CACHE_MB", 32) * 1024 * 1024)
+
+
+def choose_encoding(accept_encodings) -> str | None:
+    """"br", "gzip" or None (identity), honouring q-values; brotli wins a tie."""
+    best, best_q = None, 0.0
+    for encoding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        q = accept_encodings[encoding]  # 0 when absent; "*" counts
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        quality = env_int("COMPRESS_CACHED_BR_QUALITY", 9) if cached else env_int("COMPRESS_BR_QUALITY", 5)
+        return brotli.compress(data, quality=quality)
+    compressor = zlib.compressobj(env_int("COMPRESS_GZIP_LEVEL", 6), zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding: str):
+    """Compress an iterable of chunks as it goes; closes the source like WSGI would."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=env_int("COMPRESS_BR_QUALITY", 5))
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(env_int("COMPRESS_GZIP_LEVEL", 6), zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            out = process(chunk)
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def _compressible(response) -> bool:
+    if response.status_code != 200 or "Content-Encoding" in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return False  # includes text/event-stream, application/zip, images, PDFs
+    if "no-transform" in (response.headers.get("Cache-Control") or ""):
+        return False
+    return True
+
+
+def _compress_response(response):
+    if request.method == "HEAD" or not _compressible(response):
+        return response
+    response.vary.add("Accept-Encoding")
+
+    encoding = choose_encoding(request.accept_encodings)
+    streamed = response.is_streamed or response.direct_passthrough
+    cached = request.endpoint in CACHED_ENDPOINTS and not streamed
+
+    if cached:
+        body = response.get_data()
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        response.set_etag(digest)
+        response.headers.setdefault("Cache-Control", "private, no-cache")
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+        if encoding is None or len(body) < env_int("COMPRESS_MIN_SIZE", 500):
+            return response
+        key = (digest, encoding)
+        compressed = _cache.get(key)
+        record_cache("compressed_pages", compressed is not None)
+        if compressed is None:
+            compressed = compress(body, encoding, cached=True)
+            _cache.put(key, compressed)
+        response.set_data(compressed)
+    elif encoding is None:
+        return response
+    elif streamed:
+        if response.content_length is not None and response.content_length < env_int("COMPRESS_MIN_SIZE", 500):
+            return response  # a small file download
+        response.direct_passthrough = False
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < env_int("COMPRESS_MIN_SIZE", 500):
+            return response
+        response.set_data(compress(body, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    response.headers.pop("Accept-Ranges", None)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app) -> None:
+    if not env_bool("COMPRESSION_ENABLED", True):
+        return
+    app.after_request(_compress_response)
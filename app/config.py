@@ -1,6 +1,92 @@
 import os
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///staff_scheduler.db")
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+def database_url(name: str) -> str:
+    """A database URL from the environment, with Heroku-style postgres:// fixed up."""
+    url = os.getenv(name, "").strip()
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
+# ------------------
+# Engine tuning (set DB_ENGINE_TUNING=0 to get SQLAlchemy/driver defaults back)
+# ------------------
+def tuning_enabled() -> bool:
+    return env_bool("DB_ENGINE_TUNING", True)
+
+
+def sqlite_pragmas(db_url: str) -> dict[str, str]:
+    """PRAGMAs applied to every new SQLite connection."""
+    pragmas = {
+        "busy_timeout": str(env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "cache_size": str(env_int("SQLITE_CACHE_SIZE_KIB", 65536) * -1),  # negative => KiB
+        "temp_store": "MEMORY",
+    }
+    url = make_url(db_url)
+    if url.database and url.database != ":memory:":
+        # WAL: readers don't block the writer (or each other); NORMAL is durable in WAL mode
+        pragmas["journal_mode"] = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+        pragmas["synchronous"] = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+        pragmas["mmap_size"] = str(env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    return pragmas
+
+
+def engine_options(db_url: str) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured backend."""
+    if not tuning_enabled():
+        return {}
+
+    backend = make_url(db_url).get_backend_name()
+    if backend == "postgresql":
+        options = {
+            "pool_size": env_int("DB_POOL_SIZE", 5),
+            "max_overflow": env_int("DB_MAX_OVERFLOW", 10),
+            "pool_timeout": env_int("DB_POOL_TIMEOUT", 30),
+            "pool_recycle": env_int("DB_POOL_RECYCLE", 1800),
+            "pool_pre_ping": env_bool("DB_POOL_PRE_PING", True),
+        }
+        statement_timeout = env_int("DB_STATEMENT_TIMEOUT_MS", 15000)
+        if statement_timeout:
+            options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+        return options
+
+    return {}
+
+
+def configure_engine(engine, db_url: str) -> None:
+    """Attach per-connection setup to an engine created from db_url."""
+    if not tuning_enabled() or engine.dialect.name != "sqlite":
+        return
+
+    pragmas = sqlite_pragmas(db_url)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
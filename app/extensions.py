@@ -1,8 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_login import LoginManager
 
-db = SQLAlchemy()
-migrate = Migrate()
+from .replica import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 login_manager = LoginManager()
 login_manager.login_view = "auth.login"
\ No newline at end of file
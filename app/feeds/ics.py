@@ -0,0 +1,81 @@
+"""
+Minimal RFC 5545 writer for the staff/unit feeds.
+
+Times are floating (no TZID): the app stores naive local times, and a shift that
+starts at 07:00 should show at 07:00 on whatever phone subscribes to it.
+"""
+from datetime import datetime
+
+PRODID = "-//StaffScheduler//Shift feed//EN"
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold to 75-octet lines (continuations start with a space), never inside a UTF-8 sequence."""
+    data = line.encode("utf-8")
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+        limit = 74
+    parts.append(data.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def local(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def utc(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def vevent(
+    uid: str,
+    start: datetime,
+    end: datetime,
+    summary: str,
+    stamp: datetime,
+    description: str | None = None,
+    rrule: str | None = None,
+    exdates=(),
+    recurrence_id: datetime | None = None,
+) -> list[str]:
+    lines = ["BEGIN:VEVENT", f"UID:{uid}", f"DTSTAMP:{utc(stamp)}"]
+    if recurrence_id is not None:
+        lines.append(f"RECURRENCE-ID:{local(recurrence_id)}")
+    lines += [f"DTSTART:{local(start)}", f"DTEND:{local(end)}", f"SUMMARY:{_escape(summary)}"]
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    if exdates:
+        lines.append("EXDATE:" + ",".join(local(d) for d in sorted(exdates)))
+    lines.append("END:VEVENT")
+    return lines
+
+
+def calendar(name: str, events: list[list[str]]) -> str:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+        "REFRESH-INTERVAL;VALUE=DURATION:PT15M",
+    ]
+    for event in events:
+        lines.extend(event)
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
@@ -0,0 +1,220 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from flask import Response, abort, flash, redirect, render_template, request, url_for
+from flask_login import login_required
+from sqlalchemy.orm import joinedload
+from werkzeug.http import is_resource_modified
+
+from . import feeds_bp
+from .ics import calendar, vevent
+from .versions import KINDS, feed_for, issue_token
+from ..archive import archived_assignments, merged
+from ..extensions import db
+from ..models import Assignment, AssignmentArchive, CalendarFeed, RecurringAssignment, Staff, Unit
+
+FEED_PAST_DAYS = 60
+FEED_FUTURE_DAYS = 180
+
+# days_mask bit i is date.weekday() == i (Mon=1 ... Sun=64), same as the recurring forms
+BYDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+def _owner(kind: str, entity_id: int):
+    model = Staff if kind == "staff" else Unit
+    return db.session.get(model, entity_id)
+
+
+def _owner_name(kind: str, owner) -> str:
+    return owner.full_name if kind == "staff" else owner.unit_name
+
+
+def _window(today: date) -> tuple[datetime, datetime]:
+    return (
+        datetime.combine(today - timedelta(days=FEED_PAST_DAYS), time.min),
+        datetime.combine(today + timedelta(days=FEED_FUTURE_DAYS), time.min),
+    )
+
+
+def _shift_times(d: date, start_hhmm: str, end_hhmm: str) -> tuple[datetime, datetime]:
+    start = datetime.combine(d, time.fromisoformat(start_hhmm))
+    end = datetime.combine(d, time.fromisoformat(end_hhmm))
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+
+def _window_assignments(kind: str, entity_id: int, start_dt: datetime, end_dt: datetime, include_canceled: bool):
+    hot_owner = Assignment.staff_id if kind == "staff" else Assignment.unit_id
+    q = (
+        Assignment.query
+        .options(joinedload(Assignment.staff), joinedload(Assignment.unit))
+        .filter(hot_owner == entity_id, Assignment.start_datetime < end_dt, Assignment.end_datetime > start_dt)
+    )
+    if not include_canceled:
+        q = q.filter(Assignment.not_canceled())
+    cold_owner = AssignmentArchive.staff_id if kind == "staff" else AssignmentArchive.unit_id
+    return merged(q.order_by(Assignment.start_datetime.asc()).all(), archived_assignments(
+        start_dt,
+        cold_owner == entity_id,
+        AssignmentArchive.start_datetime < end_dt,
+        AssignmentArchive.end_datetime > start_dt,
+        include_canceled=include_canceled,
+    ))
+
+
+def _assignment_event(kind: str, a, stamp: datetime, recurrence_id: datetime | None = None, uid: str | None = None):
+    summary = a.unit.unit_name if kind == "staff" else a.staff.full_name
+    details = [a.status]
+    if a.request_id:
+        details.append(f"Request #{a.request_id}")
+    if a.notes:
+        details.append(a.notes)
+    return vevent(
+        uid or f"assignment-{a.id}@staffscheduler",
+        a.start_datetime,
+        a.end_datetime,
+        summary,
+        stamp,
+        description="\n".join(details),
+        recurrence_id=recurrence_id,
+    )
+
+
+def _rule_events(kind: str, entity_id: int, rows: list, start_dt: datetime, stamp: datetime):
+    """
+    One recurring VEVENT per active rule (BYDAY straight from days_mask), starting at
+    the first matching day in the window. Occurrences the generator already wrote
+    become overrides (RECURRENCE-ID) or, when canceled, EXDATEs. Rule days up to the
+    last generated occurrence that have no row (the generator skipped them as
+    overlaps, or they were removed) are EXDATEs too; later days are the rule's
+    projection. Returns the events and the assignment rows they account for.
+    """
+    owner = RecurringAssignment.staff_id if kind == "staff" else RecurringAssignment.unit_id
+    rules = RecurringAssignment.query.filter(
+        owner == entity_id,
+        RecurringAssignment.is_active.is_(True),
+        RecurringAssignment.days_mask != 0,
+        (RecurringAssignment.end_date.is_(None)) | (RecurringAssignment.end_date >= start_dt.date()),
+    ).all()
+
+    events, covered = [], set()
+    for rule in rules:
+        d = max(rule.start_date, start_dt.date())
+        while not rule.days_mask & (1 << d.weekday()):
+            d += timedelta(days=1)
+        if rule.end_date and d > rule.end_date:
+            continue
+
+        uid = f"recurring-assignment-{rule.id}@staffscheduler"
+        name = rule.unit.unit_name if kind == "staff" else rule.staff.full_name
+        parts = ["FREQ=WEEKLY", "BYDAY=" + ",".join(c for i, c in enumerate(BYDAY_CODES) if rule.days_mask & (1 << i))]
+        if rule.end_date:
+            parts.append(f"UNTIL={rule.end_date:%Y%m%d}T235959")
+
+        exdates, overrides, generated = [], [], set()
+        for a in rows:
+            if a.recurring_id != rule.id or a.occurrence_date is None:
+                continue
+            covered.add(a.id)
+            generated.add(a.occurrence_date)
+            original, _ = _shift_times(a.occurrence_date, rule.start_time, rule.end_time)
+            if a.status == "Canceled":
+                exdates.append(original)
+            else:
+                overrides.append(_assignment_event(kind, a, stamp, recurrence_id=original, uid=uid))
+
+        # rule days the generator passed without writing a row have no shift
+        day, last = d, max(generated, default=d)
+        while day < last:
+            if rule.days_mask & (1 << day.weekday()) and day not in generated:
+                exdates.append(_shift_times(day, rule.start_time, rule.end_time)[0])
+            day += timedelta(days=1)
+
+        start, end = _shift_times(d, rule.start_time, rule.end_time)
+        events.append(vevent(
+            uid, start, end, name, stamp,
+            description=rule.notes, rrule=";".join(parts), exdates=exdates,
+        ))
+        events.extend(overrides)
+    return events, covered
+
+
+@feeds_bp.get("/<token>.ics")
+def calendar_feed(token):
+    """
+    Public, token-protected iCalendar feed. While nothing changed, a poll costs
+    the token lookup only: ETag/Last-Modified come from the feed's change version,
+    plus the day (the window slides daily).
+    """
+    feed = CalendarFeed.query.filter_by(token=token).first()
+    if feed is None:
+        abort(404)
+
+    with_rules = request.args.get("rrule") == "1"
+    today = date.today()
+    etag = f"{feed.kind}-{feed.entity_id}-v{feed.version}-{today:%Y%m%d}{'-rrule' if with_rules else ''}"
+    last_modified = max(
+        feed.changed_at.replace(tzinfo=timezone.utc),
+        datetime.combine(today, time.min).astimezone(timezone.utc),
+    )
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        owner = _owner(feed.kind, feed.entity_id)
+        if owner is None:
+            abort(404)
+        start_dt, end_dt = _window(today)
+        stamp = feed.changed_at
+
+        rows = _window_assignments(feed.kind, feed.entity_id, start_dt, end_dt, include_canceled=with_rules)
+        events, covered = _rule_events(feed.kind, feed.entity_id, rows, start_dt, stamp) if with_rules else ([], set())
+        events += [
+            _assignment_event(feed.kind, a, stamp)
+            for a in rows
+            if a.id not in covered and a.status != "Canceled"
+        ]
+
+        response = Response(
+            calendar(_owner_name(feed.kind, owner), events),
+            mimetype="text/calendar",
+            headers={"Content-Disposition": f'inline; filename="{feed.kind}-{feed.entity_id}.ics"'},
+        )
+
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@feeds_bp.get("/<kind>/<int:entity_id>")
+@login_required
+def manage_feed(kind, entity_id):
+    if kind not in KINDS:
+        abort(404)
+    owner = _owner(kind, entity_id)
+    if owner is None:
+        abort(404)
+    feed = feed_for(kind, entity_id)
+    return render_template(
+        "feeds/manage.html",
+        kind=kind,
+        owner=owner,
+        owner_name=_owner_name(kind, owner),
+        feed=feed,
+        feed_url=url_for("feeds.calendar_feed", token=feed.token, _external=True) if feed else None,
+        past_days=FEED_PAST_DAYS,
+        future_days=FEED_FUTURE_DAYS,
+    )
+
+
+@feeds_bp.post("/<kind>/<int:entity_id>")
+@login_required
+def reset_feed(kind, entity_id):
+    if kind not in KINDS or _owner(kind, entity_id) is None:
+        abort(404)
+    existed = feed_for(kind, entity_id) is not None
+    issue_token(kind, entity_id)
+    db.session.commit()
+    flash("Feed link reset; the old link no longer works." if existed else "Calendar feed enabled.", "success")
+    return redirect(url_for("feeds.manage_feed", kind=kind, entity_id=entity_id))
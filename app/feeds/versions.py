@@ -0,0 +1,46 @@
+import secrets
+from datetime import datetime
+
+from sqlalchemy import and_, or_, update
+
+from ..extensions import db
+from ..models import CalendarFeed
+
+KINDS = ("staff", "unit")
+
+
+def touch_feeds(staff_ids=(), unit_ids=(), all_staff: bool = False, all_units: bool = False) -> None:
+    """
+    Bump the change version of the feeds showing these staff/units, in one UPDATE.
+    Runs in the caller's transaction, so the new version is visible exactly when
+    the write is. Entities without a feed have no row, and cost nothing.
+    """
+    conditions = []
+    for kind, ids, every in (("staff", staff_ids, all_staff), ("unit", unit_ids, all_units)):
+        ids = {i for i in ids if i}
+        if every:
+            conditions.append(CalendarFeed.kind == kind)
+        elif ids:
+            conditions.append(and_(CalendarFeed.kind == kind, CalendarFeed.entity_id.in_(ids)))
+    if not conditions:
+        return
+    db.session.execute(
+        update(CalendarFeed).where(or_(*conditions))
+        .values(version=CalendarFeed.version + 1, changed_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def feed_for(kind: str, entity_id: int) -> CalendarFeed | None:
+    return CalendarFeed.query.filter_by(kind=kind, entity_id=entity_id).first()
+
+
+def issue_token(kind: str, entity_id: int) -> CalendarFeed:
+    """Create the feed, or give it a new token (old subscription URLs stop working). Caller commits."""
+    feed = feed_for(kind, entity_id)
+    if feed is None:
+        feed = CalendarFeed(kind=kind, entity_id=entity_id, version=1)
+        db.session.add(feed)
+    feed.token = secrets.token_urlsafe(24)
+    feed.changed_at = datetime.utcnow()
+    return feed
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+imports_bp = Blueprint("imports", __name__, url_prefix="/import")
+
+from . import routes  # noqa: F401
@@ -0,0 +1,307 @@
+"""
+Streaming CSV import for assignments and requests.
+
+Columns (header row required, names case-insensitive, extra columns ignored):
+
+    assignments: staff, unit, date, start_time, end_time[, status][, notes]
+    requests:    unit, coordinator, staff_needed, date, start_time, end_time[, status][, notes]
+
+date is YYYY-MM-DD, times HH:MM (an end at or before the start rolls into the next day).
+Staff/unit names resolve through name->id maps loaded once up front; names shared by
+several rows (two "Ana Silva"s) are rejected as ambiguous. Assignments are checked
+against a per-staff interval index seeded with ONE query over the file's staff and
+date span (a cheap pre-pass over the file finds both), plus every row accepted so far.
+Each chunk is checked against the database once more after its staff are locked,
+which catches shifts booked by someone else while the import runs. Rows are inserted
+with Core executemany and committed every `chunk_size` rows; rejected rows are
+streamed to a CSV report (line number, reason, original columns) and only the first
+few are kept in memory for display.
+"""
+import csv
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from ..archive import archive_cutoff
+from ..assignments.locking import is_overlap_violation, lock_staff
+from ..extensions import db
+from ..feeds.versions import touch_feeds
+from ..live import note_change
+from ..models import Admin, Assignment, Request as StaffRequest, Staff, Unit
+from ..periods import locked_period
+from ..utils.intervals import IntervalIndex
+
+DEFAULT_CHUNK_SIZE = 5000
+REJECT_SAMPLE_SIZE = 200
+KINDS = ("assignments", "requests")
+
+REQUIRED_COLUMNS = {
+    "assignments": ("staff", "unit", "date", "start_time", "end_time"),
+    "requests": ("unit", "coordinator", "staff_needed", "date", "start_time", "end_time"),
+}
+ASSIGNMENT_STATUSES = {"scheduled": "Scheduled", "confirmed": "Confirmed"}
+REQUEST_STATUSES = {"open": "Open", "canceled": "Canceled"}
+
+
+class ImportFormatError(ValueError):
+    """The file as a whole can't be imported (bad header, unknown kind)."""
+
+
+class RowError(ValueError):
+    pass
+
+
+def _name_map(column) -> dict[str, int | None]:
+    """lower(name) -> id; None marks names that belong to more than one row."""
+    names: dict[str, int | None] = {}
+    for rid, name in db.session.query(column.class_.id, column):
+        key = name.strip().lower()
+        names[key] = None if key in names else rid
+    return names
+
+
+def _resolve(names: dict, value: str, what: str) -> int:
+    key = value.strip().lower()
+    if key not in names:
+        raise RowError(f"unknown {what} '{value.strip()}'")
+    if names[key] is None:
+        raise RowError(f"ambiguous {what} name '{value.strip()}'")
+    return names[key]
+
+
+# strptime dominates a 100k-row import; files repeat the same few dates and times
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_TIME = re.compile(r"^(\d{1,2}):(\d{2})$")
+
+
+@lru_cache(maxsize=4096)
+def _parse_day(value: str) -> date:
+    if not _DATE.match(value):
+        raise ValueError(value)
+    return date.fromisoformat(value)
+
+
+@lru_cache(maxsize=1024)
+def _parse_hhmm(value: str) -> tuple[int, int]:
+    m = _TIME.match(value)
+    if not m or int(m[1]) > 23 or int(m[2]) > 59:
+        raise ValueError(value)
+    return int(m[1]), int(m[2])
+
+
+def _window(row: dict) -> tuple[datetime, datetime]:
+    try:
+        d = _parse_day((row.get("date") or "").strip())
+        sh, sm = _parse_hhmm((row.get("start_time") or "").strip())
+        eh, em = _parse_hhmm((row.get("end_time") or "").strip())
+    except ValueError:
+        raise RowError("invalid date/time (want YYYY-MM-DD and HH:MM)")
+    start = datetime(d.year, d.month, d.day, sh, sm)
+    end = datetime(d.year, d.month, d.day, eh, em)
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+
+def _reader(stream) -> csv.DictReader:
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames:
+        raise ImportFormatError("empty file")
+    reader.fieldnames = [(f or "").strip().lower() for f in reader.fieldnames]
+    return reader
+
+
+class CsvImport:
+    def __init__(self, kind: str, admin_id: int, chunk_size: int = DEFAULT_CHUNK_SIZE, rejects_out=None):
+        if kind not in KINDS:
+            raise ImportFormatError(f"unknown import kind '{kind}'")
+        self.kind = kind
+        self.admin_id = admin_id
+        self.chunk_size = chunk_size
+        self.imported = 0
+        self.rejected = 0
+        self.reject_sample: list[dict] = []  # first REJECT_SAMPLE_SIZE of {"line", "reason", "row"}
+        self.fieldnames: list[str] = []
+        self._rejects_out = rejects_out
+        self._rejects_writer = None
+
+    # ------------------
+    # driver
+    # ------------------
+    def run(self, stream) -> "CsvImport":
+        """Import from a seekable text stream (read twice: pre-pass, then import)."""
+        start_pos = stream.tell()
+        reader = _reader(stream)
+        missing = [c for c in REQUIRED_COLUMNS[self.kind] if c not in reader.fieldnames]
+        if missing:
+            raise ImportFormatError(f"missing column(s): {', '.join(missing)}")
+        self.fieldnames = reader.fieldnames
+        if self._rejects_out is not None:
+            self._rejects_writer = csv.writer(self._rejects_out)
+            self._rejects_writer.writerow(["line", "reason", *self.fieldnames])
+
+        self.cutoff = archive_cutoff()
+        self.units = _name_map(Unit.unit_name)
+        if self.kind == "assignments":
+            self.staff = _name_map(Staff.full_name)
+            self.index = IntervalIndex()
+            self._seed_index(reader)
+            stream.seek(start_pos)
+            reader = _reader(stream)
+
+        now = datetime.utcnow()
+        buffer, buffer_lines = [], []
+        for row in reader:
+            line = reader.line_num
+            try:
+                buffer.append(self._parse(row, now))
+                buffer_lines.append((line, row))
+            except RowError as exc:
+                self._reject(line, str(exc), row)
+            if len(buffer) >= self.chunk_size:
+                self._flush(buffer, buffer_lines)
+                buffer, buffer_lines = [], []
+        self._flush(buffer, buffer_lines)
+        return self
+
+    def _seed_index(self, reader) -> None:
+        """Pre-pass: staff ids and date span in the file -> one query for their existing shifts."""
+        staff_ids, lo, hi = set(), None, None
+        for row in reader:
+            sid = self.staff.get((row.get("staff") or "").strip().lower())
+            try:
+                day = _parse_day((row.get("date") or "").strip())
+            except ValueError:
+                continue
+            if sid:
+                staff_ids.add(sid)
+            lo = day if lo is None or day < lo else lo
+            hi = day if hi is None or day > hi else hi
+        if not staff_ids:
+            return
+
+        rows = db.session.query(Assignment.staff_id, Assignment.start_datetime, Assignment.end_datetime).filter(
+            Assignment.staff_id.in_(staff_ids),
+            Assignment.not_canceled(),
+            Assignment.start_datetime < datetime.combine(hi + timedelta(days=2), datetime.min.time()),
+            Assignment.end_datetime > datetime.combine(lo - timedelta(days=1), datetime.min.time()),
+        )
+        for sid, start, end in rows:
+            self.index.add(sid, start, end)
+
+    # ------------------
+    # rows
+    # ------------------
+    def _parse(self, row: dict, now: datetime) -> dict:
+        if None in row:
+            raise RowError("more fields than header columns")
+        notes = (row.get("notes") or "").strip() or None
+        start, end = _window(row)
+        if self.cutoff and start < self.cutoff:
+            raise RowError(f"dates before {self.cutoff:%Y-%m-%d} are archived and read-only")
+        unit_id = _resolve(self.units, row.get("unit") or "", "unit")
+
+        if self.kind == "requests":
+            status = REQUEST_STATUSES.get((row.get("status") or "open").strip().lower())
+            if status is None:
+                raise RowError("status must be Open or Canceled")
+            coordinator = (row.get("coordinator") or "").strip()
+            if not coordinator:
+                raise RowError("coordinator is required")
+            try:
+                needed = int((row.get("staff_needed") or "").strip())
+            except ValueError:
+                raise RowError("staff_needed must be a whole number")
+            if needed < 1:
+                raise RowError("staff_needed must be at least 1")
+            return {
+                "unit_id": unit_id, "coordinator_name": coordinator, "staff_needed": needed,
+                "start_datetime": start, "end_datetime": end, "status": status, "filled_count": 0,
+                "notes": notes, "created_by_admin_id": self.admin_id, "created_at": now,
+            }
+
+        status = ASSIGNMENT_STATUSES.get((row.get("status") or "scheduled").strip().lower())
+        if status is None:
+            raise RowError("status must be Scheduled or Confirmed")
+        period = locked_period(start.date())
+        if period is not None:
+            raise RowError(f"the bi-week starting {period:%Y-%m-%d} is published and read-only")
+        staff_id = _resolve(self.staff, row.get("staff") or "", "staff")
+        if self.index.overlaps(staff_id, start, end):
+            raise RowError("overlaps an existing or earlier-imported shift for this staff")
+        self.index.add(staff_id, start, end)
+        return {
+            "staff_id": staff_id, "unit_id": unit_id, "request_id": None,
+            "start_datetime": start, "end_datetime": end, "status": status,
+            "notes": notes, "created_by_admin_id": self.admin_id, "created_at": now,
+        }
+
+    def _flush(self, rows: list[dict], lines: list) -> None:
+        if not rows:
+            return
+        model = Assignment if self.kind == "assignments" else StaffRequest
+        if self.kind == "assignments":
+            lock_staff(*{r["staff_id"] for r in rows})
+            rows, lines = self._recheck(rows, lines)
+            if not rows:
+                db.session.rollback()
+                return
+        db.session.execute(model.__table__.insert(), rows)
+        if self.kind == "assignments":
+            touch_feeds(staff_ids={r["staff_id"] for r in rows}, unit_ids={r["unit_id"] for r in rows})
+            for r in rows:
+                note_change("created", r["staff_id"], r["unit_id"], r["start_datetime"])
+        try:
+            db.session.commit()
+        except IntegrityError as exc:
+            db.session.rollback()
+            if not is_overlap_violation(exc):
+                raise
+            # backstop (Postgres constraint): reject the chunk, forget its spans, keep going
+            for r, (line, row) in zip(rows, lines):
+                self.index.remove(r["staff_id"], r["start_datetime"], r["end_datetime"])
+                self._reject(line, "overlaps a shift booked during the import (chunk not imported)", row)
+            return
+        self.imported += len(rows)
+
+    def _recheck(self, rows: list[dict], lines: list) -> tuple[list[dict], list]:
+        """
+        With the chunk's staff locked, check it against the database once more: a
+        shift booked after the index was seeded isn't in it, and SQLite has no
+        constraint to catch it at insert. One query per chunk; overlapping rows are
+        rejected (and dropped from the index), the rest go ahead.
+        """
+        booked = IntervalIndex()
+        for sid, start, end in db.session.query(
+            Assignment.staff_id, Assignment.start_datetime, Assignment.end_datetime
+        ).filter(
+            Assignment.staff_id.in_({r["staff_id"] for r in rows}),
+            Assignment.not_canceled(),
+            Assignment.start_datetime < max(r["end_datetime"] for r in rows),
+            Assignment.end_datetime > min(r["start_datetime"] for r in rows),
+        ):
+            booked.add(sid, start, end)
+
+        kept_rows, kept_lines = [], []
+        for r, (line, row) in zip(rows, lines):
+            if booked.overlaps(r["staff_id"], r["start_datetime"], r["end_datetime"]):
+                self.index.remove(r["staff_id"], r["start_datetime"], r["end_datetime"])
+                self._reject(line, "overlaps a shift booked during the import", row)
+            else:
+                kept_rows.append(r)
+                kept_lines.append((line, row))
+        return kept_rows, kept_lines
+
+    def _reject(self, line: int, reason: str, row: dict) -> None:
+        self.rejected += 1
+        if len(self.reject_sample) < REJECT_SAMPLE_SIZE:
+            self.reject_sample.append({"line": line, "reason": reason, "row": row})
+        if self._rejects_writer is not None:
+            self._rejects_writer.writerow([line, reason, *((row.get(f) or "") for f in self.fieldnames)])
+
+
+def default_admin_id() -> int | None:
+    return db.session.query(func.min(Admin.id)).filter(Admin.is_active.is_(True)).scalar()
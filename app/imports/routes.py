@@ -0,0 +1,85 @@
+import io
+import os
+import re
+import time
+import uuid
+
+from flask import abort, current_app, flash, redirect, render_template, request, send_from_directory, url_for
+from flask_login import current_user, login_required
+
+from . import imports_bp
+from .csv_import import KINDS, REQUIRED_COLUMNS, CsvImport, ImportFormatError
+
+REJECTS_NAME = re.compile(r"^rejects-[0-9a-f]{32}\.csv$")
+REJECTS_KEEP_SECONDS = 7 * 24 * 3600
+
+
+def rejects_dir() -> str:
+    path = os.path.join(current_app.instance_path, "imports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def prune_rejects() -> None:
+    """Drop rejected-row reports older than a week."""
+    cutoff = time.time() - REJECTS_KEEP_SECONDS
+    for entry in os.scandir(rejects_dir()):
+        if REJECTS_NAME.match(entry.name) and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+
+
+@imports_bp.get("/")
+@login_required
+def upload_form():
+    return render_template("imports/upload.html", kinds=KINDS, columns=REQUIRED_COLUMNS, result=None)
+
+
+@imports_bp.post("/")
+@login_required
+def upload():
+    kind = request.form.get("kind")
+    upload = request.files.get("file")
+    if kind not in KINDS:
+        flash("Pick what the file contains.", "danger")
+        return redirect(url_for("imports.upload_form"))
+    if not upload or not upload.filename:
+        flash("Choose a CSV file.", "danger")
+        return redirect(url_for("imports.upload_form"))
+
+    prune_rejects()
+    rejects_name = f"rejects-{uuid.uuid4().hex}.csv"
+    rejects_path = os.path.join(rejects_dir(), rejects_name)
+    started = time.perf_counter()
+    try:
+        # werkzeug spools large uploads to a temp file, so the stream is seekable and never fully in memory
+        stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+        with open(rejects_path, "w", newline="") as out:
+            job = CsvImport(kind, admin_id=current_user.id, rejects_out=out).run(stream)
+    except (ImportFormatError, UnicodeDecodeError) as exc:
+        os.remove(rejects_path)
+        flash(f"Import failed: {exc}", "danger")
+        return redirect(url_for("imports.upload_form"))
+
+    if not job.rejected:
+        os.remove(rejects_path)
+    result = {
+        "kind": kind,
+        "filename": upload.filename,
+        "imported": job.imported,
+        "rejected": job.rejected,
+        "sample": job.reject_sample,
+        "fieldnames": job.fieldnames,
+        "seconds": time.perf_counter() - started,
+        "rejects_name": rejects_name if job.rejected else None,
+    }
+    flash(f"Imported {job.imported} {kind}; {job.rejected} row(s) rejected.",
+          "success" if not job.rejected else "warning")
+    return render_template("imports/upload.html", kinds=KINDS, columns=REQUIRED_COLUMNS, result=result)
+
+
+@imports_bp.get("/rejects/<name>")
+@login_required
+def download_rejects(name):
+    if not REJECTS_NAME.match(name):
+        abort(404)
+    return send_from_directory(rejects_dir(), name, as_attachment=True, mimetype="text/csv")
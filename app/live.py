@@ -0,0 +1,246 @@
+"""
+Live schedule updates over Server-Sent Events.
+
+Write paths call note_change() for every assignment they create, move or cancel;
+the changes ride on db.session and are published only after a successful commit
+(a rollback drops them). Open bi-week pages listen on /schedule/events and
+re-fetch just the day cards a change touches.
+
+Fan-out is an in-process Broadcaster. That is enough for one process (dev server,
+one gunicorn worker with threads). With several workers, set
+
+    LIVE_UPDATES_RELAY=sqlite           # publish through instance/live_events.db
+    LIVE_UPDATES_RELAY_PATH=...         # optional: another file on the same host
+
+and every process tails the shared file into its own Broadcaster, so event ids
+are global and a reconnecting browser can resume on any worker.
+
+Each open stream holds a worker thread, so streams are short and capped:
+
+    LIVE_STREAM_SECONDS=25      # then a clean close; EventSource reconnects with
+                                # Last-Event-ID and misses nothing
+    LIVE_MAX_STREAMS=...        # per process (0: no cap); gunicorn.conf.py sets half
+                                # the threads. Over the cap a stream closes at once
+                                # and asks the browser to retry in FULL_RETRY_MS.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import event
+
+from .config import env_int
+from .extensions import db
+
+BUFFER_SIZE = 1000
+MAX_CHANGES_PER_EVENT = 500  # beyond this, pages just reload every card
+HEARTBEAT_SECONDS = 15
+FULL_RETRY_MS = 30000
+PENDING_KEY = "live_changes"
+
+
+class Broadcaster:
+    """
+    Fan-out to every open stream of this process. Keeps the last BUFFER_SIZE events
+    so a reconnecting browser (Last-Event-ID) gets what it missed.
+    """
+
+    def __init__(self, size: int = BUFFER_SIZE):
+        self._cond = threading.Condition()
+        self._events: deque = deque(maxlen=size)  # (seq, payload)
+        self._seq = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def advance(self, seq: int) -> None:
+        """Continue numbering from `seq` (the relay's ids) without emitting anything."""
+        with self._cond:
+            self._seq = max(self._seq, seq)
+
+    def publish(self, payload: str, seq: int | None = None) -> int:
+        with self._cond:
+            self._seq = seq if seq is not None else self._seq + 1
+            self._events.append((self._seq, payload))
+            self._cond.notify_all()
+            return self._seq
+
+    def since(self, after: int, timeout: float) -> tuple[list, bool]:
+        """
+        (events after `after`, missed): waits up to `timeout` if there are none yet.
+        `missed` means some events after `after` are no longer buffered.
+        """
+        with self._cond:
+            if self._seq <= after:
+                self._cond.wait(timeout)
+            newer = [(s, p) for s, p in self._events if s > after]
+            missed = self._seq > after and (not newer or newer[0][0] > after + 1)
+            return newer, missed
+
+
+class SqliteRelay:
+    """
+    Cross-process fan-out through a small SQLite file: publishers INSERT a row,
+    every process tails the table into its Broadcaster. Rows older than
+    `keep_seconds` are pruned by publishers.
+    """
+
+    def __init__(self, path: str, broadcaster: Broadcaster, poll: float = 0.25, keep_seconds: int = 600):
+        self.path = path
+        self.broadcaster = broadcaster
+        self.poll = poll
+        self.keep_seconds = keep_seconds
+        self._local = threading.local()
+        self._tail_pid = None
+        self._lock = threading.Lock()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS live_events ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def publish(self, payload: str) -> None:
+        conn = self._connect()
+        now = time.time()
+        cur = conn.execute("INSERT INTO live_events (payload, created_at) VALUES (?, ?)", (payload, now))
+        if cur.lastrowid % 100 == 0:
+            conn.execute("DELETE FROM live_events WHERE created_at < ?", (now - self.keep_seconds,))
+
+    def ensure_tailing(self) -> None:
+        """Start this process's tail thread (lazily: threads don't survive a fork)."""
+        if self._tail_pid == os.getpid():
+            return
+        with self._lock:
+            if self._tail_pid == os.getpid():
+                return
+            self._tail_pid = os.getpid()
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            last = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM live_events").fetchone()[0]
+            self.broadcaster.advance(last)  # ids are the relay's from here on
+            threading.Thread(target=self._tail, args=(conn, last), name="live-relay", daemon=True).start()
+
+    def _tail(self, conn: sqlite3.Connection, last: int) -> None:
+        while True:
+            try:
+                rows = conn.execute(
+                    "SELECT seq, payload FROM live_events WHERE seq > ? ORDER BY seq", (last,)
+                ).fetchall()
+            except sqlite3.OperationalError:
+                rows = []
+            for seq, payload in rows:
+                self.broadcaster.publish(payload, seq=seq)
+                last = seq
+            time.sleep(self.poll)
+
+
+broadcaster = Broadcaster()
+_relay: SqliteRelay | None = None
+_slots: threading.BoundedSemaphore | None = None  # LIVE_MAX_STREAMS, set by init_live()
+
+
+# ------------------
+# publishing
+# ------------------
+def note_change(op: str, staff_id: int, unit_id: int, start: datetime) -> None:
+    """Queue one change ("created"/"updated"/"canceled") for publication after db.session commits."""
+    db.session.info.setdefault(PENDING_KEY, []).append(
+        {"op": op, "staff": staff_id, "unit": unit_id, "date": start.date().isoformat()}
+    )
+
+
+def publish(changes: list[dict]) -> None:
+    if len(changes) > MAX_CHANGES_PER_EVENT:
+        changes = [{"op": "many"}]
+    payload = json.dumps(changes, separators=(",", ":"))
+    if _relay is not None:
+        _relay.publish(payload)
+    else:
+        broadcaster.publish(payload)
+
+
+def _after_commit(session):
+    changes = session.info.pop(PENDING_KEY, None)
+    if changes:
+        publish(changes)
+
+
+def _after_rollback(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+# ------------------
+# streaming
+# ------------------
+def _relevant(changes: list[dict], unit_id: int | None, staff_id: int | None) -> list[dict]:
+    return [
+        c for c in changes
+        if c["op"] == "many"
+        or ((unit_id is None or c["unit"] == unit_id) and (staff_id is None or c["staff"] == staff_id))
+    ]
+
+
+def stream(unit_id: int | None = None, staff_id: int | None = None, last_id: int | None = None):
+    """SSE body: this page's changes as JSON lists, heartbeats, then a clean close for the browser to reconnect."""
+    # taken on the first iteration, not before: close() on an unstarted generator skips `finally`
+    if _slots is not None and not _slots.acquire(blocking=False):
+        yield f"retry: {FULL_RETRY_MS}\n\n"
+        return
+    try:
+        yield from _stream(unit_id, staff_id, last_id)
+    finally:
+        if _slots is not None:
+            _slots.release()
+
+
+def _stream(unit_id: int | None, staff_id: int | None, last_id: int | None):
+    if _relay is not None:
+        _relay.ensure_tailing()
+    deadline = time.monotonic() + env_int("LIVE_STREAM_SECONDS", 25)
+
+    # unknown/old ids (another process without the relay, a restart): start from now
+    after = last_id if last_id is not None and last_id <= broadcaster.last_seq else broadcaster.last_seq
+    yield f"retry: 3000\nid: {after}\n\n"
+
+    while time.monotonic() < deadline:
+        wait = min(HEARTBEAT_SECONDS, max(deadline - time.monotonic(), 0.1))
+        events, missed = broadcaster.since(after, timeout=wait)
+        if missed:
+            # fell out of the buffer: the page refreshes every card instead
+            after = broadcaster.last_seq
+            yield f"id: {after}\ndata: {json.dumps([{'op': 'many'}])}\n\n"
+            continue
+        if not events:
+            yield ": keep-alive\n\n"
+            continue
+        for seq, payload in events:
+            after = seq
+            changes = _relevant(json.loads(payload), unit_id, staff_id)
+            if changes:
+                yield f"id: {seq}\ndata: {json.dumps(changes, separators=(',', ':'))}\n\n"
+
+
+def init_live(app, session_class) -> None:
+    global _relay, _slots
+    if not event.contains(session_class, "after_commit", _after_commit):
+        event.listen(session_class, "after_commit", _after_commit)
+        event.listen(session_class, "after_rollback", _after_rollback)
+
+    if os.getenv("LIVE_UPDATES_RELAY", "").strip().lower() == "sqlite":
+        path = os.getenv("LIVE_UPDATES_RELAY_PATH") or os.path.join(app.instance_path, "live_events.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _relay = SqliteRelay(path, broadcaster)
+
+    max_streams = env_int("LIVE_MAX_STREAMS", 0)
+    _slots = threading.BoundedSemaphore(max_streams) if max_streams > 0 else None
@@ -0,0 +1,207 @@
+"""
+Landing-page counters, computed with two aggregate queries and cached per process.
+
+- one pass over open requests: open (not yet over), unfilled today, unfilled for
+  the rest of the Fri→Thu week, and the staff still missing for those
+- one pass over the current bi-week's live assignments: staff on shift right now
+  and hours scheduled this bi-week (shifts counted by start day, as on the schedule)
+
+The result is fresh for DASHBOARD_TTL_SECONDS (default 30) and goes stale as soon
+as this process commits a write touching assignments or requests. Other worker
+processes notice such writes after their own TTL at most. A stale entry is
+recomputed by one request at a time while every other request keeps getting the
+stale entry without waiting; only when there is nothing to serve at all (first
+request, new day) do they wait for that computation.
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from itertools import chain
+
+from sqlalchemy import and_, case, event, extract, func, literal, select
+
+from ..archive import reaches_archive
+from ..config import env_int
+from ..extensions import db
+from ..metrics import record_cache
+from ..models import Assignment, AssignmentArchive, Request as StaffRequest
+from ..schedule.routes import biweek_start_from_anchor, dt_start, week_start_friday
+
+REFRESH_WAIT_SECONDS = 10
+
+_lock = threading.Lock()  # guards _refreshing only; never held across a query
+_cached: tuple[float, date, int, dict] | None = None  # (expires, day, generation, counters)
+_refreshing: threading.Event | None = None  # set when the in-flight computation ends
+_generation = 0
+
+
+def _seconds(model, dialect: str):
+    """end - start in seconds, per dialect."""
+    if dialect == "postgresql":
+        return extract("epoch", model.end_datetime - model.start_datetime)
+    return (func.julianday(model.end_datetime) - func.julianday(model.start_datetime)) * 86400
+
+
+def _request_counters(now: datetime, today: date) -> dict:
+    tomorrow = dt_start(today + timedelta(days=1))
+    week_end = dt_start(week_start_friday(today) + timedelta(days=7))
+    short = StaffRequest.staff_needed - StaffRequest.filled_count
+    unfilled = StaffRequest.filled_count < StaffRequest.staff_needed
+
+    def when(*conds, then=1):
+        return func.coalesce(func.sum(case((and_(unfilled, *conds), then), else_=0)), 0)
+
+    row = db.session.execute(
+        select(
+            func.count(),
+            when(StaffRequest.start_datetime < tomorrow),
+            when(StaffRequest.start_datetime < tomorrow, then=short),
+            when(StaffRequest.start_datetime < week_end),
+            when(StaffRequest.start_datetime < week_end, then=short),
+        )
+        .select_from(StaffRequest)
+        .where(StaffRequest.is_open(), StaffRequest.end_datetime > now)
+    ).one()
+    return {
+        "open_requests": row[0],
+        "unfilled_today": row[1],
+        "short_today": row[2],
+        "unfilled_week": row[3],
+        "short_week": row[4],
+    }
+
+
+def _assignment_counters(now: datetime, today: date) -> dict:
+    bw_start = biweek_start_from_anchor(today)
+    start_dt, end_dt = dt_start(bw_start), dt_start(bw_start + timedelta(days=14))
+    dialect = db.session.get_bind().dialect.name
+
+    row = db.session.execute(
+        select(
+            func.count(func.distinct(case(
+                (and_(Assignment.start_datetime <= now, Assignment.end_datetime > now), Assignment.staff_id),
+            ))),
+            func.coalesce(func.sum(case(
+                (Assignment.start_datetime >= start_dt, _seconds(Assignment, dialect)), else_=literal(0),
+            )), 0),
+        )
+        .where(
+            Assignment.not_canceled(),
+            Assignment.start_datetime < end_dt,
+            Assignment.end_datetime > start_dt,
+        )
+    ).one()
+    seconds = float(row[1])
+
+    if reaches_archive(start_dt):  # only right after `flask archive --before <this bi-week>`
+        seconds += float(db.session.execute(
+            select(func.coalesce(func.sum(_seconds(AssignmentArchive, dialect)), 0)).where(
+                AssignmentArchive.not_canceled(),
+                AssignmentArchive.start_datetime >= start_dt,
+                AssignmentArchive.start_datetime < end_dt,
+            )
+        ).scalar())
+
+    return {
+        "on_shift": row[0],
+        "biweek_start": bw_start,
+        "biweek_end": bw_start + timedelta(days=13),
+        "biweek_hours": round(seconds / 3600, 2),
+    }
+
+
+def compute(now: datetime | None = None) -> dict:
+    """All counters, straight from the database."""
+    now = now or datetime.now().replace(microsecond=0)
+    today = now.date()
+    return {
+        **_request_counters(now, today),
+        **_assignment_counters(now, today),
+        "as_of": now,
+    }
+
+
+def counters() -> dict:
+    """Cached counters; recomputed after the TTL, a relevant write, or midnight."""
+    global _cached, _refreshing
+    today = date.today()
+    entry = _cached
+    if entry and entry[0] > time.monotonic() and entry[1] == today and entry[2] == _generation:
+        record_cache("dashboard", True)
+        return entry[3]
+
+    with _lock:
+        refreshing = _refreshing
+        if refreshing is None:
+            refreshing = _refreshing = threading.Event()
+            leader = True
+        else:
+            leader = False
+
+    if not leader:
+        # someone is already recomputing: serve today's stale entry, or wait for theirs
+        if entry is None or entry[1] != today:
+            refreshing.wait(REFRESH_WAIT_SECONDS)
+            entry = _cached
+        if entry is not None and entry[1] == today:
+            record_cache("dashboard", True)
+            return entry[3]
+
+    record_cache("dashboard", False)
+    try:
+        generation = _generation
+        data = compute()
+        # a write committed while we were computing makes this entry stale at once
+        _cached = (time.monotonic() + env_int("DASHBOARD_TTL_SECONDS", 30), today, generation, data)
+        return data
+    finally:
+        if leader:
+            with _lock:
+                _refreshing = None
+            refreshing.set()
+
+
+def invalidate() -> None:
+    global _generation
+    # the entry stays: it is served (stale) while the next request recomputes it
+    _generation += 1
+
+
+# ------------------
+# Invalidation hooks
+# ------------------
+_DIRTY_KEY = "dashboard_dirty"
+_WATCHED = (Assignment, StaffRequest)
+_WATCHED_TABLES = frozenset({Assignment.__table__, StaffRequest.__table__})
+
+
+def _after_flush(session, flush_context):
+    if any(isinstance(obj, _WATCHED) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info[_DIRTY_KEY] = True
+
+
+def _on_execute(orm_execute_state):
+    # bulk statements (fill counters, the archiver, imports) skip the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if getattr(orm_execute_state.statement, "table", None) in _WATCHED_TABLES:
+            orm_execute_state.session.info[_DIRTY_KEY] = True
+
+
+def _after_commit(session):
+    if session.info.pop(_DIRTY_KEY, None):
+        invalidate()
+
+
+def _after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+def init_dashboard(session_class) -> None:
+    for name, fn in (
+        ("after_flush", _after_flush),
+        ("do_orm_execute", _on_execute),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(session_class, name, fn):
+            event.listen(session_class, name, fn)
@@ -7,7 +7,14 @@ def debug_db():
     from flask import current_app
     return current_app.config["SQLALCHEMY_DATABASE_URI"]
 
+@main_bp.route("/debug/sql")
+@login_required
+def debug_sql():
+    from ..profiling import enabled, report
+    return render_template("sql_profile.html", enabled=enabled(), **report())
+
 @main_bp.route("/")
 @login_required
 def dashboard():
-    return render_template("dashboard.html")
\ No newline at end of file
+    from .dashboard import counters
+    return render_template("dashboard.html", stats=counters())
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Prometheus metrics, exposed in text format at /metrics.
+
+- request counts and latency histograms labelled by blueprint/endpoint
+- DB pool checkout wait per engine
+- rows written (or skipped) by the recurring generators
+- cache hits/misses per named cache (hit rate = hits / (hits + misses))
+
+Multiple gunicorn workers: set PROMETHEUS_MULTIPROC_DIR to an empty, writable
+directory shared by the workers (it must exist before the app is imported).
+Each process then writes its samples to mmap'd files there and /metrics
+aggregates the whole directory, whichever worker serves the scrape. Empty the
+directory when the master starts, and call multiprocess.mark_process_dead(pid)
+from gunicorn's child_exit hook so dead workers' gauges are dropped.
+
+    METRICS_ENABLED=0           # no hooks, no /metrics route
+    METRICS_TOKEN=...           # require "Authorization: Bearer <token>" on /metrics
+    METRICS_PUBLIC=1            # serve /metrics to anyone (no token set)
+
+Without a token /metrics only answers direct loopback scrapes (127.0.0.1/::1,
+no X-Forwarded-For, so a reverse proxy on the same host doesn't open it up);
+anything else gets a 403 unless METRICS_PUBLIC is set.
+"""
+import hmac
+import os
+import time
+
+from flask import Response, abort, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+from .config import env_bool
+
+LOOPBACK = ("127.0.0.1", "::1")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+REQUESTS = Counter(
+    "staffscheduler_http_requests_total",
+    "HTTP requests by blueprint, endpoint, method and status code.",
+    ["blueprint", "endpoint", "method", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "staffscheduler_http_request_duration_seconds",
+    "Time to produce a response, by blueprint and endpoint.",
+    ["blueprint", "endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "staffscheduler_db_pool_checkout_seconds",
+    "Time spent waiting for a pooled DB connection (includes opening a new one).",
+    ["pool"],
+    buckets=POOL_WAIT_BUCKETS,
+)
+GENERATOR_ROWS = Counter(
+    "staffscheduler_recurring_generator_rows_total",
+    "Occurrences handled by the recurring generators.",
+    ["kind", "outcome"],  # kind: assignments/requests; outcome: created/skipped/conflict
+)
+CACHE_LOOKUPS = Counter(
+    "staffscheduler_cache_lookups_total",
+    "In-process cache lookups by cache name and result.",
+    ["cache", "result"],  # result: hit/miss
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_generated(kind: str, created: int = 0, skipped: int = 0, conflicts: int = 0) -> None:
+    for outcome, n in (("created", created), ("skipped", skipped), ("conflict", conflicts)):
+        if n:
+            GENERATOR_ROWS.labels(kind=kind, outcome=outcome).inc(n)
+
+
+# ------------------
+# DB pool checkout wait
+# ------------------
+def _instrument_pool(pool, name: str) -> None:
+    connect = pool.connect
+    histogram = POOL_CHECKOUT_WAIT.labels(pool=name)
+
+    def timed_connect():
+        t0 = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            histogram.observe(time.perf_counter() - t0)
+
+    pool.connect = timed_connect
+
+
+def instrument_engine(engine, name: str) -> None:
+    """Time pool checkouts on `engine`, including pools recreated by engine.dispose()."""
+    _instrument_pool(engine.pool, name)
+
+    @event.listens_for(engine, "engine_disposed")
+    def _reinstrument(eng):
+        _instrument_pool(eng.pool, name)
+
+
+# ------------------
+# Request hooks and /metrics
+# ------------------
+def _start_timer():
+    if request.environ.get("staffscheduler.warmup"):  # app/warmup.py: not real traffic
+        return
+    g._metrics_t0 = time.perf_counter()
+
+
+def _observe(response):
+    t0 = g.pop("_metrics_t0", None)
+    if t0 is None or request.endpoint == "metrics":
+        return response
+    blueprint = request.blueprint or "app"
+    endpoint = request.endpoint or "unmatched"
+    REQUEST_LATENCY.labels(blueprint=blueprint, endpoint=endpoint).observe(time.perf_counter() - t0)
+    REQUESTS.labels(
+        blueprint=blueprint, endpoint=endpoint, method=request.method, status=str(response.status_code)
+    ).inc()
+    return response
+
+
+def metrics():
+    token = os.getenv("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, token):
+            abort(401)
+    elif not env_bool("METRICS_PUBLIC", False):
+        if request.remote_addr not in LOOPBACK or "X-Forwarded-For" in request.headers:
+            abort(403)
+
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        payload = generate_latest(registry)
+    else:
+        payload = generate_latest()
+    return Response(payload, headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+def init_metrics(app, engines) -> None:
+    """`engines` is db.engines: the default bind is labelled "primary", others by bind key."""
+    if not env_bool("METRICS_ENABLED", True):
+        return
+    for key, engine in engines.items():
+        instrument_engine(engine, key or "primary")
+    app.before_request(_start_timer)
+    app.after_request(_observe)
+    app.add_url_rule("/metrics", "metrics", metrics)
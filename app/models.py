@@ -1,8 +1,47 @@
 from datetime import datetime, date
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from sqlalchemy import literal_column, text
 from .extensions import db
 
+
+# Status labels are stored as SMALLINT codes. Canceled is always 0 so the
+# partial indexes below can share the predicate "status <> 0".
+CANCELED_CODE = 0
+ASSIGNMENT_STATUS_CODES = {"Canceled": CANCELED_CODE, "Scheduled": 1, "Confirmed": 2}
+REQUEST_STATUS_CODES = {"Canceled": CANCELED_CODE, "Open": 1, "Satisfied": 2}
+
+NOT_CANCELED_SQL = f"status <> {CANCELED_CODE}"
+REQUEST_OPEN_SQL = f"status = {REQUEST_STATUS_CODES['Open']}"
+
+
+class CodedStatus(db.TypeDecorator):
+    """
+    A status column that is a SMALLINT in the database but a label ("Scheduled",
+    "Canceled", ...) everywhere in Python and the templates.
+    """
+    impl = db.SmallInteger
+    cache_ok = True
+
+    def __init__(self, codes: tuple[tuple[str, int], ...]):
+        super().__init__()
+        self.codes = codes
+        self._to_code = dict(codes)
+        self._to_label = {code: label for label, code in codes}
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            return self._to_code[value]
+        except KeyError:
+            raise ValueError(f"Unknown status {value!r}") from None
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._to_label.get(value, value)
+
 class Admin(UserMixin, db.Model):
     __tablename__ = "admins"
     id = db.Column(db.Integer, primary_key=True)
@@ -53,7 +92,10 @@ class Request(db.Model):
     start_datetime = db.Column(db.DateTime, nullable=False)
     end_datetime = db.Column(db.DateTime, nullable=False)
 
-    status = db.Column(db.String(20), nullable=False, default="Open")  # Open/Satisfied/Canceled
+    status = db.Column(CodedStatus(tuple(REQUEST_STATUS_CODES.items())), nullable=False, default="Open", index=True)  # Open/Satisfied/Canceled
+
+    # number of non-canceled assignments linked via request_id; maintained on every assignment write
+    filled_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     created_by_admin_id = db.Column(db.Integer, db.ForeignKey("admins.id"), nullable=False)
     created_by = db.relationship("Admin", backref=db.backref("requests_created", lazy=True))
@@ -68,8 +110,20 @@ class Request(db.Model):
 
     __table_args__ = (
     db.UniqueConstraint("recurring_id", "occurrence_date", name="uq_request_recurring_occurrence"),
+    db.Index("ix_requests_open_start", "start_datetime",
+             sqlite_where=text(REQUEST_OPEN_SQL), postgresql_where=text(REQUEST_OPEN_SQL)),
 )
 
+    @classmethod
+    def not_canceled(cls):
+        """status <> Canceled, as a literal so the planner can match partial indexes."""
+        return cls.status.op("<>", is_comparison=True)(literal_column(str(CANCELED_CODE)))
+
+    @classmethod
+    def is_open(cls):
+        """status = Open, as a literal so ix_requests_open_start is usable."""
+        return cls.status.op("=", is_comparison=True)(literal_column(str(REQUEST_STATUS_CODES["Open"])))
+
 class Assignment(db.Model):
     __tablename__ = "assignments"
     id = db.Column(db.Integer, primary_key=True)
@@ -86,7 +140,7 @@ class Assignment(db.Model):
     start_datetime = db.Column(db.DateTime, nullable=False)
     end_datetime = db.Column(db.DateTime, nullable=False)
 
-    status = db.Column(db.String(20), nullable=False, default="Scheduled")  # Scheduled/Confirmed/Canceled
+    status = db.Column(CodedStatus(tuple(ASSIGNMENT_STATUS_CODES.items())), nullable=False, default="Scheduled")  # Scheduled/Confirmed/Canceled
     notes = db.Column(db.Text, nullable=True)
 
     created_by_admin_id = db.Column(db.Integer, db.ForeignKey("admins.id"), nullable=False)
@@ -99,8 +153,32 @@ class Assignment(db.Model):
 
     __table_args__ = (
     db.UniqueConstraint("recurring_id", "occurrence_date", name="uq_assignment_recurring_occurrence"),
+    # partial indexes over live (non-canceled) rows only
+    db.Index("ix_assignments_staff_active", "staff_id", "start_datetime", "end_datetime",
+             sqlite_where=text(NOT_CANCELED_SQL), postgresql_where=text(NOT_CANCELED_SQL)),
+    db.Index("ix_assignments_unit_active", "unit_id", "start_datetime", "end_datetime",
+             sqlite_where=text(NOT_CANCELED_SQL), postgresql_where=text(NOT_CANCELED_SQL)),
+    db.Index("ix_assignments_start_active", "start_datetime",
+             sqlite_where=text(NOT_CANCELED_SQL), postgresql_where=text(NOT_CANCELED_SQL)),
+    db.Index("ix_assignments_request_active", "request_id",
+             sqlite_where=text(NOT_CANCELED_SQL), postgresql_where=text(NOT_CANCELED_SQL)),
     )
 
+    @classmethod
+    def not_canceled(cls):
+        """status <> Canceled, as a literal so the planner can match partial indexes."""
+        return cls.status.op("<>", is_comparison=True)(literal_column(str(CANCELED_CODE)))
+
+
+class StaffLock(db.Model):
+    """
+    One row per staff, touched at the start of any transaction that books that staff.
+    The row lock serializes writers for the same staff (Postgres row lock; SQLite
+    write lock) so the overlap check and the insert happen atomically.
+    """
+    __tablename__ = "staff_locks"
+    staff_id = db.Column(db.Integer, primary_key=True)  # no FK: lock rows only
+    version = db.Column(db.Integer, nullable=False, default=0)
 
 
 class RecurringRequest(db.Model):
@@ -159,4 +237,137 @@ class RecurringAssignment(db.Model):
     created_by_admin_id = db.Column(db.Integer, db.ForeignKey("admins.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
-   
\ No newline at end of file
+   
+
+# ------------------
+# Cold storage: assignments/requests that ended before the archive cutoff.
+# Same columns (and ids) as the hot tables, frozen: nothing writes to them except
+# `flask archive`. Reads reach here only when their date range starts before
+# the cutoff (see app/archive.py).
+# ------------------
+class ArchiveState(db.Model):
+    """Single row: everything ending before `cutoff` lives in the *_archive tables."""
+    __tablename__ = "archive_state"
+    id = db.Column(db.Integer, primary_key=True)
+    cutoff = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class RequestArchive(db.Model):
+    __tablename__ = "requests_archive"
+    is_archived = True
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    unit_id = db.Column(db.Integer, db.ForeignKey("units.id"), nullable=False)
+    unit = db.relationship("Unit")
+
+    coordinator_name = db.Column(db.String(140), nullable=False)
+    staff_needed = db.Column(db.Integer, nullable=False)
+
+    start_datetime = db.Column(db.DateTime, nullable=False)
+    end_datetime = db.Column(db.DateTime, nullable=False)
+
+    status = db.Column(CodedStatus(tuple(REQUEST_STATUS_CODES.items())), nullable=False)
+    filled_count = db.Column(db.Integer, nullable=False, default=0)
+
+    created_by_admin_id = db.Column(db.Integer, db.ForeignKey("admins.id"), nullable=False)
+    notes = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    recurring_id = db.Column(db.Integer, nullable=True)  # rule may be edited/removed later
+    occurrence_date = db.Column(db.Date, nullable=True)
+
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_requests_archive_unit_start", "unit_id", "start_datetime"),
+        db.Index("ix_requests_archive_start", "start_datetime"),
+    )
+
+
+class AssignmentArchive(db.Model):
+    __tablename__ = "assignments_archive"
+    is_archived = True
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    staff_id = db.Column(db.Integer, db.ForeignKey("staff.id"), nullable=False)
+    staff = db.relationship("Staff")
+
+    unit_id = db.Column(db.Integer, db.ForeignKey("units.id"), nullable=False)
+    unit = db.relationship("Unit")
+
+    request_id = db.Column(db.Integer, nullable=True)  # hot or archived request
+
+    start_datetime = db.Column(db.DateTime, nullable=False)
+    end_datetime = db.Column(db.DateTime, nullable=False)
+
+    status = db.Column(CodedStatus(tuple(ASSIGNMENT_STATUS_CODES.items())), nullable=False)
+    notes = db.Column(db.Text, nullable=True)
+
+    created_by_admin_id = db.Column(db.Integer, db.ForeignKey("admins.id"), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    recurring_id = db.Column(db.Integer, nullable=True)
+    occurrence_date = db.Column(db.Date, nullable=True)
+
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_assignments_archive_staff_start", "staff_id", "start_datetime"),
+        db.Index("ix_assignments_archive_unit_start", "unit_id", "start_datetime"),
+        db.Index("ix_assignments_archive_start", "start_datetime"),
+        db.Index("ix_assignments_archive_request", "request_id"),
+    )
+
+    @classmethod
+    def not_canceled(cls):
+        return cls.status.op("<>", is_comparison=True)(literal_column(str(CANCELED_CODE)))
+
+
+class CalendarFeed(db.Model):
+    """
+    The secret token behind one staff or unit .ics feed, plus a change version that
+    every write touching that staff/unit bumps (see app/feeds/versions.py). Polling
+    clients are answered from this row alone while the version is unchanged.
+    """
+    __tablename__ = "calendar_feeds"
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # "staff" / "unit"
+    entity_id = db.Column(db.Integer, nullable=False)
+    token = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("kind", "entity_id", name="uq_calendar_feeds_entity"),
+    )
+
+
+class PublishedPeriod(db.Model):
+    """
+    A finished bi-week frozen for payroll: its assignments are read-only and its
+    schedule pages read the period_snapshots rows instead of the assignments
+    (see app/periods.py).
+    """
+    __tablename__ = "published_periods"
+    start_date = db.Column(db.Date, primary_key=True)  # the bi-week's Friday
+    end_date = db.Column(db.Date, nullable=False)  # exclusive
+
+    published_by_admin_id = db.Column(db.Integer, db.ForeignKey("admins.id"), nullable=False)
+    published_by = db.relationship("Admin")
+    published_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class PeriodSnapshot(db.Model):
+    """One staff's or unit's precomputed bi-week: day cards and totals as JSON, one keyed read per page."""
+    __tablename__ = "period_snapshots"
+    period_start = db.Column(db.Date, db.ForeignKey("published_periods.start_date"), primary_key=True)
+    kind = db.Column(db.String(10), primary_key=True)  # "staff" / "unit"
+    entity_id = db.Column(db.Integer, primary_key=True)
+
+    name = db.Column(db.String(140), nullable=False)  # as it was when published
+    total_seconds = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)
@@ -0,0 +1,214 @@
+"""
+Published (locked) bi-weeks.
+
+Once a bi-week is over and payroll is done, publishing it freezes it:
+
+- every assignment write whose shift starts in it is refused (create, edit,
+  cancel, bulk, CSV import), like writes before the archive cutoff;
+- each staff and unit with shifts in it gets a period_snapshots row holding its
+  day cards and totals, and the bi-week pages read that row (one keyed read)
+  instead of querying and regrouping assignments. Staff/units without a row had
+  no shifts that bi-week.
+
+Snapshot payload (JSON):
+
+    {"days": [{"label", "date", "seconds", "version",
+               "shifts": [[id, start, end, status, request_id, notes,
+                           staff_id, staff_name, unit_id, unit_name], ...]}, ... x14],
+     "totals": [week1_hours, week2_hours, biweek_hours]}
+
+Unpublishing deletes the snapshots and unlocks the bi-week again.
+"""
+import json
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from flask import g
+from sqlalchemy import and_, delete, insert
+
+from .extensions import db
+from .models import PeriodSnapshot, PublishedPeriod
+
+PERIOD_DAYS = 14
+
+
+class FrozenShift(SimpleNamespace):
+    """A shift read back from a snapshot, with the attributes the day cards use."""
+    is_archived = False
+
+
+# ------------------
+# locks
+# ------------------
+def published_periods() -> list[tuple[date, date]]:
+    """(start, end exclusive) of every published bi-week, oldest first. Read once per request."""
+    periods = g.get("_published_periods")
+    if periods is None:
+        periods = [
+            (start, end) for start, end in
+            db.session.query(PublishedPeriod.start_date, PublishedPeriod.end_date)
+            .order_by(PublishedPeriod.start_date)
+        ]
+        g._published_periods = periods
+    return periods
+
+
+def locked_period(d: date) -> date | None:
+    """Start of the published bi-week containing `d`, if any."""
+    for start, end in published_periods():
+        if start <= d < end:
+            return start
+    return None
+
+
+def locked_error(*starts: datetime) -> str | None:
+    """Flash message for a write that would change a published bi-week (cards bucket by start day)."""
+    for start_dt in starts:
+        period = locked_period(start_dt.date())
+        if period is not None:
+            return f"The bi-week starting {period:%Y-%m-%d} is published and read-only."
+    return None
+
+
+def locked_range_error(date_from: date, date_to: date) -> str | None:
+    """Same, for any shift starting between date_from and date_to (inclusive)."""
+    for start, end in published_periods():
+        if start <= date_to and date_from < end:
+            return f"The bi-week starting {start:%Y-%m-%d} is published and read-only."
+    return None
+
+
+# ------------------
+# snapshots
+# ------------------
+def _shift_row(a) -> list:
+    return [
+        a.id, a.start_datetime.isoformat(), a.end_datetime.isoformat(), a.status, a.request_id, a.notes,
+        a.staff_id, a.staff.full_name, a.unit_id, a.unit.unit_name,
+    ]
+
+
+def freeze(biweek: dict) -> tuple[str, int]:
+    """(payload, total seconds) for one staff/unit bi-week as the schedule view builds it."""
+    days = biweek["week1_days"] + biweek["week2_days"]
+    payload = {
+        "days": [
+            {
+                "label": day["label"],
+                "date": day["date"].isoformat(),
+                "seconds": day["seconds"],
+                "version": day["version"],
+                "shifts": [_shift_row(a) for a in day["assignments"]],
+            }
+            for day in days
+        ],
+        "totals": [biweek["week1_total_hours"], biweek["week2_total_hours"], biweek["biweek_total_hours"]],
+    }
+    return json.dumps(payload, separators=(",", ":")), round(sum(day["seconds"] for day in days))
+
+
+def _thaw_shift(row: list) -> FrozenShift:
+    (id_, start, end, status, request_id, notes, staff_id, staff_name, unit_id, unit_name) = row
+    return FrozenShift(
+        id=id_,
+        start_datetime=datetime.fromisoformat(start),
+        end_datetime=datetime.fromisoformat(end),
+        status=status,
+        request_id=request_id,
+        notes=notes,
+        staff_id=staff_id,
+        staff=SimpleNamespace(id=staff_id, full_name=staff_name),
+        unit_id=unit_id,
+        unit=SimpleNamespace(id=unit_id, unit_name=unit_name),
+    )
+
+
+def thaw(payload: str) -> dict:
+    """The template variables freeze() was given, rebuilt from a payload."""
+    data = json.loads(payload)
+    days = [
+        {
+            "idx": i % 7,
+            "label": day["label"],
+            "date": date.fromisoformat(day["date"]),
+            "assignments": [_thaw_shift(row) for row in day["shifts"]],
+            "seconds": day["seconds"],
+            "version": day["version"],
+        }
+        for i, day in enumerate(data["days"])
+    ]
+    week1, week2, biweek = data["totals"]
+    return {
+        "week1_days": days[:7],
+        "week2_days": days[7:],
+        "week1_total_hours": week1,
+        "week2_total_hours": week2,
+        "biweek_total_hours": biweek,
+    }
+
+
+def snapshot_biweek(period_start: date, kind: str, entity_id: int, empty) -> dict | None:
+    """
+    A published bi-week's template variables for one staff/unit, or None when the
+    bi-week isn't published: one keyed read either way. `empty()` builds the page
+    for a staff/unit that had no shifts in it.
+    """
+    row = (
+        db.session.query(PublishedPeriod.start_date, PeriodSnapshot.payload)
+        .outerjoin(PeriodSnapshot, and_(
+            PeriodSnapshot.period_start == PublishedPeriod.start_date,
+            PeriodSnapshot.kind == kind,
+            PeriodSnapshot.entity_id == entity_id,
+        ))
+        .filter(PublishedPeriod.start_date == period_start)
+        .first()
+    )
+    if row is None:
+        return None
+    return thaw(row.payload) if row.payload is not None else empty()
+
+
+# ------------------
+# publish / unpublish
+# ------------------
+def publish(period_start: date, admin_id: int, build) -> int:
+    """
+    Lock the bi-week starting `period_start` and store its snapshots, in one
+    transaction. `build(period_start)` returns (kind, entity_id, name, biweek)
+    for every staff and unit with shifts in it. Returns the snapshot count.
+    """
+    end = period_start + timedelta(days=PERIOD_DAYS)
+    if end > date.today():
+        raise ValueError("only finished bi-weeks can be published")
+    if db.session.get(PublishedPeriod, period_start) is not None:
+        raise ValueError(f"the bi-week starting {period_start:%Y-%m-%d} is already published")
+
+    db.session.add(PublishedPeriod(start_date=period_start, end_date=end, published_by_admin_id=admin_id))
+    db.session.flush()
+    rows = []
+    for kind, entity_id, name, biweek in build(period_start):
+        payload, seconds = freeze(biweek)
+        rows.append({
+            "period_start": period_start,
+            "kind": kind,
+            "entity_id": entity_id,
+            "name": name,
+            "total_seconds": seconds,
+            "payload": payload,
+        })
+    if rows:
+        db.session.execute(insert(PeriodSnapshot), rows)
+    db.session.commit()
+    g.pop("_published_periods", None)
+    return len(rows)
+
+
+def unpublish(period_start: date) -> bool:
+    period = db.session.get(PublishedPeriod, period_start)
+    if period is None:
+        return False
+    db.session.execute(delete(PeriodSnapshot).where(PeriodSnapshot.period_start == period_start))
+    db.session.delete(period)
+    db.session.commit()
+    g.pop("_published_periods", None)
+    return True
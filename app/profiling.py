@@ -0,0 +1,154 @@
+"""
+Opt-in SQL profiling: per-request statement count and DB time, a Server-Timing
+header, a slow-query log and per-endpoint aggregates for /debug/sql.
+
+Enable with SQL_PROFILING=1. When it is off nothing is registered at all (no
+engine listeners, no request hooks), so the only cost is the env lookup at startup.
+
+    SQL_PROFILING=1
+    SQL_SLOW_QUERY_MS=200       # statements at or above this go to instance/slow_queries.log
+    SQL_PROFILE_TOP=3           # slowest statements kept per request (shown in Server-Timing)
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import env_bool, env_int
+
+SLOW_LOG_FILENAME = "slow_queries.log"
+RECENT_SLOW_KEPT = 50
+
+slow_log = logging.getLogger("staffscheduler.slow_sql")
+
+_lock = threading.Lock()
+_endpoints: dict[str, dict] = {}
+_recent_slow: deque = deque(maxlen=RECENT_SLOW_KEPT)
+_settings = {"enabled": False, "slow_ms": 200.0, "top": 3, "started": None}
+
+
+def enabled() -> bool:
+    return _settings["enabled"]
+
+
+def init_profiling(app) -> None:
+    if not env_bool("SQL_PROFILING", False):
+        return
+
+    _settings.update(
+        enabled=True,
+        slow_ms=float(env_int("SQL_SLOW_QUERY_MS", 200)),
+        top=env_int("SQL_PROFILE_TOP", 3),
+        started=time.time(),
+    )
+
+    if not slow_log.handlers:
+        os.makedirs(app.instance_path, exist_ok=True)
+        handler = RotatingFileHandler(
+            os.path.join(app.instance_path, SLOW_LOG_FILENAME), maxBytes=5 * 1024 * 1024, backupCount=3
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_log.addHandler(handler)
+        slow_log.setLevel(logging.INFO)
+        slow_log.propagate = False
+
+    # every engine (primary and any extra binds)
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+# ------------------
+# Engine hooks
+# ------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_prof_t0", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("_prof_t0")
+    if not stack:
+        return
+    ms = (time.perf_counter() - stack.pop()) * 1000
+
+    prof = g.get("_sql_prof") if has_request_context() else None
+    if prof is not None:
+        prof["count"] += 1
+        prof["db_ms"] += ms
+        slowest = prof["slowest"]
+        if len(slowest) < _settings["top"] or ms > slowest[-1][0]:
+            slowest.append((ms, statement))
+            slowest.sort(key=lambda s: -s[0])
+            del slowest[_settings["top"]:]
+
+    if ms >= _settings["slow_ms"]:
+        where = f"{request.method} {request.path}" if has_request_context() else "(no request)"
+        sql = " ".join(statement.split())
+        slow_log.info("%.1fms %s | %s", ms, where, sql)
+        with _lock:
+            _recent_slow.appendleft({"at": time.time(), "ms": ms, "where": where, "sql": sql})
+
+
+# ------------------
+# Request hooks
+# ------------------
+def _start_request():
+    g._sql_prof = {"t0": time.perf_counter(), "count": 0, "db_ms": 0.0, "slowest": []}
+
+
+def _finish_request(response):
+    prof = g.pop("_sql_prof", None)
+    if prof is None:
+        return response
+
+    total_ms = (time.perf_counter() - prof["t0"]) * 1000
+    timings = [
+        f'db;dur={prof["db_ms"]:.1f};desc="{prof["count"]} queries"',
+        f"app;dur={max(total_ms - prof['db_ms'], 0):.1f}",
+    ]
+    for i, (ms, _) in enumerate(prof["slowest"], start=1):
+        timings.append(f"sql{i};dur={ms:.1f}")
+    response.headers.add("Server-Timing", ", ".join(timings))
+
+    endpoint = request.endpoint or "(unmatched)"
+    with _lock:
+        e = _endpoints.setdefault(endpoint, {
+            "endpoint": endpoint, "requests": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "db_ms": 0.0, "statements": 0, "max_statements": 0, "slowest_sql": None, "slowest_ms": 0.0,
+        })
+        e["requests"] += 1
+        e["total_ms"] += total_ms
+        e["max_ms"] = max(e["max_ms"], total_ms)
+        e["db_ms"] += prof["db_ms"]
+        e["statements"] += prof["count"]
+        e["max_statements"] = max(e["max_statements"], prof["count"])
+        if prof["slowest"] and prof["slowest"][0][0] > e["slowest_ms"]:
+            e["slowest_ms"], e["slowest_sql"] = prof["slowest"][0][0], " ".join(prof["slowest"][0][1].split())
+    return response
+
+
+def report(limit: int = 25) -> dict:
+    """Worst endpoints (by mean time) and recent slow statements since startup."""
+    with _lock:
+        rows = [dict(e) for e in _endpoints.values()]
+        recent = list(_recent_slow)
+    for e in rows:
+        n = e["requests"]
+        e["avg_ms"] = e["total_ms"] / n
+        e["avg_db_ms"] = e["db_ms"] / n
+        e["avg_statements"] = e["statements"] / n
+    rows.sort(key=lambda e: -e["avg_ms"])
+    settings = dict(_settings)
+    if settings["started"]:
+        settings["started_at"] = datetime.fromtimestamp(settings["started"]).strftime("%Y-%m-%d %H:%M:%S")
+    return {"endpoints": rows[:limit], "recent_slow": recent, "settings": settings}
@@ -1,10 +1,16 @@
 from datetime import date, datetime, timedelta
 from flask import render_template, request, redirect, flash
 from flask_login import login_required, current_user
+from sqlalchemy.exc import IntegrityError
 
 from . import recurring_assignments_bp
 from ..extensions import db
 from ..models import RecurringAssignment, Staff, Unit, Assignment
+from ..requests.coverage import counted_request_id, track_fill_change
+from ..assignments.locking import lock_staff, is_overlap_violation
+from ..metrics import record_generated
+from ..feeds.versions import touch_feeds
+from ..live import note_change
 
 DAY_BITS = {"MO": 1, "TU": 2, "WE": 4, "TH": 8, "FR": 16, "SA": 32, "SU": 64}
 WEEKDAY_TO_CODE = {0: "MO", 1: "TU", 2: "WE", 3: "TH", 4: "FR", 5: "SA", 6: "SU"}
@@ -38,7 +44,7 @@ def should_run_on(ra: RecurringAssignment, d: date) -> bool:
 def staff_overlaps(staff_id: int, start_dt: datetime, end_dt: datetime) -> bool:
     q = Assignment.query.filter(
         Assignment.staff_id == staff_id,
-        Assignment.status != "Canceled",
+        Assignment.not_canceled(),
         Assignment.start_datetime < end_dt,
         start_dt < Assignment.end_datetime,
     )
@@ -102,6 +108,7 @@ def create_ra():
         created_by_admin_id=current_user.id,
     )
     db.session.add(ra)
+    touch_feeds(staff_ids=[staff_id], unit_ids=[unit_id])  # ?rrule=1 feeds show the rule
     db.session.commit()
 
     flash("Recurring assignment created.", "success")
@@ -127,6 +134,7 @@ def edit_ra(ra_id):
 @login_required
 def update_ra(ra_id):
     ra = RecurringAssignment.query.get_or_404(ra_id)
+    old_staff_id, old_unit_id = ra.staff_id, ra.unit_id
 
     ra.staff_id = request.form.get("staff_id", type=int)
     ra.unit_id = request.form.get("unit_id", type=int)
@@ -139,6 +147,7 @@ def update_ra(ra_id):
     ra.notes = (request.form.get("notes") or "").strip() or None
     ra.is_active = request.form.get("is_active") == "on"
 
+    touch_feeds(staff_ids=[old_staff_id, ra.staff_id], unit_ids=[old_unit_id, ra.unit_id])
     db.session.commit()
     flash("Recurring assignment updated.", "success")
     return redirect("/recurring-assignments/")
@@ -155,6 +164,10 @@ def generate():
     created = 0
     skipped = 0
     conflicts = 0
+    touched_staff, touched_units = set(), set()
+
+    # hold the booking lock for every staff we may write for (sorted inside lock_staff)
+    lock_staff(*[ra.staff_id for ra in ras])
 
     for ra in ras:
         d = max(today, ra.start_date)
@@ -187,10 +200,23 @@ def generate():
                             occurrence_date=d,
                         )
                         db.session.add(a)
+                        track_fill_change(None, counted_request_id(a.request_id, a.status))
+                        note_change("created", ra.staff_id, ra.unit_id, start_dt)
+                        touched_staff.add(ra.staff_id)
+                        touched_units.add(ra.unit_id)
                         created += 1
 
             d += timedelta(days=1)
 
-    db.session.commit()
+    touch_feeds(staff_ids=touched_staff, unit_ids=touched_units)
+    try:
+        db.session.commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        if not is_overlap_violation(exc):
+            raise
+        flash("Generation aborted: a concurrent edit created an overlapping shift. Try again.", "danger")
+        return redirect("/recurring-assignments/")
+    record_generated("assignments", created=created, skipped=skipped, conflicts=conflicts)
     flash(f"Generated {created}. Skipped {skipped}. Conflicts {conflicts} (overlaps).", "success")
     return redirect("/recurring-assignments/")
\ No newline at end of file
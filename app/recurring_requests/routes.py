@@ -5,6 +5,7 @@ from flask_login import login_required, current_user
 from . import recurring_requests_bp
 from ..extensions import db
 from ..models import RecurringRequest, Unit, Request as StaffRequest
+from ..metrics import record_generated
 
 DAY_BITS = {
     "MO": 1,
@@ -213,5 +214,6 @@ def generate():
             d += timedelta(days=1)
 
     db.session.commit()
+    record_generated("requests", created=created, skipped=skipped)
     flash(f"Generated {created} request(s). Skipped {skipped} existing.", "success")
     return redirect("/recurring-requests/")
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Optional read-replica routing.
+
+Set DATABASE_REPLICA_URL next to DATABASE_URL and GET/HEAD requests to the
+read-heavy blueprints (schedule, assignments, requests and the list pages) run
+their SELECTs on the replica. Everything else stays on the primary:
+
+- every other method, blueprint and the CLI;
+- any flush or INSERT/UPDATE/DELETE, even inside a replica-routed request;
+- read-your-writes: after a POST/PUT/PATCH/DELETE the browser's session is
+  pinned to the primary for DB_REPLICA_STICKY_SECONDS (default 10), so the page
+  a form redirects to never shows data older than the write it just made.
+
+Trying it locally with two SQLite files: point DATABASE_REPLICA_URL at a second
+file and copy the primary into it with `flask replica-sync` (re-run it to
+"replicate"); in between, the replica lags exactly like a real one would.
+With two local Postgres instances, use ordinary streaming replication.
+"""
+import time
+
+from flask import g, has_app_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from .config import env_int
+
+REPLICA_BIND = "replica"
+REPLICA_BLUEPRINTS = frozenset({
+    "schedule",
+    "assignments",
+    "requests",
+    "staff",
+    "units",
+    "recurring_requests",
+    "recurring_assignments",
+    "feeds",  # calendar clients polling; no session, so never pinned
+})
+SAFE_METHODS = ("GET", "HEAD")
+STICKY_KEY = "_primary_until"
+
+
+class RoutingSession(Session):
+    """db.session that sends plain reads to the replica bind when the request allows it."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+            and has_app_context()
+            and g.get("_use_replica")
+        ):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _route_request():
+    g._use_replica = (
+        request.method in SAFE_METHODS
+        and request.blueprint in REPLICA_BLUEPRINTS
+        and session.get(STICKY_KEY, 0) < time.time()
+    )
+
+
+def _pin_after_write(response):
+    if request.method not in SAFE_METHODS and request.method != "OPTIONS":
+        session[STICKY_KEY] = int(time.time()) + env_int("DB_REPLICA_STICKY_SECONDS", 10)
+    return response
+
+
+def init_replica(app) -> None:
+    """Install the routing hooks; no-op unless a replica bind is configured."""
+    if REPLICA_BIND not in app.config.get("SQLALCHEMY_BINDS", {}):
+        return
+    app.before_request(_route_request)
+    app.after_request(_pin_after_write)
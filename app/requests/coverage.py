@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, literal, select, update
+
+from ..extensions import db
+from ..models import Request as StaffRequest, Unit, Assignment
+
+
+def horizon_window(days: int) -> tuple[datetime, datetime]:
+    """(now, now + days) — the slice of requests the gap finder looks at."""
+    start_dt = datetime.now().replace(second=0, microsecond=0)
+    return start_dt, start_dt + timedelta(days=days)
+
+
+def derived_status(filled, staff_needed, current_status):
+    """Status expression for a request given its fill count; Canceled is sticky."""
+    status_type = StaffRequest.status.type  # labels must bind as status codes
+    return case(
+        (current_status == "Canceled", current_status),
+        (filled >= staff_needed, literal("Satisfied", status_type)),
+        else_=literal("Open", status_type),
+    )
+
+
+def counted_request_id(request_id: int | None, status: str) -> int | None:
+    """The request an assignment counts toward, or None if it doesn't count."""
+    if request_id and status != "Canceled":
+        return request_id
+    return None
+
+
+def adjust_filled(request_id: int, delta: int) -> None:
+    """
+    Atomically bump a request's filled_count and re-derive its status in the same
+    UPDATE, so concurrent writers never lose an increment. Runs in the caller's
+    transaction; the caller commits.
+    """
+    new_filled = StaffRequest.filled_count + delta
+    db.session.execute(
+        update(StaffRequest)
+        .where(StaffRequest.id == request_id)
+        .values(
+            filled_count=new_filled,
+            status=derived_status(new_filled, StaffRequest.staff_needed, StaffRequest.status),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def track_fill_change(old_request_id: int | None, new_request_id: int | None) -> None:
+    """
+    Move an assignment's contribution from one request to another.
+    Pass counted_request_id(...) for the before/after state of the assignment.
+    """
+    if old_request_id == new_request_id:
+        return
+    if old_request_id:
+        adjust_filled(old_request_id, -1)
+    if new_request_id:
+        adjust_filled(new_request_id, +1)
+
+
+def reconcile_fill_counts(start_dt: datetime, end_dt: datetime) -> int:
+    """
+    Recompute filled_count and status from assignments for every request in the
+    window, using a single UPDATE with a correlated count. Repairs drift from
+    writes made outside the app. Returns the number of requests that changed.
+    """
+    filled = (
+        select(func.count(Assignment.id))
+        .where(
+            Assignment.request_id == StaffRequest.id,
+            Assignment.not_canceled(),
+        )
+        .scalar_subquery()
+    )
+    new_status = derived_status(filled, StaffRequest.staff_needed, StaffRequest.status)
+
+    result = db.session.execute(
+        update(StaffRequest)
+        .where(
+            StaffRequest.start_datetime < end_dt,
+            StaffRequest.end_datetime > start_dt,
+            (StaffRequest.filled_count != filled) | (StaffRequest.status != new_status),
+        )
+        .values(filled_count=filled, status=new_status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+def find_gaps(start_dt: datetime, end_dt: datetime) -> list[dict]:
+    """
+    Every open request in the window that is still short of staff, earliest first.
+    Reads the stored counters only; no per-request counting.
+    """
+    rows = (
+        db.session.query(StaffRequest, Unit.unit_name)
+        .join(Unit, Unit.id == StaffRequest.unit_id)
+        .filter(
+            StaffRequest.is_open(),
+            StaffRequest.start_datetime < end_dt,
+            StaffRequest.end_datetime > start_dt,
+            StaffRequest.filled_count < StaffRequest.staff_needed,
+        )
+        .order_by(StaffRequest.start_datetime.asc(), StaffRequest.id.asc())
+        .all()
+    )
+
+    return [
+        {
+            "r": r,
+            "unit_name": unit_name,
+            "filled": r.filled_count,
+            "shortfall": r.staff_needed - r.filled_count,
+        }
+        for r, unit_name in rows
+    ]
+
+
+def run_gap_finder(days: int, reconcile: bool = True) -> tuple[int, list[dict]]:
+    """
+    Optionally reconcile counters for the horizon (and commit), then return
+    (changed, gaps).
+    """
+    start_dt, end_dt = horizon_window(days)
+    changed = 0
+    if reconcile:
+        changed = reconcile_fill_counts(start_dt, end_dt)
+        db.session.commit()
+    return changed, find_gaps(start_dt, end_dt)
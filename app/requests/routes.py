@@ -5,7 +5,10 @@ from datetime import timedelta
 
 from . import requests_bp
 from ..extensions import db
-from ..models import Request as StaffRequest, Unit, Assignment
+from ..models import Request as StaffRequest, RequestArchive, Unit, Assignment, AssignmentArchive
+from ..archive import archive_cutoff, archived_assignments, archived_error, merged
+from ..utils.pagination import page_args, lookup_response
+from .coverage import run_gap_finder
 
 STATUS_OPTIONS = ["Open", "Satisfied", "Canceled"]
 
@@ -15,25 +18,19 @@ def parse_dt(date_str: str, time_str: str) -> datetime:
     return datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
 
 
-def filled_count(req: StaffRequest) -> int:
-    """
-    How many assignments are currently covering this request.
-
-    Primary method: count assignments explicitly linked to this request via request_id.
-    (This is the safest, avoids counting unrelated overlapping assignments.)
-    """
-    return (
-        Assignment.query.filter(
-            Assignment.request_id == req.id,
-            Assignment.status != "Canceled",
-        ).count()
-    )
-
-
 def is_satisfied(req: StaffRequest, filled: int) -> bool:
     return filled >= (req.staff_needed or 0)
 
 
+def status_for(req: StaffRequest, chosen: str) -> str:
+    """
+    Open/Satisfied follow the stored filled_count; only Canceled is taken from the form.
+    """
+    if chosen == "Canceled":
+        return "Canceled"
+    return "Satisfied" if is_satisfied(req, req.filled_count or 0) else "Open"
+
+
 @requests_bp.route("/", methods=["GET"])
 @login_required
 def list_requests():
@@ -43,18 +40,17 @@ def list_requests():
     q = StaffRequest.query
     if unit_id:
         q = q.filter(StaffRequest.unit_id == unit_id)
-    if status:
+    if status in STATUS_OPTIONS:
         q = q.filter(StaffRequest.status == status)
 
     reqs = q.order_by(StaffRequest.start_datetime.desc()).all()
     units = Unit.query.filter_by(is_active=True).order_by(Unit.unit_name.asc()).all()
 
     # list.html expects `rows` with: row.r, row.filled, row.sat
-    rows = []
-    for r in reqs:
-        filled = filled_count(r)
-        sat = is_satisfied(r, filled)
-        rows.append({"r": r, "filled": filled, "sat": sat})
+    rows = [
+        {"r": r, "filled": r.filled_count, "sat": is_satisfied(r, r.filled_count)}
+        for r in reqs
+    ]
 
     return render_template(
         "requests/list.html",
@@ -63,6 +59,83 @@ def list_requests():
         unit_id=unit_id,
         status=status,
         status_options=STATUS_OPTIONS,
+        archive_cutoff=archive_cutoff(),
+    )
+
+
+@requests_bp.route("/gaps", methods=["GET"])
+@login_required
+def request_gaps():
+    """
+    Gap finder: every request in the next N days that is still short of staff.
+    """
+    days = request.args.get("days", type=int) or 7
+    days = max(1, min(days, 90))
+
+    # counters are maintained on write, so the page only reads
+    changed, gaps = run_gap_finder(days, reconcile=False)
+
+    return render_template(
+        "requests/gaps.html",
+        gaps=gaps,
+        days=days,
+        changed=changed,
+        total_shortfall=sum(g["shortfall"] for g in gaps),
+    )
+
+
+@requests_bp.route("/lookup", methods=["GET"])
+@login_required
+def lookup_requests():
+    """
+    Paginated JSON of OPEN requests for the assignment form, optionally narrowed to a
+    unit and to +/- `days` around a date. Without a date, upcoming requests are listed.
+    """
+    unit_id = request.args.get("unit_id", type=int)
+    date_str = (request.args.get("date") or "").strip()
+    days = max(0, min(request.args.get("days", type=int) or 3, 31))
+
+    query = (
+        db.session.query(StaffRequest, Unit.unit_name)
+        .join(Unit, Unit.id == StaffRequest.unit_id)
+        .filter(StaffRequest.is_open())
+    )
+    if unit_id:
+        query = query.filter(StaffRequest.unit_id == unit_id)
+
+    try:
+        center = datetime.strptime(date_str, "%Y-%m-%d") if date_str else None
+    except ValueError:
+        center = None
+    if center:
+        query = query.filter(
+            StaffRequest.start_datetime >= center - timedelta(days=days),
+            StaffRequest.start_datetime < center + timedelta(days=days + 1),
+        )
+    else:
+        query = query.filter(StaffRequest.end_datetime > datetime.now())
+
+    def item(row):
+        r, unit_name = row
+        return {
+            "id": r.id,
+            "text": f"#{r.id} — {unit_name} — {r.coordinator_name} — {r.start_datetime:%Y-%m-%d %H:%M}",
+            "unit": r.unit_id,
+            "unit_name": unit_name,
+            "date": r.start_datetime.strftime("%Y-%m-%d"),
+            "start": r.start_datetime.strftime("%H:%M"),
+            "end": r.end_datetime.strftime("%H:%M"),
+            "notes": r.notes or "",
+            "filled": r.filled_count,
+            "needed": r.staff_needed,
+        }
+
+    page, per_page = page_args()
+    return lookup_response(
+        query.order_by(StaffRequest.start_datetime.asc(), StaffRequest.id.asc()),
+        item,
+        page,
+        per_page,
     )
 
 
@@ -108,16 +181,22 @@ def create_request():
     if end_dt <= start_dt:
         end_dt = end_dt + timedelta(days=1)
 
+    error = archived_error(start_dt)
+    if error:
+        flash(error, "danger")
+        return redirect(url_for("requests.new_request"))
+
     req = StaffRequest(
         unit_id=unit_id,
         coordinator_name=coordinator_name,
         staff_needed=staff_needed,
         start_datetime=start_dt,
         end_datetime=end_dt,
-        status=status if status in STATUS_OPTIONS else "Open",
+        filled_count=0,
         notes=notes,
         created_by_admin_id=current_user.id,
     )
+    req.status = status_for(req, status)
     db.session.add(req)
     db.session.commit()
 
@@ -170,12 +249,17 @@ def update_request(request_id):
     if end_dt <= start_dt:
         end_dt = end_dt + timedelta(days=1)
 
+    error = archived_error(start_dt)
+    if error:
+        flash(error, "danger")
+        return redirect(url_for("requests.edit_request", request_id=req.id))
+
     req.unit_id = unit_id
     req.coordinator_name = coordinator_name
     req.staff_needed = staff_needed
     req.start_datetime = start_dt
     req.end_datetime = end_dt
-    req.status = status if status in STATUS_OPTIONS else req.status
+    req.status = status_for(req, status if status in STATUS_OPTIONS else req.status)
     req.notes = notes
 
     db.session.commit()
@@ -199,30 +283,28 @@ def request_detail(request_id):
     """
     Request detail page:
     - shows request
-    - counts assigned staff (via assignments linked to request_id)
-    - marks satisfied automatically if filled >= staff_needed
+    - shows assigned staff count (filled_count, maintained on assignment writes)
+    - archived requests are shown read-only
     """
-    r = StaffRequest.query.get_or_404(request_id)
+    r = StaffRequest.query.get(request_id) or RequestArchive.query.get_or_404(request_id)
 
-    filled = filled_count(r)
+    filled = r.filled_count
     sat = is_satisfied(r, filled)
 
-    # Auto-update status unless canceled
-    if r.status != "Canceled":
-        new_status = "Satisfied" if sat else "Open"
-        if r.status != new_status:
-            r.status = new_status
-            db.session.commit()
-
     overlaps = (
         Assignment.query.filter(
-            Assignment.status != "Canceled",
+            Assignment.not_canceled(),
             Assignment.start_datetime < r.end_datetime,
             r.start_datetime < Assignment.end_datetime,
         )
         .order_by(Assignment.start_datetime.asc())
         .all()
     )
+    overlaps = merged(overlaps, archived_assignments(
+        r.start_datetime,
+        AssignmentArchive.start_datetime < r.end_datetime,
+        r.start_datetime < AssignmentArchive.end_datetime,
+    ))
 
     return render_template(
         "requests/detail.html",
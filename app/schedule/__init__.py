@@ -4,4 +4,6 @@ schedule_bp = Blueprint(
     "schedule",
     __name__,
     url_prefix="/schedule"
-)
\ No newline at end of file
+)
+
+from . import routes  # IMPORTANT: loads routes so endpoints exist
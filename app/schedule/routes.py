@@ -1,11 +1,17 @@
+import hashlib
 from datetime import datetime, date, time, timedelta
 from collections import defaultdict
 
-from flask import render_template, request
-from flask_login import login_required
+from flask import Response, abort, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from sqlalchemy.orm import joinedload
 
 from . import schedule_bp
-from ..models import Assignment, Unit, Staff
+from ..models import Assignment, AssignmentArchive, PeriodSnapshot, PublishedPeriod, Unit, Staff
+from ..archive import archived_assignments, merged
+from ..live import stream
+from ..templating import fragments
+from ..periods import publish, snapshot_biweek, unpublish
 
 # Week: Friday-first (Fri=4 in Python weekday: Mon=0 ... Sun=6)
 FRIDAY = 4
@@ -63,13 +69,105 @@ def group_assignments_by_day(assignments, period_start: date):
     return buckets
 
 
-def total_hours(assignments) -> float:
+def total_seconds(assignments) -> float:
     seconds = 0.0
     for a in assignments:
         if not a.start_datetime or not a.end_datetime:
             continue
         seconds += (a.end_datetime - a.start_datetime).total_seconds()
-    return round(seconds / 3600, 2)
+    return seconds
+
+
+def total_hours(assignments) -> float:
+    return round(total_seconds(assignments) / 3600, 2)
+
+
+def day_version(mode: str, assignments) -> str:
+    """Fingerprint of everything a day card shows; part of its fragment cache key."""
+    h = hashlib.blake2b(digest_size=12)
+    for a in assignments:
+        name = a.staff.full_name if mode == "unit" else a.unit.unit_name
+        h.update(repr((a.id, a.start_datetime, a.end_datetime, a.status, a.request_id, a.notes, name)).encode())
+    return h.hexdigest()
+
+
+def day_entry(week_start: date, idx: int, assignments, mode: str) -> dict:
+    """One day card: schedule/_day_card.html."""
+    return {
+        "idx": idx,
+        "label": DAY_LABELS[idx],
+        "date": week_start + timedelta(days=idx),
+        "assignments": assignments,
+        "seconds": total_seconds(assignments),
+        "version": day_version(mode, assignments),
+    }
+
+
+def split_biweek(assignments, bw_start: date, mode: str) -> dict:
+    """
+    Day cards and hour totals of one bi-week page, from the assignments STARTING in
+    it sorted by start: the template variables schedule/biweek.html shows (and
+    periods.freeze() stores). A shift running over from the evening before counts
+    towards the previous bi-week, the one its day card is on, live or published.
+    """
+    week1_start = bw_start
+    week2_start = week1_end = bw_start + timedelta(days=7)
+
+    # split into week1/week2 by start_datetime
+    a_w1 = [a for a in assignments if a.start_datetime < dt_start(week1_end)]
+    a_w2 = [a for a in assignments if a.start_datetime >= dt_start(week2_start)]
+
+    week1_total = total_hours(a_w1)
+    week2_total = total_hours(a_w2)
+
+    w1_by_day = group_assignments_by_day(a_w1, week1_start)
+    w2_by_day = group_assignments_by_day(a_w2, week2_start)
+
+    return {
+        "week1_days": [day_entry(week1_start, i, w1_by_day.get(i, []), mode) for i in range(7)],
+        "week2_days": [day_entry(week2_start, i, w2_by_day.get(i, []), mode) for i in range(7)],
+        "week1_total_hours": week1_total,
+        "week2_total_hours": week2_total,
+        "biweek_total_hours": round(week1_total + week2_total, 2),
+    }
+
+
+def period_biweeks(bw_start: date):
+    """
+    (kind, entity_id, name, split_biweek(...)) for every staff and unit with shifts
+    in the bi-week: what publishing a period snapshots. One query (plus the archive's).
+
+    Only shifts STARTING in the bi-week, i.e. exactly the ones its lock protects
+    (periods.locked_error): a shift running over from the evening before belongs
+    to the previous bi-week and stays editable with it, so it must not be frozen here.
+    """
+    start_dt = dt_start(bw_start)
+    end_dt = dt_start(bw_start + timedelta(days=14))
+    assignments = (
+        Assignment.query
+        .options(joinedload(Assignment.staff), joinedload(Assignment.unit))
+        .filter(
+            Assignment.not_canceled(),
+            Assignment.start_datetime >= start_dt,
+            Assignment.start_datetime < end_dt,
+        )
+        .order_by(Assignment.start_datetime.asc())
+        .all()
+    )
+    assignments = merged(assignments, archived_assignments(
+        start_dt,
+        AssignmentArchive.start_datetime >= start_dt,
+        AssignmentArchive.start_datetime < end_dt,
+    ))
+
+    by_staff, by_unit = defaultdict(list), defaultdict(list)
+    for a in assignments:
+        by_staff[a.staff_id].append(a)
+        by_unit[a.unit_id].append(a)
+    for staff_id, rows in by_staff.items():
+        yield "staff", staff_id, rows[0].staff.full_name, split_biweek(rows, bw_start, "staff")
+    for unit_id, rows in by_unit.items():
+        yield "unit", unit_id, rows[0].unit.unit_name, split_biweek(rows, bw_start, "unit")
 
 
 @schedule_bp.route("/", methods=["GET"])
@@ -118,40 +216,33 @@ def biweekly_by_unit(unit_id):
 
     unit = Unit.query.get_or_404(unit_id)
 
-    start_dt = dt_start(bw_start)
-    end_dt = dt_start(bw_end)
-
-    assignments = (
-        Assignment.query
-        .filter(
-            Assignment.unit_id == unit_id,
-            Assignment.status != "Canceled",
-            Assignment.start_datetime < end_dt,
-            Assignment.end_datetime > start_dt,
+    # published bi-weeks: one keyed read of the frozen snapshot
+    biweek = snapshot_biweek(bw_start, "unit", unit_id, lambda: split_biweek([], bw_start, "unit"))
+    published = biweek is not None
+    if not published:
+        start_dt = dt_start(bw_start)
+        end_dt = dt_start(bw_end)
+
+        assignments = (
+            Assignment.query
+            .options(joinedload(Assignment.staff))
+            .filter(
+                Assignment.unit_id == unit_id,
+                Assignment.not_canceled(),
+                Assignment.start_datetime >= start_dt,
+                Assignment.start_datetime < end_dt,
+            )
+            .order_by(Assignment.start_datetime.asc())
+            .all()
         )
-        .order_by(Assignment.start_datetime.asc())
-        .all()
-    )
-
-    # split into week1/week2 by start_datetime
-    a_w1 = [a for a in assignments if a.start_datetime < dt_start(week1_end)]
-    a_w2 = [a for a in assignments if a.start_datetime >= dt_start(week2_start)]
-
-    week1_total = total_hours(a_w1)
-    week2_total = total_hours(a_w2)
-    biweek_total = round(week1_total + week2_total, 2)
-
-    w1_by_day = group_assignments_by_day(a_w1, week1_start)
-    w2_by_day = group_assignments_by_day(a_w2, week2_start)
-
-    week1_days = [
-        {"idx": i, "label": DAY_LABELS[i], "date": week1_start + timedelta(days=i), "assignments": w1_by_day.get(i, [])}
-        for i in range(7)
-    ]
-    week2_days = [
-        {"idx": i, "label": DAY_LABELS[i], "date": week2_start + timedelta(days=i), "assignments": w2_by_day.get(i, [])}
-        for i in range(7)
-    ]
+        # past bi-weeks: add what `flask archive` moved out (no query for recent ones)
+        assignments = merged(assignments, archived_assignments(
+            start_dt,
+            AssignmentArchive.unit_id == unit_id,
+            AssignmentArchive.start_datetime >= start_dt,
+            AssignmentArchive.start_datetime < end_dt,
+        ))
+        biweek = split_biweek(assignments, bw_start, "unit")
 
     return render_template(
         "schedule/biweek.html",
@@ -166,12 +257,9 @@ def biweekly_by_unit(unit_id):
         week1_end_display=week1_end - timedelta(days=1),
         week2_start=week2_start,
         week2_end_display=week2_end - timedelta(days=1),
-        week1_days=week1_days,
-        week2_days=week2_days,
+        published=published,
         # unit totals optional (usually not needed, but included)
-        week1_total_hours=week1_total,
-        week2_total_hours=week2_total,
-        biweek_total_hours=biweek_total,
+        **biweek,
     )
 
 
@@ -190,40 +278,32 @@ def biweekly_by_staff(staff_id):
 
     staff = Staff.query.get_or_404(staff_id)
 
-    start_dt = dt_start(bw_start)
-    end_dt = dt_start(bw_end)
-
-    assignments = (
-        Assignment.query
-        .filter(
-            Assignment.staff_id == staff_id,
-            Assignment.status != "Canceled",
-            Assignment.start_datetime < end_dt,
-            Assignment.end_datetime > start_dt,
+    biweek = snapshot_biweek(bw_start, "staff", staff_id, lambda: split_biweek([], bw_start, "staff"))
+    published = biweek is not None
+    if not published:
+        start_dt = dt_start(bw_start)
+        end_dt = dt_start(bw_end)
+
+        assignments = (
+            Assignment.query
+            .options(joinedload(Assignment.unit))
+            .filter(
+                Assignment.staff_id == staff_id,
+                Assignment.not_canceled(),
+                Assignment.start_datetime >= start_dt,
+                Assignment.start_datetime < end_dt,
+            )
+            .order_by(Assignment.start_datetime.asc())
+            .all()
         )
-        .order_by(Assignment.start_datetime.asc())
-        .all()
-    )
-
-    # split into week1/week2
-    a_w1 = [a for a in assignments if a.start_datetime < dt_start(week1_end)]
-    a_w2 = [a for a in assignments if a.start_datetime >= dt_start(week2_start)]
-
-    week1_total = total_hours(a_w1)
-    week2_total = total_hours(a_w2)
-    biweek_total = round(week1_total + week2_total, 2)
-
-    w1_by_day = group_assignments_by_day(a_w1, week1_start)
-    w2_by_day = group_assignments_by_day(a_w2, week2_start)
-
-    week1_days = [
-        {"idx": i, "label": DAY_LABELS[i], "date": week1_start + timedelta(days=i), "assignments": w1_by_day.get(i, [])}
-        for i in range(7)
-    ]
-    week2_days = [
-        {"idx": i, "label": DAY_LABELS[i], "date": week2_start + timedelta(days=i), "assignments": w2_by_day.get(i, [])}
-        for i in range(7)
-    ]
+        # plus archived shifts when the bi-week is older than the archive cutoff
+        assignments = merged(assignments, archived_assignments(
+            start_dt,
+            AssignmentArchive.staff_id == staff_id,
+            AssignmentArchive.start_datetime >= start_dt,
+            AssignmentArchive.start_datetime < end_dt,
+        ))
+        biweek = split_biweek(assignments, bw_start, "staff")
 
     return render_template(
         "schedule/biweek.html",
@@ -238,9 +318,141 @@ def biweekly_by_staff(staff_id):
         week1_end_display=week1_end - timedelta(days=1),
         week2_start=week2_start,
         week2_end_display=week2_end - timedelta(days=1),
-        week1_days=week1_days,
-        week2_days=week2_days,
-        week1_total_hours=week1_total,
-        week2_total_hours=week2_total,
-        biweek_total_hours=biweek_total,
-    )
\ No newline at end of file
+        published=published,
+        **biweek,
+    )
+
+
+@schedule_bp.route("/<mode>/<int:entity_id>/day/<day>", methods=["GET"])
+@login_required
+def day_card(mode, entity_id, day):
+    """One day card of a bi-week page, re-fetched by the page when a live change touches it."""
+    if mode not in ("unit", "staff"):
+        abort(404)
+    try:
+        d = datetime.strptime(day, "%Y-%m-%d").date()
+    except ValueError:
+        abort(404)
+
+    start_dt = dt_start(d)
+    end_dt = dt_start(d + timedelta(days=1))
+    hot_owner = Assignment.unit_id if mode == "unit" else Assignment.staff_id
+    cold_owner = AssignmentArchive.unit_id if mode == "unit" else AssignmentArchive.staff_id
+
+    # cards bucket by start date, so the day's shifts are the ones starting on it
+    assignments = (
+        Assignment.query
+        .options(joinedload(Assignment.staff if mode == "unit" else Assignment.unit))
+        .filter(
+            hot_owner == entity_id,
+            Assignment.not_canceled(),
+            Assignment.start_datetime >= start_dt,
+            Assignment.start_datetime < end_dt,
+        )
+        .order_by(Assignment.start_datetime.asc())
+        .all()
+    )
+    assignments = merged(assignments, archived_assignments(
+        start_dt,
+        cold_owner == entity_id,
+        AssignmentArchive.start_datetime >= start_dt,
+        AssignmentArchive.start_datetime < end_dt,
+    ))
+
+    week_start = week_start_friday(d)
+    entry = day_entry(week_start, (d - week_start).days, assignments, mode)
+    # same key as the {% cache %} block in biweek.html, so both share the rendered card
+    return fragments.get_or_render(
+        ("day", mode, entity_id, entry["date"], entry["version"]),
+        lambda: render_template("schedule/_day_card.html", mode=mode, day=entry),
+    )
+
+
+@schedule_bp.route("/periods", methods=["GET"])
+@login_required
+def list_periods():
+    """Published bi-weeks, and the recent finished ones that can still be published."""
+    published = PublishedPeriod.query.order_by(PublishedPeriod.start_date.desc()).all()
+    done = {p.start_date for p in published}
+
+    # the last few bi-weeks that are over (their Thursday is before today)
+    latest = biweek_start_from_anchor(date.today()) - timedelta(days=14)
+    finished = [latest - timedelta(days=14 * i) for i in range(6)]
+    return render_template(
+        "schedule/periods.html",
+        # (period or start, last day) pairs
+        published=[(p, p.end_date - timedelta(days=1)) for p in published],
+        unpublished=[(d, d + timedelta(days=13)) for d in finished if d not in done],
+    )
+
+
+@schedule_bp.route("/periods/<start>", methods=["GET"])
+@login_required
+def period_report(start):
+    """Hours per staff and unit of a published bi-week, straight from its snapshots."""
+    try:
+        period = PublishedPeriod.query.get_or_404(parse_ymd(start))
+    except ValueError:
+        abort(404)
+    rows = (
+        PeriodSnapshot.query
+        .with_entities(PeriodSnapshot.kind, PeriodSnapshot.entity_id, PeriodSnapshot.name, PeriodSnapshot.total_seconds)
+        .filter(PeriodSnapshot.period_start == period.start_date)
+        .order_by(PeriodSnapshot.name.asc())
+        .all()
+    )
+    return render_template(
+        "schedule/period_report.html",
+        period=period,
+        end_display=period.end_date - timedelta(days=1),
+        staff_rows=[r for r in rows if r.kind == "staff"],
+        unit_rows=[r for r in rows if r.kind == "unit"],
+    )
+
+
+@schedule_bp.route("/periods/<start>/publish", methods=["POST"])
+@login_required
+def publish_period(start):
+    try:
+        bw_start = parse_ymd(start)
+    except ValueError:
+        abort(404)
+    if bw_start != biweek_start_from_anchor(bw_start):
+        flash("That date doesn't start a bi-week.", "danger")
+        return redirect(url_for("schedule.list_periods"))
+    try:
+        count = publish(bw_start, current_user.id, period_biweeks)
+    except ValueError as exc:
+        flash(f"Not published: {exc}.", "danger")
+        return redirect(url_for("schedule.list_periods"))
+
+    flash(f"Bi-week {bw_start} published ({count} schedule snapshot(s)); its shifts are now read-only.", "success")
+    return redirect(url_for("schedule.list_periods"))
+
+
+@schedule_bp.route("/periods/<start>/unpublish", methods=["POST"])
+@login_required
+def unpublish_period(start):
+    try:
+        bw_start = parse_ymd(start)
+    except ValueError:
+        abort(404)
+    if not unpublish(bw_start):
+        abort(404)
+    flash(f"Bi-week {bw_start} unpublished; its shifts can be edited again.", "success")
+    return redirect(url_for("schedule.list_periods"))
+
+
+@schedule_bp.route("/events", methods=["GET"])
+@login_required
+def live_events():
+    """Server-Sent Events: assignment changes for one unit or staff (see app/live.py)."""
+    return Response(
+        stream(
+            unit_id=request.args.get("unit_id", type=int),
+            staff_id=request.args.get("staff_id", type=int),
+            last_id=request.headers.get("Last-Event-ID", type=int),
+        ),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,222 @@
+"""
+Ranked, typo-tolerant name search for staff and units.
+
+Backends, picked per database:
+- SQLite:   FTS5 tables (trigram tokenizer) kept in sync by triggers; candidates come
+            from an OR of the query's trigrams (and those of its one-swap variants),
+            plus a LIKE pass for one missing letter, and are re-scored in Python.
+- Postgres: pg_trgm GIN indexes; ILIKE substring or word-similarity match, scored in SQL.
+- anything else (or a schema built without migrations): plain ILIKE.
+
+All backends return ids best-first; apply_name_search() turns that into a filter + ORDER BY.
+The caller's own filters (is_active, ...) are applied inside the candidate query, so the
+MAX_CANDIDATES cut (typeahead lookups) only ever drops rows the caller would show. The
+list pages show every match and search uncapped (limit=None).
+"""
+import re
+
+from sqlalchemy import case, column, false, func, literal_column, or_, select, table, text
+
+from .extensions import db
+from .models import Staff, Unit
+
+MAX_CANDIDATES = 500
+FUZZY_THRESHOLD = 0.25
+
+# model -> (name column, SQLite FTS table)
+SEARCHABLE = {
+    Staff: ("full_name", "staff_fts"),
+    Unit: ("unit_name", "units_fts"),
+}
+
+_backend_cache: dict[str, str] = {}
+
+
+def _backend() -> str:
+    engine = db.session.get_bind()
+    key = str(engine.url)
+    if key not in _backend_cache:
+        backend = "like"
+        if engine.dialect.name == "sqlite":
+            found = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'staff_fts'")
+            ).first()
+            backend = "fts5" if found else "like"
+        elif engine.dialect.name == "postgresql":
+            found = db.session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+            backend = "trgm" if found else "like"
+        _backend_cache[key] = backend
+    return _backend_cache[key]
+
+
+def _trigrams(s: str) -> set[str]:
+    """pg_trgm-style trigrams: lower-cased words padded with two spaces in front, one behind."""
+    grams = set()
+    for word in re.findall(r"\w+", s.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    ta, tb = _trigrams(a), _trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def _transpositions(word: str) -> list[str]:
+    """The word plus every single adjacent swap ("jonh" -> "ojnh", "jnoh", "john")."""
+    if len(word) > 20:
+        return [word]
+    return [word] + [word[:i] + word[i + 1] + word[i] + word[i + 2:] for i in range(len(word) - 1)]
+
+
+def word_similarity(q: str, name: str) -> float:
+    """
+    How well every query word matches some word of `name`: each query word takes its
+    best similarity (one adjacent swap allowed) to any name word, the weakest word
+    counts. "jhon smth" vs "John Smith" -> min(1.0, 0.375).
+    """
+    words = re.findall(r"\w+", name.lower())
+    qwords = re.findall(r"\w+", q.lower())
+    if not words or not qwords:
+        return 0.0
+    return min(
+        max(similarity(v, w) for v in _transpositions(qw) for w in words)
+        for qw in qwords
+    )
+
+
+def _score(q: str, name: str) -> tuple:
+    """Sort key, best first: substring hits, then prefix hits, then trigram similarity."""
+    ql, nl = q.lower(), name.lower()
+    return (ql not in nl, not nl.startswith(ql), -max(similarity(q, name), word_similarity(q, name)), nl)
+
+
+def _fts_match(q: str) -> str | None:
+    """
+    FTS5 query: any trigram of any query word, or of its adjacent-swap variants so
+    that transposition typos still reach the right candidates. None if q is too short.
+    """
+    grams = {
+        v[i:i + 3]
+        for w in re.findall(r"\w+", q.lower())
+        for v in _transpositions(w)
+        for i in range(len(v) - 2)
+    }
+    if not grams:
+        return None
+    return " OR ".join('"' + g.replace('"', '""') + '"' for g in sorted(grams))
+
+
+def _deletion_patterns(q: str) -> list[str]:
+    """
+    LIKE patterns for a query word missing one inner letter ("smth" -> "%s_mth%",
+    "%sm_th%", "%smt_h%"). Such names may share no trigram with the query at all.
+    """
+    return sorted({
+        "%" + w[:i] + "_" + w[i:] + "%"
+        for w in re.findall(r"[^\W_]+", q.lower())
+        if len(w) >= 3
+        for i in range(1, len(w))
+    })
+
+
+def _search_fts5(model, name: str, fts_table: str, q: str, criteria, limit: int | None) -> list[int]:
+    col = getattr(model, name)
+    match = _fts_match(q)
+    if match is None:
+        # 1-2 characters: no trigrams to look up, plain substring match (prefix hits first)
+        rows = (
+            db.session.query(model.id)
+            .filter(col.ilike(f"%{q}%"), *criteria)
+            .order_by(col.ilike(f"{q}%").desc(), col.asc())
+            .limit(limit)
+            .all()
+        )
+        return [r[0] for r in rows]
+
+    fts = table(fts_table, column("rowid"), column("rank"))
+    rows = db.session.execute(
+        select(model.id, col)
+        .join(fts, fts.c.rowid == model.id)
+        .where(text(f"{fts_table} MATCH :match").bindparams(match=match), *criteria)
+        .order_by(fts.c.rank)
+        .limit(limit)
+    ).all()
+    candidates = dict(rows)
+    # a dropped letter ("smth") can leave no trigram in common with the name: scan for those
+    patterns = _deletion_patterns(q)
+    if patterns:
+        candidates.update(db.session.execute(
+            select(model.id, col)
+            .where(or_(*(col.ilike(p) for p in patterns)), *criteria)
+            .limit(limit)
+        ).all())
+
+    scored = sorted((_score(q, name), rid) for rid, name in candidates.items())
+    ids = [rid for key, rid in scored if not key[0] or -key[2] >= FUZZY_THRESHOLD]
+    return ids[:limit]
+
+
+def _search_trgm(model, name: str, q: str, criteria, limit: int | None) -> list[int]:
+    col = getattr(model, name)
+    like = f"%{q}%"
+    # SET LOCAL: the threshold only applies to this transaction
+    db.session.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :t, true)"),
+        {"t": str(FUZZY_THRESHOLD)},
+    )
+    rows = (
+        db.session.query(model.id)
+        .filter(col.ilike(like) | col.op("%>")(q), *criteria)
+        .order_by(
+            col.ilike(like).desc(),
+            func.word_similarity(q, col).desc(),
+            col.asc(),
+        )
+        .limit(limit)
+        .all()
+    )
+    return [r[0] for r in rows]
+
+
+def _search_like(model, name: str, q: str, criteria, limit: int | None) -> list[int]:
+    col = getattr(model, name)
+    rows = (
+        db.session.query(model.id)
+        .filter(col.ilike(f"%{q}%"), *criteria)
+        .order_by(col.asc())
+        .limit(limit)
+        .all()
+    )
+    return [r[0] for r in rows]
+
+
+def search_ids(model, q: str, *criteria, limit: int | None = MAX_CANDIDATES) -> list[int]:
+    """
+    Ids of `model` rows whose name matches `q` and that pass `criteria`, best match
+    first; at most `limit` of them (None: all).
+    """
+    name, fts_table = SEARCHABLE[model]
+    backend = _backend()
+    if backend == "fts5":
+        return _search_fts5(model, name, fts_table, q, criteria, limit)
+    if backend == "trgm":
+        return _search_trgm(model, name, q, criteria, limit)
+    return _search_like(model, name, q, criteria, limit)
+
+
+def apply_name_search(query, model, q: str, *criteria, limit: int | None = MAX_CANDIDATES):
+    """
+    Restrict `query` to rows of `model` matching `q`, ordered by rank. Pass the
+    query's filters as `criteria` as well, so they apply before the `limit` cut.
+    """
+    ids = search_ids(model, q, *criteria, limit=limit)
+    if not ids:
+        return query.filter(false())
+    # ids inline rather than two bind parameters each: an uncapped search can return thousands
+    ids = [literal_column(str(int(rid))) for rid in ids]
+    rank = case(*((rid, literal_column(str(pos))) for pos, rid in enumerate(ids)), value=model.id)
+    return query.filter(model.id.in_(ids)).order_by(rank)
@@ -0,0 +1,283 @@
+"""
+Synthetic data for local benchmarking: units, staff, recurring rules and years of
+Request/Assignment history generated from those rules.
+
+Everything is drawn from one random.Random(seed) and dated relative to `end_date`,
+so the same arguments always produce the same rows. Rows are written with Core
+executemany inserts in chunks, with ids assigned here so assignments can link to
+their requests without reading anything back.
+"""
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from .extensions import db
+from .models import (
+    Admin,
+    Assignment,
+    RecurringAssignment,
+    RecurringRequest,
+    Request as StaffRequest,
+    Staff,
+    Unit,
+)
+
+FIRST_NAMES = [
+    "Ava", "Liam", "Noah", "Emma", "Olivia", "Lucas", "Mia", "Ethan", "Zoe", "Omar",
+    "Priya", "Chen", "Fatima", "Ivan", "Sofia", "Grace", "Kwame", "Aisha", "Mateo", "Hana",
+    "David", "Ngozi", "Elena", "Tariq", "Rosa", "Samuel", "Yuki", "Amara", "Jonas", "Leila",
+]
+LAST_NAMES = [
+    "Brown", "Wilson", "Taylor", "Anderson", "Thomas", "Moore", "Martin", "Lee", "Walker", "Hall",
+    "Young", "King", "Wright", "Lopez", "Hill", "Okafor", "Mensah", "Nguyen", "Patel", "Kowalski",
+    "Silva", "Haddad", "Ibrahim", "Novak", "Sato", "Reyes", "Adeyemi", "Fischer", "Costa", "Murphy",
+]
+UNIT_KINDS = [
+    "ICU", "Emergency", "Maternity", "Pediatrics", "Oncology", "Cardiology", "Surgery",
+    "Orthopedics", "Neurology", "Geriatrics", "Rehab", "Psychiatry", "Dialysis", "Recovery",
+]
+
+# (start, end, weight) — night shift ends the next morning
+SHIFTS = [("07:00", "15:00", 5), ("15:00", "23:00", 3), ("23:00", "07:00", 2)]
+DAY_BITS = [1, 2, 4, 8, 16, 32, 64]  # Mon..Sun, same mask as the recurring models
+
+
+def _combine(d: date, hhmm: str) -> datetime:
+    h, m = map(int, hhmm.split(":"))
+    return datetime(d.year, d.month, d.day, h, m)
+
+
+def _shift_window(d: date, shift: int) -> tuple[datetime, datetime]:
+    start_s, end_s, _ = SHIFTS[shift]
+    start, end = _combine(d, start_s), _combine(d, end_s)
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+
+def _work_mask(rng: random.Random) -> int:
+    days = rng.sample(range(7), rng.choice([3, 4, 4, 5, 5, 5]))
+    mask = 0
+    for d in days:
+        mask |= DAY_BITS[d]
+    return mask
+
+
+def _next_id(model) -> int:
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _insert_chunk(model, rows: list[dict]) -> None:
+    if rows:
+        db.session.execute(insert(model), rows)
+
+
+def _fix_sequences() -> None:
+    """Explicit ids bypass Postgres sequences; move them past the new max(id)."""
+    if db.session.get_bind().dialect.name != "postgresql":
+        return
+    for table in ("units", "staff", "recurring_assignments", "recurring_requests", "requests", "assignments"):
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def seed_database(
+    n_units: int,
+    n_staff: int,
+    years: float,
+    future_days: int,
+    seed: int,
+    end_date: date,
+    chunk_size: int = 5000,
+    progress=None,
+) -> dict[str, int]:
+    rng = random.Random(seed)
+    counts = {"units": 0, "staff": 0, "rules": 0, "requests": 0, "assignments": 0}
+    first_day = end_date - timedelta(days=int(years * 365))
+    last_day = end_date + timedelta(days=future_days)
+    stamp = datetime.combine(first_day, datetime.min.time())
+
+    admin = Admin.query.filter_by(email="seed@example.test").first()
+    if admin is None:
+        admin = Admin(full_name="Seed Admin", email="seed@example.test", is_active=False)
+        admin.set_password(f"seed-{seed}")
+        db.session.add(admin)
+        db.session.flush()
+
+    # ------------------
+    # Units and staff
+    # ------------------
+    unit_id0 = _next_id(Unit)
+    units = [
+        {
+            "id": unit_id0 + i,
+            "unit_name": f"{UNIT_KINDS[i % len(UNIT_KINDS)]} {i // len(UNIT_KINDS) + 1}",
+            "address": f"{rng.randrange(1, 999)} Hospital Way, Wing {chr(65 + i % 6)}",
+            "is_active": True,
+            "created_at": stamp,
+        }
+        for i in range(n_units)
+    ]
+    staff_id0 = _next_id(Staff)
+    staff = [
+        {
+            "id": staff_id0 + i,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "gender": rng.choice(["Female", "Female", "Male", "Other"]),
+            "phone": f"555-{rng.randrange(1000, 9999)}",
+            "is_active": rng.random() > 0.05,
+            "created_at": stamp,
+        }
+        for i in range(n_staff)
+    ]
+    for i in range(0, len(units), chunk_size):
+        _insert_chunk(Unit, units[i:i + chunk_size])
+    for i in range(0, len(staff), chunk_size):
+        _insert_chunk(Staff, staff[i:i + chunk_size])
+    counts["units"], counts["staff"] = len(units), len(staff)
+
+    # ------------------
+    # Recurring rules: one weekly pattern per staff, one request rule per unit/shift
+    # ------------------
+    weights = [w for _, _, w in SHIFTS]
+    ra_id0 = _next_id(RecurringAssignment)
+    patterns = []  # (staff_id, unit_id, shift, mask, rule_id)
+    ra_rows = []
+    for i, s in enumerate(staff):
+        shift = rng.choices(range(len(SHIFTS)), weights)[0]
+        unit_id = units[rng.randrange(n_units)]["id"]
+        mask = _work_mask(rng)
+        rule_id = ra_id0 + i
+        patterns.append((s["id"], unit_id, shift, mask, rule_id))
+        ra_rows.append({
+            "id": rule_id,
+            "staff_id": s["id"],
+            "unit_id": unit_id,
+            "start_time": SHIFTS[shift][0],
+            "end_time": SHIFTS[shift][1],
+            "days_mask": mask,
+            "start_date": first_day,
+            "end_date": None,
+            "is_active": s["is_active"],
+            "notes": None,
+            "created_by_admin_id": admin.id,
+            "created_at": stamp,
+        })
+
+    rr_id0 = _next_id(RecurringRequest)
+    rr_ids = {}
+    rr_rows = []
+    for u in units:
+        for shift, (start_s, end_s, _) in enumerate(SHIFTS):
+            rule_id = rr_id0 + len(rr_rows)
+            rr_ids[(u["id"], shift)] = rule_id
+            rr_rows.append({
+                "id": rule_id,
+                "unit_id": u["id"],
+                "coordinator_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "staff_needed": 1,
+                "start_time": start_s,
+                "end_time": end_s,
+                "days_mask": 127,
+                "start_date": first_day,
+                "end_date": None,
+                "is_active": True,
+                "notes": None,
+                "created_by_admin_id": admin.id,
+                "created_at": stamp,
+            })
+    for i in range(0, len(ra_rows), chunk_size):
+        _insert_chunk(RecurringAssignment, ra_rows[i:i + chunk_size])
+    for i in range(0, len(rr_rows), chunk_size):
+        _insert_chunk(RecurringRequest, rr_rows[i:i + chunk_size])
+    counts["rules"] = len(ra_rows) + len(rr_rows)
+    db.session.commit()
+
+    # who works which (unit, shift) on each weekday
+    by_weekday = [dict() for _ in range(7)]
+    for staff_id, unit_id, shift, mask, rule_id in patterns:
+        for wd in range(7):
+            if mask & DAY_BITS[wd]:
+                by_weekday[wd].setdefault((unit_id, shift), []).append((staff_id, rule_id))
+
+    # ------------------
+    # History: one request per staffed unit/shift/day, assignments linked to it
+    # ------------------
+    req_id = _next_id(StaffRequest)
+    asg_id = _next_id(Assignment)
+    req_buf, asg_buf = [], []
+
+    def flush():
+        _insert_chunk(StaffRequest, req_buf)
+        _insert_chunk(Assignment, asg_buf)
+        counts["requests"] += len(req_buf)
+        counts["assignments"] += len(asg_buf)
+        req_buf.clear()
+        asg_buf.clear()
+        db.session.commit()
+        if progress:
+            progress(counts)
+
+    d = first_day
+    while d <= last_day:
+        created = datetime.combine(d - timedelta(days=rng.randrange(3, 21)), datetime.min.time())
+        for (unit_id, shift), crew in by_weekday[d.weekday()].items():
+            start, end = _shift_window(d, shift)
+            needed = len(crew) + (1 if rng.random() < 0.15 else 0)
+            request_canceled = rng.random() < 0.02
+            filled = 0
+
+            for staff_id, rule_id in crew:
+                if rng.random() < 0.05:
+                    continue  # called in sick / not booked: leaves a gap
+                canceled = rng.random() < 0.03
+                if not canceled:
+                    filled += 1
+                asg_buf.append({
+                    "id": asg_id,
+                    "staff_id": staff_id,
+                    "unit_id": unit_id,
+                    "request_id": req_id,
+                    "start_datetime": start,
+                    "end_datetime": end,
+                    "status": "Canceled" if canceled else ("Confirmed" if d < end_date else "Scheduled"),
+                    "notes": None,
+                    "created_by_admin_id": admin.id,
+                    "created_at": created,
+                    "recurring_id": rule_id,
+                    "occurrence_date": d,
+                })
+                asg_id += 1
+
+            if request_canceled:
+                status = "Canceled"
+            else:
+                status = "Satisfied" if filled >= needed else "Open"
+            req_buf.append({
+                "id": req_id,
+                "unit_id": unit_id,
+                "coordinator_name": "Seed Coordinator",
+                "staff_needed": needed,
+                "start_datetime": start,
+                "end_datetime": end,
+                "status": status,
+                "filled_count": filled,
+                "created_by_admin_id": admin.id,
+                "notes": None,
+                "created_at": created,
+                "recurring_id": rr_ids[(unit_id, shift)],
+                "occurrence_date": d,
+            })
+            req_id += 1
+
+        if len(asg_buf) >= chunk_size or len(req_buf) >= chunk_size:
+            flush()
+        d += timedelta(days=1)
+
+    flush()
+    _fix_sequences()
+    db.session.commit()
+    return counts
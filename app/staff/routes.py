@@ -2,6 +2,9 @@ from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required
 from ..extensions import db
 from ..models import Staff
+from ..feeds.versions import touch_feeds
+from ..search import apply_name_search
+from ..utils.pagination import page_args, lookup_response
 from . import staff_bp
 
 GENDER_OPTIONS = ["Male", "Female", "Other"]
@@ -12,13 +15,14 @@ def list_staff():
     q = (request.args.get("q") or "").strip()
     show_inactive = request.args.get("inactive") == "1"
 
-    query = Staff.query
+    filters = [] if show_inactive else [Staff.is_active.is_(True)]
+    query = Staff.query.filter(*filters)
     if q:
-        query = query.filter(Staff.full_name.ilike(f"%{q}%"))
-    if not show_inactive:
-        query = query.filter_by(is_active=True)
+        query = apply_name_search(query, Staff, q, *filters, limit=None)  # ranked, typo-tolerant, every match
+    else:
+        query = query.order_by(Staff.full_name.asc())
 
-    staff = query.order_by(Staff.full_name.asc()).all()
+    staff = query.all()
 
     return render_template(
         "staff/list.html",
@@ -27,6 +31,29 @@ def list_staff():
         show_inactive=show_inactive
     )
 
+@staff_bp.get("/lookup")
+@login_required
+def lookup_staff():
+    """Paginated JSON for staff typeahead pickers."""
+    q = (request.args.get("q") or "").strip()
+    include_inactive = request.args.get("inactive") == "1"
+
+    query = db.session.query(Staff.id, Staff.full_name, Staff.is_active)
+    filters = [] if include_inactive else [Staff.is_active.is_(True)]
+    query = query.filter(*filters)
+    if q:
+        query = apply_name_search(query, Staff, q, *filters)
+    else:
+        query = query.order_by(Staff.full_name.asc(), Staff.id.asc())
+
+    page, per_page = page_args()
+    return lookup_response(
+        query,
+        lambda s: {"id": s.id, "text": s.full_name, "active": s.is_active},
+        page,
+        per_page,
+    )
+
 @staff_bp.get("/new")
 @login_required
 def new_staff():
@@ -78,6 +105,9 @@ def update_staff(staff_id):
         flash("Please select a valid gender.", "danger")
         return redirect(url_for("staff.edit_staff", staff_id=staff_id))
 
+    if full_name != s.full_name:
+        # unit feeds list shifts by staff name
+        touch_feeds(staff_ids=[s.id], all_units=True)
     s.full_name = full_name
     s.gender = gender
     s.phone = phone
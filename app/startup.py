@@ -0,0 +1,112 @@
+"""
+What create_app() costs at import time, and keeping it small.
+
+Every gunicorn worker, App Service instance and `flask` invocation pays for the
+imports create_app() triggers. Flask-Migrate alone pulls in alembic, mako and
+pygments (~0.12 s on top of Flask + SQLAlchemy), yet only migrations need it:
+the `flask` CLI gets it up front (for `flask db ...`), everything else only when
+something first reads app.extensions["migrate"] (e.g. a script calling
+flask_migrate.upgrade()).
+
+Heavy optional packages (PDF/image export: weasyprint, fontTools, playwright,
+PIL) follow the same rule as the CLI commands: import them inside the function
+that uses them, never at module level. `flask startup-profile` shows where the
+time goes, and `python -m bench.startup` fails when create_app() gets slower
+than its budget or loads any of HEAVY_MODULES.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from .extensions import db
+
+HEAVY_MODULES = ("alembic", "mako", "pygments", "weasyprint", "fontTools", "playwright", "PIL")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# run in a fresh interpreter: import the package and build the app, report timings on stdout
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+create_app()
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "factory_ms": (t2 - t1) * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+# ------------------
+# lazy Flask-Migrate
+# ------------------
+class _LazyMigrate:
+    """Placeholder for app.extensions["migrate"]: sets up Flask-Migrate on first attribute access."""
+
+    def __init__(self, app):
+        self._app = app
+
+    def __getattr__(self, name):
+        init_migrate(self._app)
+        return getattr(self._app.extensions["migrate"], name)
+
+
+def init_migrate(app) -> None:
+    """Register Flask-Migrate (and its `db` command group) on `app`, once."""
+    if "migrate" in app.extensions and not isinstance(app.extensions["migrate"], _LazyMigrate):
+        return
+    from flask_migrate import Migrate
+
+    Migrate(app, db)
+
+
+def defer_migrate(app) -> None:
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":  # set by the `flask` command before it loads the app
+        init_migrate(app)
+    else:
+        app.extensions["migrate"] = _LazyMigrate(app)
+
+
+# ------------------
+# measuring
+# ------------------
+def parse_importtime(stderr: str) -> list[dict]:
+    """Rows of `python -X importtime` output: module, self/cumulative microseconds, nesting depth."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def measure_startup(importtime: bool = False) -> dict:
+    """Import `app` and run create_app() in a fresh interpreter; timings in ms, loaded modules."""
+    cmd = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", _PROBE]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    env.pop("FLASK_RUN_FROM_CLI", None)  # measure what a web worker pays, not the CLI
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "startup probe failed")
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["total_ms"] = result["import_ms"] + result["factory_ms"]
+    result["heavy"] = sorted({m.split(".")[0] for m in result.pop("modules")} & set(HEAVY_MODULES))
+    if importtime:
+        result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def by_package(rows: list[dict]) -> list[tuple[str, int]]:
+    """Self time summed per top-level package, largest first."""
+    totals: dict[str, int] = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        totals[package] = totals.get(package, 0) + row["self_us"]
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
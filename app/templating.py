@@ -0,0 +1,84 @@
+"""
+Jinja setup: an on-disk bytecode cache and a {% cache %} fragment tag.
+
+- Compiled templates are kept in instance/jinja_cache (or JINJA_BYTECODE_CACHE_DIR),
+  so a worker or CLI process that starts later loads bytecode instead of parsing
+  and compiling every template again. Entries are keyed by the template source's
+  checksum, so edited templates are never served stale.
+
+- {% cache key, ... %}...{% endcache %} stores the rendered body in a per-process
+  LRU (SCHEDULE_FRAGMENT_CACHE_SIZE entries, default 2000) under the given key
+  parts. There is no invalidation: the key must name everything the body shows,
+  e.g. the bi-week day cards are keyed by (mode, owner, date, day.version), where
+  the version is a fingerprint of that day's shifts.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from .config import env_int
+from .metrics import record_cache
+
+
+class FragmentCache:
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._items: OrderedDict = OrderedDict()
+
+    def get_or_render(self, key: tuple, render) -> Markup:
+        with self._lock:
+            html = self._items.get(key)
+            if html is not None:
+                self._items.move_to_end(key)
+        record_cache("fragments", html is not None)
+        if html is None:
+            html = Markup(render())
+            with self._lock:
+                self._items[key] = html
+                while len(self._items) > self.size:
+                    self._items.popitem(last=False)
+        return html
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+fragments = FragmentCache(env_int("SCHEDULE_FRAGMENT_CACHE_SIZE", 2000))
+
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache part, part, ... %}body{% endcache %}: the body is rendered once per
+    distinct key. Keys are global, so start them with a name ("day", ...).
+    """
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        key = nodes.Tuple(parts, "load")
+        return nodes.CallBlock(self.call_method("_cached", [key]), [], [], body).set_lineno(lineno)
+
+    def _cached(self, key, caller):
+        return fragments.get_or_render(key, caller)
+
+
+def init_templating(app) -> None:
+    """Call before anything touches app.jinja_env (it's created on first use)."""
+    directory = os.getenv("JINJA_BYTECODE_CACHE_DIR") or os.path.join(app.instance_path, "jinja_cache")
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_options = {
+        **app.jinja_options,
+        "bytecode_cache": FileSystemBytecodeCache(directory),
+        "extensions": [*app.jinja_options.get("extensions", ()), FragmentCacheExtension],
+    }
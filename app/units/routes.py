@@ -2,6 +2,9 @@ from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required
 from ..extensions import db
 from ..models import Unit
+from ..feeds.versions import touch_feeds
+from ..search import apply_name_search
+from ..utils.pagination import page_args, lookup_response
 from . import units_bp
 
 @units_bp.get("/")
@@ -10,13 +13,14 @@ def list_units():
     q = (request.args.get("q") or "").strip()
     show_inactive = request.args.get("inactive") == "1"
 
-    query = Unit.query
+    filters = [] if show_inactive else [Unit.is_active.is_(True)]
+    query = Unit.query.filter(*filters)
     if q:
-        query = query.filter(Unit.unit_name.ilike(f"%{q}%"))
-    if not show_inactive:
-        query = query.filter_by(is_active=True)
+        query = apply_name_search(query, Unit, q, *filters, limit=None)  # ranked, typo-tolerant, every match
+    else:
+        query = query.order_by(Unit.unit_name.asc())
 
-    units = query.order_by(Unit.unit_name.asc()).all()
+    units = query.all()
 
     return render_template(
         "units/list.html",
@@ -25,6 +29,29 @@ def list_units():
         show_inactive=show_inactive
     )
 
+@units_bp.get("/lookup")
+@login_required
+def lookup_units():
+    """Paginated JSON for unit typeahead pickers."""
+    q = (request.args.get("q") or "").strip()
+    include_inactive = request.args.get("inactive") == "1"
+
+    query = db.session.query(Unit.id, Unit.unit_name, Unit.is_active)
+    filters = [] if include_inactive else [Unit.is_active.is_(True)]
+    query = query.filter(*filters)
+    if q:
+        query = apply_name_search(query, Unit, q, *filters)
+    else:
+        query = query.order_by(Unit.unit_name.asc(), Unit.id.asc())
+
+    page, per_page = page_args()
+    return lookup_response(
+        query,
+        lambda u: {"id": u.id, "text": u.unit_name, "active": u.is_active},
+        page,
+        per_page,
+    )
+
 @units_bp.get("/new")
 @login_required
 def new_unit():
@@ -66,6 +93,9 @@ def update_unit(unit_id):
         flash("Unit name is required.", "danger")
         return redirect(url_for("units.edit_unit", unit_id=unit_id))
 
+    if unit_name != u.unit_name:
+        # staff feeds list shifts by unit name
+        touch_feeds(unit_ids=[u.id], all_staff=True)
     u.unit_name = unit_name
     u.address = address
     u.is_active = is_active
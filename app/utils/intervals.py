@@ -0,0 +1,59 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+
+
+class IntervalIndex:
+    """
+    Per-key (staff id) sorted (start, end) spans, with an optional item per span.
+
+    Spans may overlap each other (double bookings made before the no-overlap
+    checks existed), so the last span starting before `end` is not the only
+    candidate: each position also keeps the index of the latest-ending span up to
+    it, and an overlap check is one bisect plus one comparison.
+    """
+
+    def __init__(self):
+        self._spans = defaultdict(list)
+        self._items = defaultdict(list)
+        self._reach = defaultdict(list)  # reach[i]: index of the latest end among spans[:i + 1]
+
+    def add(self, key, start: datetime, end: datetime, item=None) -> None:
+        spans = self._spans[key]
+        i = bisect_right(spans, (start, end))
+        spans.insert(i, (start, end))
+        self._items[key].insert(i, item)
+        self._update_reach(key, i)
+
+    def remove(self, key, start: datetime, end: datetime) -> None:
+        spans = self._spans.get(key, [])
+        i = bisect_left(spans, (start, end))
+        if i < len(spans) and spans[i] == (start, end):
+            del spans[i]
+            del self._items[key][i]
+            self._update_reach(key, i)
+
+    def _update_reach(self, key, i: int) -> None:
+        spans, reach = self._spans[key], self._reach[key]
+        del reach[i:]
+        best = reach[-1] if reach else None
+        for j in range(i, len(spans)):
+            if best is None or spans[j][1] > spans[best][1]:
+                best = j
+            reach.append(best)
+
+    def find(self, key, start: datetime, end: datetime):
+        """(start, end, item) of a span overlapping [start, end), or None."""
+        spans = self._spans.get(key)
+        if not spans:
+            return None
+        i = bisect_left(spans, (end,))  # spans starting before `end`
+        if not i:
+            return None
+        j = self._reach[key][i - 1]
+        if spans[j][1] <= start:
+            return None
+        return (*spans[j], self._items[key][j])
+
+    def overlaps(self, key, start: datetime, end: datetime) -> bool:
+        return self.find(key, start, end) is not None
@@ -0,0 +1,24 @@
+from flask import jsonify, request
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+
+
+def page_args() -> tuple[int, int]:
+    """(page, per_page) from the query string, clamped to sane bounds."""
+    page = max(request.args.get("page", type=int) or 1, 1)
+    per_page = request.args.get("per_page", type=int) or DEFAULT_PAGE_SIZE
+    return page, max(1, min(per_page, MAX_PAGE_SIZE))
+
+
+def lookup_response(query, item, page: int, per_page: int):
+    """
+    JSON page for typeahead widgets: {"results": [...], "page": n, "has_more": bool}.
+    Fetches one extra row instead of running a COUNT.
+    """
+    rows = query.offset((page - 1) * per_page).limit(per_page + 1).all()
+    return jsonify(
+        results=[item(r) for r in rows[:per_page]],
+        page=page,
+        has_more=len(rows) > per_page,
+    )
@@ -0,0 +1,93 @@
+"""
+Warm a freshly built app before it takes traffic.
+
+The first request a worker serves otherwise pays for compiling Jinja templates,
+first-use imports, SQLAlchemy's statement compilation (cached per engine, keyed
+by query shape), the search-backend probe and the principal/dashboard caches.
+warm_up() does all of that up front: it compiles every template, then renders
+the hot read-only pages through the test client as the first active admin.
+
+Under gunicorn with preload_app (see gunicorn.conf.py) this runs once in the
+master, and every forked worker inherits the warm state copy-on-write. The
+pooled connections it opened are closed at the end, so no socket or SQLite
+handle crosses the fork.
+
+    WARMUP=0    # skip (e.g. against a database that isn't migrated yet)
+"""
+import time
+
+from flask import url_for
+
+from .extensions import db
+from .models import Admin, Staff, Unit
+
+# the request environ key that keeps warmup traffic out of /metrics
+WARMUP_ENVIRON_KEY = "staffscheduler.warmup"
+
+
+def _pages(unit_id: int | None, staff_id: int | None) -> list[str]:
+    pages = [
+        url_for("main.dashboard"),
+        url_for("schedule.biweekly_home"),
+        url_for("assignments.list_assignments"),
+        url_for("assignments.new_assignment"),
+        url_for("requests.list_requests"),
+        url_for("requests.request_gaps"),
+        url_for("staff.list_staff"),
+        url_for("staff.list_staff", q="a"),
+        url_for("staff.lookup_staff", q="a"),
+        url_for("units.list_units"),
+        url_for("units.lookup_units", q="a"),
+        url_for("recurring_assignments.list_ra"),
+        url_for("recurring_requests.list_rr"),
+    ]
+    if unit_id:
+        pages.append(url_for("schedule.biweekly_by_unit", unit_id=unit_id))
+    if staff_id:
+        pages.append(url_for("schedule.biweekly_by_staff", staff_id=staff_id))
+    return pages
+
+
+def _compile_templates(app) -> int:
+    env = app.jinja_env
+    names = env.list_templates(filter_func=lambda name: name.endswith(".html"))
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def warm_up(app) -> dict:
+    """Compile templates and render the hot pages once; returns what was done, for the log."""
+    t0 = time.perf_counter()
+    templates = _compile_templates(app)
+
+    with app.app_context():
+        admin_id = db.session.query(Admin.id).filter(Admin.is_active.is_(True)).order_by(Admin.id).limit(1).scalar()
+        unit_id = db.session.query(Unit.id).filter(Unit.is_active.is_(True)).order_by(Unit.id).limit(1).scalar()
+        staff_id = db.session.query(Staff.id).filter(Staff.is_active.is_(True)).order_by(Staff.id).limit(1).scalar()
+        with app.test_request_context():
+            pages = _pages(unit_id, staff_id)
+
+    failed = []
+    if admin_id is not None:
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(admin_id)
+            sess["_fresh"] = True
+        for page in pages:
+            response = client.get(page, environ_base={WARMUP_ENVIRON_KEY: True})
+            if response.status_code != 200:
+                failed.append(f"{page} ({response.status_code})")
+    else:
+        pages = []  # nobody to render them as; templates and imports are still warm
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+    return {
+        "templates": templates,
+        "pages": len(pages) - len(failed),
+        "failed": failed,
+        "ms": round((time.perf_counter() - t0) * 1000),
+    }
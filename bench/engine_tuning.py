@@ -0,0 +1,194 @@
+"""
+Concurrent read/write throughput with and without the engine tuning layer.
+
+Seeds a temp database, then for each configuration runs reader threads (bi-week
+unit schedule query) alongside writer threads (insert + commit) for a fixed time
+and reports operations per second and latency percentiles.
+
+    python -m bench.engine_tuning                   # SQLite: defaults vs WAL/pragmas
+    python -m bench.engine_tuning --seconds 10 --readers 8 --writers 2
+    python -m bench.engine_tuning --database-url postgresql://...  # pool settings (throwaway DB!)
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def build_app(database_url: str, tuned: bool):
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["DB_ENGINE_TUNING"] = "1" if tuned else "0"
+
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed(app, n_assignments: int) -> None:
+    from app.extensions import db
+    from app.models import Admin, Assignment, Staff, Unit
+
+    rng = random.Random(7)
+    with app.app_context():
+        admin = Admin(full_name="Bench", email="bench@example.test", password_hash="x")
+        units = [Unit(unit_name=f"Unit {i}") for i in range(10)]
+        staff = [Staff(full_name=f"Staff {i}", gender="Other") for i in range(200)]
+        db.session.add_all([admin, *units, *staff])
+        db.session.commit()
+
+        base = datetime(2025, 1, 3, 7)
+        rows = []
+        for i in range(n_assignments):
+            start = base + timedelta(days=rng.randrange(365), hours=rng.choice([0, 8, 16]))
+            rows.append({
+                "staff_id": rng.randrange(1, 201),
+                "unit_id": rng.randrange(1, 11),
+                "start_datetime": start,
+                "end_datetime": start + timedelta(hours=8),
+                "status": "Scheduled",
+                "created_by_admin_id": admin.id,
+                "created_at": datetime.utcnow(),
+            })
+        db.session.execute(Assignment.__table__.insert(), rows)
+        db.session.commit()
+
+
+def reader(app, stop, stats, lock):
+    from app.extensions import db
+    from app.models import Assignment
+
+    rng = random.Random(threading.get_ident())
+    lat, errors = [], 0
+    with app.app_context():
+        while not stop.is_set():
+            start = datetime(2025, 1, 3) + timedelta(days=14 * rng.randrange(26))
+            t0 = time.perf_counter()
+            try:
+                (
+                    Assignment.query.filter(
+                        Assignment.unit_id == rng.randrange(1, 11),
+                        Assignment.not_canceled(),
+                        Assignment.start_datetime < start + timedelta(days=14),
+                        Assignment.end_datetime > start,
+                    )
+                    .order_by(Assignment.start_datetime.asc())
+                    .all()
+                )
+                db.session.rollback()
+                lat.append(time.perf_counter() - t0)
+            except Exception:
+                db.session.rollback()
+                errors += 1
+    with lock:
+        stats["reads"].extend(lat)
+        stats["read_errors"] += errors
+
+
+def writer(app, stop, stats, lock):
+    from app.extensions import db
+    from app.models import Assignment
+
+    rng = random.Random(threading.get_ident())
+    lat, errors = [], 0
+    with app.app_context():
+        while not stop.is_set():
+            start = datetime(2026, 1, 2) + timedelta(hours=rng.randrange(24 * 365))
+            t0 = time.perf_counter()
+            try:
+                db.session.add(Assignment(
+                    staff_id=rng.randrange(1, 201),
+                    unit_id=rng.randrange(1, 11),
+                    start_datetime=start,
+                    end_datetime=start + timedelta(hours=8),
+                    status="Scheduled",
+                    created_by_admin_id=1,
+                ))
+                db.session.commit()
+                lat.append(time.perf_counter() - t0)
+            except Exception:
+                db.session.rollback()
+                errors += 1
+    with lock:
+        stats["writes"].extend(lat)
+        stats["write_errors"] += errors
+
+
+def run(database_url: str, tuned: bool, args) -> dict:
+    app = build_app(database_url, tuned)
+    seed(app, args.rows)
+
+    stats = {"reads": [], "writes": [], "read_errors": 0, "write_errors": 0}
+    stop, lock = threading.Event(), threading.Lock()
+    threads = [threading.Thread(target=reader, args=(app, stop, stats, lock)) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(app, stop, stats, lock)) for _ in range(args.writers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    from app.extensions import db
+    with app.app_context():
+        db.engine.dispose()
+    return stats
+
+
+def report(label: str, stats: dict, seconds: float) -> None:
+    r, w = stats["reads"], stats["writes"]
+    print(f"{label:<10} reads {len(r) / seconds:8.0f}/s  p50 {percentile(r, 50) * 1000:6.1f}ms  "
+          f"p95 {percentile(r, 95) * 1000:6.1f}ms  errors {stats['read_errors']}")
+    print(f"{'':<10} writes {len(w) / seconds:7.0f}/s  p50 {percentile(w, 50) * 1000:6.1f}ms  "
+          f"p95 {percentile(w, 95) * 1000:6.1f}ms  errors {stats['write_errors']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Run against this database instead of temp SQLite files.")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=6)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=50000, help="Assignments to seed.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for tuned in (False, True):
+        url = args.database_url
+        if not url:
+            fd, path = tempfile.mkstemp(suffix=".db", prefix=f"engine-{'tuned' if tuned else 'default'}-")
+            os.close(fd)
+            url = f"sqlite:///{path}"
+        results[tuned] = run(url, tuned, args)
+        if args.database_url:
+            # same database for both runs: start the second one from scratch
+            from app import create_app
+            from app.extensions import db
+            with create_app().app_context():
+                db.drop_all()
+
+    print(f"{args.readers} readers + {args.writers} writers for {args.seconds:.0f}s each")
+    report("default", results[False], args.seconds)
+    report("tuned", results[True], args.seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Concurrent HTTP load test against a running instance (no third-party packages).
+
+Each virtual user opens a keep-alive connection, logs in as an admin, then
+replays a weighted mix of schedule views, list filters, typeahead lookups and
+(unless --read-only) assignment creates until the time is up. Reports
+throughput and p50/p95/p99 latency per endpoint.
+
+    flask run --port 5000 &
+    python -m bench.loadtest --url http://127.0.0.1:5000 --email admin@example.com --password ...
+    python -m bench.loadtest --url https://staging.example.net --concurrency 32 --duration 60 --read-only
+
+The password may also come from LOADTEST_PASSWORD. Creates go on far-future
+dates (--create-offset-days) so they never collide with real shifts; point this
+at a throwaway or staging database, not production, unless --read-only.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import ssl
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class HttpError(Exception):
+    pass
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client with a cookie jar; one per virtual user."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.https = parts.scheme == "https"
+        self.port = parts.port or (443 if self.https else 80)
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.cookies: dict[str, str] = {}
+        self.reader = self.writer = None
+
+    async def _connect(self):
+        ctx = ssl.create_default_context() if self.https else None
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=ctx)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, form: dict | None = None) -> tuple[int, dict, bytes]:
+        for attempt in (1, 2):
+            if self.writer is None:
+                await self._connect()
+            try:
+                return await asyncio.wait_for(self._roundtrip(method, path, form), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # server closed an idle keep-alive connection: reconnect once
+                await self.close()
+                if attempt == 2:
+                    raise
+            except asyncio.TimeoutError:
+                await self.close()
+                raise HttpError(f"timeout after {self.timeout}s")
+
+    async def _roundtrip(self, method, path, form):
+        body = urlencode(form).encode() if form is not None else b""
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host_header}",
+            "Connection: keep-alive",
+            "Accept-Encoding: identity",
+            "User-Agent: staffscheduler-loadtest",
+        ]
+        if self.cookies:
+            headers.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        if form is not None:
+            headers.append("Content-Type: application/x-www-form-urlencoded")
+            headers.append(f"Content-Length: {len(body)}")
+        self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+
+        resp_headers = {}
+        while True:
+            line = (await self.reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                cookie = value.split(";", 1)[0]
+                k, _, v = cookie.partition("=")
+                self.cookies[k.strip()] = v.strip()
+            else:
+                resp_headers[name] = value
+
+        if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            data = b"".join(chunks)
+        elif "content-length" in resp_headers:
+            data = await self.reader.readexactly(int(resp_headers["content-length"]))
+        else:
+            data = await self.reader.read()
+            await self.close()
+
+        if resp_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, resp_headers, data
+
+
+# ------------------
+# Traffic mix
+# ------------------
+def _biweek_date(rng):
+    return (date.today() + timedelta(days=rng.randrange(-42, 28))).isoformat()
+
+
+def _ops(ids, args):
+    """(weight, label, method, fn(rng) -> (path, form)) for every endpoint in the mix."""
+    today = date.today()
+    ops = [
+        (30, "GET /schedule/unit/<id>", "GET",
+         lambda rng: (f"/schedule/unit/{rng.choice(ids['units'])}?date={_biweek_date(rng)}", None)),
+        (25, "GET /schedule/staff/<id>", "GET",
+         lambda rng: (f"/schedule/staff/{rng.choice(ids['staff'])}?date={_biweek_date(rng)}", None)),
+        (5, "GET /schedule/", "GET", lambda rng: (f"/schedule/?date={_biweek_date(rng)}", None)),
+        (12, "GET /assignments/?filters", "GET", lambda rng: (
+            "/assignments/?" + urlencode({
+                "unit_id": rng.choice(ids["units"]),
+                "from": today.isoformat(),
+                "to": (today + timedelta(days=13)).isoformat(),
+            }), None)),
+        (10, "GET /requests/?filters", "GET", lambda rng: (
+            "/requests/?" + urlencode({"unit_id": rng.choice(ids["units"]), "status": "Open"}), None)),
+        (8, "GET /staff/lookup", "GET", lambda rng: (
+            "/staff/lookup?" + urlencode({"q": rng.choice(ids["names"])[:rng.randrange(2, 6)]}), None)),
+    ]
+    if not args.read_only:
+        ops.append((5, "POST /assignments/new", "POST", lambda rng: ("/assignments/new", {
+            "staff_id": rng.choice(ids["staff"]),
+            "unit_id": rng.choice(ids["units"]),
+            "date": (today + timedelta(days=args.create_offset_days + rng.randrange(365))).isoformat(),
+            "start_time": rng.choice(["07:00", "15:00", "23:00"]),
+            "end_time": rng.choice(["15:00", "23:00", "07:00"]),
+            "status": "Scheduled",
+        })))
+    return ops
+
+
+async def login(conn: Connection, email: str, password: str) -> None:
+    status, headers, _ = await conn.request("POST", "/auth/login", {"email": email, "password": password})
+    if status != 302 or "/auth/login" in headers.get("location", ""):
+        raise HttpError(f"login failed for {email} (status {status})")
+
+
+async def discover(conn: Connection) -> dict:
+    """Unit/staff ids and names to aim requests at, via the typeahead JSON endpoints."""
+    ids = {"units": [], "staff": [], "names": []}
+    for kind, path in (("units", "/units/lookup"), ("staff", "/staff/lookup")):
+        for page in range(1, 11):
+            status, _, body = await conn.request("GET", f"{path}?per_page=50&page={page}")
+            if status != 200:
+                raise HttpError(f"{path} returned {status}")
+            payload = json.loads(body)
+            ids[kind].extend(r["id"] for r in payload["results"])
+            if kind == "staff":
+                ids["names"].extend(r["text"] for r in payload["results"])
+            if not payload["has_more"]:
+                break
+    if not ids["units"] or not ids["staff"]:
+        raise HttpError("no units/staff found; seed the database first (flask seed)")
+    ids["names"] = [n for n in ids["names"] if len(n) >= 2] or ["an"]
+    return ids
+
+
+async def virtual_user(n, args, ids, deadline, stats):
+    rng = random.Random(f"{args.seed}:{n}")
+    ops = _ops(ids, args)
+    weights = [w for w, *_ in ops]
+    conn = Connection(args.url, args.timeout)
+    try:
+        await login(conn, args.email, args.password)
+        while time.monotonic() < deadline:
+            _, label, method, make = rng.choices(ops, weights)[0]
+            path, form = make(rng)
+            t0 = time.perf_counter()
+            try:
+                status, _, _ = await conn.request(method, path, form)
+                ok = status < 400
+            except (HttpError, OSError, asyncio.IncompleteReadError):
+                ok = False
+            entry = stats[label]
+            if ok:
+                entry["lat"].append(time.perf_counter() - t0)
+            else:
+                entry["errors"] += 1
+            if args.think_ms:
+                await asyncio.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+    finally:
+        await conn.close()
+
+
+async def run(args) -> dict:
+    probe = Connection(args.url, args.timeout)
+    try:
+        await login(probe, args.email, args.password)
+        ids = await discover(probe)
+    finally:
+        await probe.close()
+
+    stats = defaultdict(lambda: {"lat": [], "errors": 0})
+    deadline = time.monotonic() + args.duration
+    started = time.perf_counter()
+    users = []
+    for n in range(args.concurrency):
+        users.append(asyncio.create_task(virtual_user(n, args, ids, deadline, stats)))
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.concurrency)
+    await asyncio.gather(*users)
+    return {"stats": stats, "elapsed": time.perf_counter() - started}
+
+
+def report(result, args) -> int:
+    stats, elapsed = result["stats"], result["elapsed"]
+    total = sum(len(s["lat"]) for s in stats.values())
+    errors = sum(s["errors"] for s in stats.values())
+
+    print(f"{args.url}  concurrency {args.concurrency}  {elapsed:.1f}s")
+    print(f"{'endpoint':<28} {'count':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for label in sorted(stats):
+        lat = stats[label]["lat"]
+        print(f"{label:<28} {len(lat):>7} {len(lat) / elapsed:>8.1f} "
+              f"{percentile(lat, 50) * 1000:>7.1f}ms {percentile(lat, 95) * 1000:>7.1f}ms "
+              f"{percentile(lat, 99) * 1000:>7.1f}ms {stats[label]['errors']:>7}")
+    all_lat = [x for s in stats.values() for x in s["lat"]]
+    print(f"{'total':<28} {total:>7} {total / elapsed:>8.1f} "
+          f"{percentile(all_lat, 50) * 1000:>7.1f}ms {percentile(all_lat, 95) * 1000:>7.1f}ms "
+          f"{percentile(all_lat, 99) * 1000:>7.1f}ms {errors:>7}")
+    return 1 if errors else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", default=os.getenv("LOADTEST_PASSWORD"))
+    parser.add_argument("--concurrency", type=int, default=8, help="Virtual users (one connection each).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load.")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which to start the users.")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between a user's requests.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--read-only", action="store_true", help="Leave out assignment creates.")
+    parser.add_argument("--create-offset-days", type=int, default=3650)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    if not args.password:
+        parser.error("--password (or LOADTEST_PASSWORD) is required")
+
+    try:
+        result = asyncio.run(run(args))
+    except HttpError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    return report(result, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Route-level benchmarks with SQL statement and latency budgets.
+
+Builds a temp SQLite database from the migrations, fills it with `flask seed`
+data, then drives each hot route through the Flask test client, recording
+latency percentiles and the number of SQL statements per request. Budgets live
+in bench/budgets.json; a route over its statement count or p95 budget fails the run.
+
+    python -m bench.routes                          # check against bench/budgets.json
+    python -m bench.routes --only biweekly_by_unit --iterations 50
+    python -m bench.routes --update-budgets         # re-baseline after an intended change
+    python -m bench.routes --time-scale 2           # slower machine (CI): double the time budgets
+
+Statement budgets get ~5% slack (the seeded data is anchored to today, so the
+generate routes see a slightly different calendar each day; small routes stay
+exact); time budgets are stored with 50% headroom, scaled by --time-scale, and
+checked with a further TIME_SLACK_MS on top: a few ms of scheduler/GC jitter is
+most of a fast route's budget, and 50% of 7ms does not absorb it.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGETS_PATH = os.path.join(ROOT, "bench", "budgets.json")
+TIME_HEADROOM = 1.5
+TIME_SLACK_MS = 20
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def build_app(database_url: str):
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, ROOT)
+
+    from flask_migrate import upgrade
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, "migrations"))
+    return app
+
+
+def seed(app, args) -> dict:
+    from app.extensions import db
+    from app.models import Admin, Request as StaffRequest, Staff, Unit
+    from app.seed import seed_database
+
+    with app.app_context():
+        seed_database(
+            n_units=args.units,
+            n_staff=args.staff,
+            years=args.years,
+            future_days=28,
+            seed=args.seed,
+            end_date=date.today(),
+        )
+        admin = Admin(full_name="Bench Admin", email="bench@example.test")
+        admin.set_password("bench")
+        db.session.add(admin)
+        db.session.commit()
+        return {
+            "admin_id": admin.id,
+            "unit_ids": [u for (u,) in db.session.query(Unit.id)],
+            "staff_ids": [s for (s,) in db.session.query(Staff.id)],
+            "request_ids": [r for (r,) in db.session.query(StaffRequest.id)],
+        }
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+# ------------------
+# Scenarios: name -> (method, fn(rng, ids, i) -> (path, form data or None))
+# ------------------
+def _biweek_date(rng):
+    return (date.today() + timedelta(days=rng.randrange(-56, 28))).isoformat()
+
+
+def _create_assignment(rng, ids, i):
+    # a fresh far-future day per iteration, so every POST takes the insert path
+    d = date.today() + timedelta(days=400 + i)
+    return "/assignments/new", {
+        "staff_id": rng.choice(ids["staff_ids"]),
+        "unit_id": rng.choice(ids["unit_ids"]),
+        "date": d.isoformat(),
+        "start_time": "07:00",
+        "end_time": "15:00",
+        "status": "Scheduled",
+    }
+
+
+SCENARIOS = {
+    "biweekly_by_unit": ("GET", lambda rng, ids, i: (
+        f"/schedule/unit/{rng.choice(ids['unit_ids'])}?date={_biweek_date(rng)}", None)),
+    "biweekly_by_staff": ("GET", lambda rng, ids, i: (
+        f"/schedule/staff/{rng.choice(ids['staff_ids'])}?date={_biweek_date(rng)}", None)),
+    "list_assignments": ("GET", lambda rng, ids, i: (
+        f"/assignments/?unit_id={rng.choice(ids['unit_ids'])}"
+        f"&from={date.today().isoformat()}&to={(date.today() + timedelta(days=13)).isoformat()}", None)),
+    "list_requests": ("GET", lambda rng, ids, i: (
+        f"/requests/?unit_id={rng.choice(ids['unit_ids'])}&status=Open", None)),
+    "request_detail": ("GET", lambda rng, ids, i: (
+        f"/requests/{rng.choice(ids['request_ids'])}", None)),
+    "generate_recurring_assignments": ("POST", lambda rng, ids, i: (
+        "/recurring-assignments/generate", {"horizon_days": 28})),
+    "generate_recurring_requests": ("POST", lambda rng, ids, i: (
+        "/recurring-requests/generate", {"horizon_days": 28})),
+    "create_assignment": ("POST", _create_assignment),
+}
+
+# ~1s per call; after the first (warmup) call they measure the "everything exists" path
+HEAVY = {"generate_recurring_assignments", "generate_recurring_requests"}
+
+
+def run_scenario(app, client, counter, ids, name, iterations, warmup, seed_value) -> dict:
+    method, make = SCENARIOS[name]
+    rng = random.Random(f"{seed_value}:{name}")
+    latencies, statements = [], []
+
+    for i in range(warmup + iterations):
+        path, data = make(rng, ids, i)
+        counter.count = 0
+        t0 = time.perf_counter()
+        resp = client.post(path, data=data) if method == "POST" else client.get(path)
+        elapsed = time.perf_counter() - t0
+        if resp.status_code >= 400:
+            raise RuntimeError(f"{name}: {method} {path} -> {resp.status_code}")
+        if i >= warmup:
+            latencies.append(elapsed)
+            statements.append(counter.count)
+
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "statements": max(statements),
+    }
+
+
+def load_budgets() -> dict:
+    try:
+        with open(BUDGETS_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_budgets(results: dict, budgets: dict) -> None:
+    for name, r in results.items():
+        budgets[name] = {
+            "statements": r["statements"] + r["statements"] // 20,
+            "p95_ms": math.ceil(r["p95_ms"] * TIME_HEADROOM),
+        }
+    with open(BUDGETS_PATH, "w") as f:
+        json.dump(dict(sorted(budgets.items())), f, indent=2)
+        f.write("\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", choices=sorted(SCENARIOS), help="Run just these routes.")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--heavy-iterations", type=int, default=5, help="Iterations for the generate routes.")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--units", type=int, default=12)
+    parser.add_argument("--staff", type=int, default=200)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiply time budgets by this.")
+    parser.add_argument("--update-budgets", action="store_true", help="Write measured values as the new budgets.")
+    args = parser.parse_args(argv)
+
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="bench-routes-")
+    os.close(fd)
+    app = build_app(f"sqlite:///{path}")
+    ids = seed(app, args)
+
+    from app.extensions import db
+
+    with app.app_context():
+        counter = StatementCounter(db.engine)
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(ids["admin_id"])
+        sess["_fresh"] = True
+
+    results = {}
+    for name in args.only or list(SCENARIOS):
+        iterations = args.heavy_iterations if name in HEAVY else args.iterations
+        results[name] = run_scenario(app, client, counter, ids, name, iterations, args.warmup, args.seed)
+
+    budgets = load_budgets()
+    if args.update_budgets:
+        save_budgets(results, budgets)
+        print(f"budgets written to {BUDGETS_PATH}")
+
+    failures = []
+    print(f"{'route':<32} {'p50':>8} {'p95':>8} {'p99':>8} {'sql':>5}   budget (sql / p95)")
+    for name, r in results.items():
+        budget = budgets.get(name)
+        line = (f"{name:<32} {r['p50_ms']:7.1f}ms {r['p95_ms']:7.1f}ms {r['p99_ms']:7.1f}ms "
+                f"{r['statements']:>5}")
+        if budget is None:
+            line += "   (no budget)"
+        else:
+            time_budget = budget["p95_ms"] * args.time_scale + TIME_SLACK_MS
+            line += f"   {budget['statements']} / {time_budget:.0f}ms"
+            if r["statements"] > budget["statements"]:
+                failures.append(f"{name}: {r['statements']} statements > budget {budget['statements']}")
+            if r["p95_ms"] > time_budget:
+                failures.append(f"{name}: p95 {r['p95_ms']:.1f}ms > budget {time_budget:.0f}ms")
+        print(line)
+
+    os.remove(path)
+    if failures:
+        print("\nFAIL")
+        for f in failures:
+            print(f"  {f}")
+        return 1
+    print("\nOK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
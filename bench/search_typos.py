@@ -0,0 +1,83 @@
+"""
+Typo-tolerance check for the staff/unit name search.
+
+Builds a temp SQLite database from the migrations (so the FTS5 backend is in
+play), adds a handful of known names among seeded filler, and runs each query
+in CASES through app.search.search_ids and the /staff/ list page. The run fails
+if an expected name is missing from a query's results.
+
+    python -m bench.search_typos
+"""
+import os
+import sys
+import tempfile
+
+from bench.routes import build_app
+
+# query -> names it must find
+CASES = {
+    "john smith": ["John Smith"],
+    "jhon": ["John Smith"],          # adjacent swap
+    "jnae": ["Jane Doherty"],        # adjacent swap
+    "smth": ["John Smith"],          # dropped letter, no trigram in common
+    "jhon smth": ["John Smith"],     # both in one query
+    "doherty": ["Jane Doherty"],
+    "dohrety": ["Jane Doherty"],
+    "dorherty": ["Jane Doherty"],    # extra letter
+    "lopze": ["Maria Lopez"],
+    "mraia": ["Maria Lopez"],
+    "op": ["Maria Lopez"],           # too short for trigrams: substring
+}
+NAMES = ["John Smith", "Jane Doherty", "Maria Lopez", "Johanna Smythe", "Bob Jones"]
+
+
+def main() -> int:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    app = build_app(f"sqlite:///{path}")
+
+    from sqlalchemy import insert
+
+    from app.extensions import db
+    from app.models import Admin, Staff
+    from app.search import _backend, search_ids
+
+    failures = []
+    with app.app_context():
+        db.session.execute(insert(Staff), [
+            {"full_name": f"Filler Person {i}", "gender": "Other"} for i in range(300)
+        ] + [{"full_name": name, "gender": "Other"} for name in NAMES])
+        admin = Admin(full_name="Bench Admin", email="bench@example.test")
+        admin.set_password("bench")
+        db.session.add(admin)
+        db.session.commit()
+        print(f"backend: {_backend()}")
+
+        names = dict(db.session.query(Staff.id, Staff.full_name))
+        for q, expected in CASES.items():
+            found = [names[rid] for rid in search_ids(Staff, q)]
+            missing = [n for n in expected if n not in found]
+            print(f"{q:<12} -> {', '.join(found[:4]) or '(nothing)'}")
+            if missing:
+                failures.append(f"{q!r}: missing {', '.join(missing)}")
+
+    client = app.test_client()
+    client.post("/auth/login", data={"email": "bench@example.test", "password": "bench"})
+    for q, expected in CASES.items():
+        page = client.get("/staff/", query_string={"q": q}).get_data(as_text=True)
+        missing = [n for n in expected if n not in page]
+        if missing:
+            failures.append(f"/staff/?q={q}: missing {', '.join(missing)}")
+
+    os.remove(path)
+    if failures:
+        print("\nFAIL")
+        for f in failures:
+            print(f"  {f}")
+        return 1
+    print("\nOK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Cold-start benchmark for the app factory, with a time budget.
+
+Starts a fresh interpreter per run (nothing cached in sys.modules), imports
+`app` and calls create_app(), and reports import / factory / total times. The
+"app_startup" entry in bench/budgets.json holds the p95 budget for the total;
+the run also fails if create_app() loads any of app.startup.HEAVY_MODULES
+(alembic, weasyprint, playwright, ...), which must stay lazy.
+
+    python -m bench.startup                     # check against bench/budgets.json
+    python -m bench.startup --runs 20
+    python -m bench.startup --update-budgets    # re-baseline after an intended change
+    python -m bench.startup --time-scale 2      # slower machine (CI): double the time budget
+
+Run `flask startup-profile` to see which imports a regression comes from.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGETS_PATH = os.path.join(ROOT, "bench", "budgets.json")
+BUDGET_KEY = "app_startup"
+TIME_HEADROOM = 1.5
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def load_budgets() -> dict:
+    try:
+        with open(BUDGETS_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiply the time budget by this.")
+    parser.add_argument("--update-budgets", action="store_true", help="Write the measured p95 as the new budget.")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    from app.startup import measure_startup
+
+    # create_app() opens no connection, but never point it at a real database
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="bench-startup-")
+    os.close(fd)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.pop("DATABASE_REPLICA_URL", None)
+
+    measure_startup()  # warm the OS file cache; the interpreter itself starts cold every run
+    runs = [measure_startup() for _ in range(args.runs)]
+    os.remove(path)
+
+    print(f"{'':<10} {'p50':>9} {'p95':>9} {'max':>9}")
+    for key in ("import_ms", "factory_ms", "total_ms"):
+        values = [r[key] for r in runs]
+        print(f"{key[:-3]:<10} {percentile(values, 50):7.1f}ms {percentile(values, 95):7.1f}ms {max(values):7.1f}ms")
+
+    p95 = percentile([r["total_ms"] for r in runs], 95)
+    budgets = load_budgets()
+    if args.update_budgets:
+        budgets[BUDGET_KEY] = {"p95_ms": math.ceil(p95 * TIME_HEADROOM)}
+        with open(BUDGETS_PATH, "w") as f:
+            json.dump(dict(sorted(budgets.items())), f, indent=2)
+            f.write("\n")
+        print(f"budget written to {BUDGETS_PATH}")
+
+    failures = []
+    budget = budgets.get(BUDGET_KEY)
+    if budget is None:
+        print("\n(no budget)")
+    else:
+        time_budget = budget["p95_ms"] * args.time_scale
+        print(f"\nbudget: total p95 {time_budget:.0f}ms")
+        if p95 > time_budget:
+            failures.append(f"total p95 {p95:.1f}ms > budget {time_budget:.0f}ms")
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+    if heavy:
+        failures.append(f"heavy modules loaded by create_app(): {', '.join(heavy)}")
+
+    if failures:
+        print("\nFAIL")
+        for f in failures:
+            print(f"  {f}")
+        return 1
+    print("\nOK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Multi-threaded double-booking stress run.
+
+Hammers POST /assignments/new from many threads with deliberately colliding
+shifts for a handful of staff, then proves with one self-join that no staff
+ended up with two overlapping non-canceled assignments.
+
+    python -m bench.stress_booking                      # temp SQLite file
+    python -m bench.stress_booking --database-url postgresql://...  # throwaway DB!
+
+Exits non-zero if any overlap (or unexpected error) is found.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OVERLAP_SQL = """
+SELECT COUNT(*) FROM assignments a
+JOIN assignments b
+  ON a.staff_id = b.staff_id AND a.id < b.id
+WHERE a.status <> 0 AND b.status <> 0  -- 0 = Canceled
+  AND a.start_datetime < b.end_datetime
+  AND b.start_datetime < a.end_datetime
+"""
+
+
+def build_app(database_url: str):
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, ROOT)
+
+    from flask_migrate import upgrade
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, "migrations"))
+    return app
+
+
+def seed(app, n_staff: int) -> tuple[int, int, list[int]]:
+    from app.extensions import db
+    from app.models import Admin, Staff, Unit
+
+    with app.app_context():
+        admin = Admin(full_name="Stress Admin", email=f"stress-{time.time_ns()}@example.test")
+        admin.set_password("stress")
+        unit = Unit(unit_name="Stress Unit")
+        staff = [Staff(full_name=f"Stress Staff {i}", gender="Other") for i in range(n_staff)]
+        db.session.add_all([admin, unit, *staff])
+        db.session.commit()
+        return admin.id, unit.id, [s.id for s in staff]
+
+
+def worker(app, admin_id, unit_id, staff_ids, n_posts, seed_value, results, lock):
+    rng = random.Random(seed_value)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(admin_id)
+        sess["_fresh"] = True
+
+    base = date.today() + timedelta(days=30)
+    local = Counter()
+    for _ in range(n_posts):
+        d = base + timedelta(days=rng.randrange(3))
+        start_h = rng.randrange(0, 20)
+        end_h = min(start_h + rng.randrange(2, 9), 23)
+        resp = client.post(
+            "/assignments/new",
+            data={
+                "staff_id": rng.choice(staff_ids),
+                "unit_id": unit_id,
+                "date": d.isoformat(),
+                "start_time": f"{start_h:02d}:00",
+                "end_time": f"{end_h:02d}:30",
+                "status": "Scheduled",
+            },
+        )
+        if resp.status_code != 302:
+            local["error"] += 1
+        elif resp.headers.get("Location", "").rstrip("/").endswith("/assignments"):
+            local["created"] += 1
+        else:
+            local["rejected"] += 1
+
+    with lock:
+        results.update(local)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to run against (default: fresh temp SQLite file).")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--posts", type=int, default=60, help="POSTs per thread.")
+    parser.add_argument("--staff", type=int, default=3, help="Few staff => many collisions.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url
+    if not database_url:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="stress-booking-")
+        os.close(fd)
+        database_url = f"sqlite:///{path}"
+
+    app = build_app(database_url)
+    admin_id, unit_id, staff_ids = seed(app, args.staff)
+
+    results = Counter()
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(app, admin_id, unit_id, staff_ids, args.posts, args.seed + i, results, lock),
+        )
+        for i in range(args.threads)
+    ]
+
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    from sqlalchemy import text
+    from app.extensions import db
+
+    with app.app_context():
+        overlaps = db.session.execute(text(OVERLAP_SQL)).scalar()
+
+    total = args.threads * args.posts
+    print(f"database:  {database_url}")
+    print(f"posts:     {total} in {elapsed:.2f}s ({total / elapsed:.0f}/s) from {args.threads} threads")
+    print(f"created:   {results['created']}")
+    print(f"rejected:  {results['rejected']} (overlap)")
+    print(f"errors:    {results['error']}")
+    print(f"overlaps:  {overlaps}")
+
+    if overlaps or results["error"]:
+        print("FAIL")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Gunicorn settings for production: `gunicorn wsgi:app` from the repo root picks
+this file up automatically.
+
+- preload_app: wsgi.py builds and warms the app once in the master; workers
+  fork from it and share that memory copy-on-write (gc.freeze() keeps the
+  collector from touching, and so copying, the inherited objects).
+- post_fork drops every pooled DB connection a worker inherited.
+- gthread workers: an open schedule page holds a thread while its live-update
+  stream is connected (25 s at a time, app/live.py). At most half of each
+  worker's threads go to streams (LIVE_MAX_STREAMS); the rest always serve
+  ordinary requests, and pages over the cap retry their stream later.
+
+    PORT                    # 8000; App Service sets it
+    GUNICORN_WORKERS        # default: CPU count, at least 2
+    GUNICORN_THREADS        # default: 8 per worker
+    GUNICORN_TIMEOUT        # default: 60 s
+    GUNICORN_MAX_REQUESTS   # recycle workers after N requests (default 0: never)
+    PROMETHEUS_MULTIPROC_DIR  # emptied here at startup; see app/metrics.py
+    WARMUP=0                # skip the warmup (see app/warmup.py)
+"""
+import gc
+import os
+import shutil
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+bind = f"0.0.0.0:{_env_int('PORT', 8000)}"
+workers = _env_int("GUNICORN_WORKERS", max(2, os.cpu_count() or 1))
+threads = _env_int("GUNICORN_THREADS", 8)
+worker_class = "gthread"
+timeout = _env_int("GUNICORN_TIMEOUT", 60)
+graceful_timeout = 30
+keepalive = 5
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 0)
+max_requests_jitter = max_requests // 10
+preload_app = True
+accesslog = "-"
+errorlog = "-"
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# live updates must reach pages served by other workers
+if workers > 1:
+    os.environ.setdefault("LIVE_UPDATES_RELAY", "sqlite")
+# ...and must not take every thread: half of them stay free for page requests
+os.environ.setdefault("LIVE_MAX_STREAMS", str(max(1, threads // 2)))
+
+# Empty the Prometheus multiprocess directory before the app (and prometheus_client)
+# is loaded: this module runs before preload, on_starting only after it. Only once per
+# master, not again when a HUP reload re-reads this file under live workers.
+_metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if _metrics_dir and os.environ.get("_METRICS_DIR_RESET_BY") != str(os.getpid()):
+    shutil.rmtree(_metrics_dir, ignore_errors=True)
+    os.makedirs(_metrics_dir, exist_ok=True)
+    os.environ["_METRICS_DIR_RESET_BY"] = str(os.getpid())
+
+
+def when_ready(server):
+    # after preload and warmup, before the first fork
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    from app.extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)  # the master's connections are not ours to close
+
+
+def child_exit(server, worker):
+    if _metrics_dir:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
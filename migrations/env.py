@@ -1,4 +1,5 @@
 import logging
+import re
 from logging.config import fileConfig
 
 from flask import current_app
@@ -90,9 +91,18 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # FTS5 search tables (and their shadow tables) are managed by hand in
+    # migrations, not by the models; keep autogenerate from dropping them
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == "table" and re.search(r"_fts(_\w+)?$", name or ""):
+            return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
@@ -0,0 +1,48 @@
+"""request filled_count + status index
+
+Revision ID: 5d2f8e4a91b7
+Revises: 3a1c2b2eb9cd
+Create Date: 2026-01-12 10:04:11.231845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f8e4a91b7'
+down_revision = '3a1c2b2eb9cd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('filled_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_requests_status'), ['status'], unique=False)
+
+    # backfill counters and statuses from existing assignments
+    op.execute(
+        """
+        UPDATE requests SET filled_count = (
+            SELECT COUNT(*) FROM assignments
+            WHERE assignments.request_id = requests.id
+              AND assignments.status != 'Canceled'
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE requests SET status = CASE
+            WHEN filled_count >= staff_needed THEN 'Satisfied'
+            ELSE 'Open'
+        END
+        WHERE status != 'Canceled'
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_requests_status'))
+        batch_op.drop_column('filled_count')
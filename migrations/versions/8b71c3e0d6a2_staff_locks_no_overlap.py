@@ -0,0 +1,47 @@
+"""staff booking locks + postgres no-overlap exclusion constraint
+
+Revision ID: 8b71c3e0d6a2
+Revises: 5d2f8e4a91b7
+Create Date: 2026-01-19 14:22:47.118503
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b71c3e0d6a2'
+down_revision = '5d2f8e4a91b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('staff_locks',
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('staff_id')
+    )
+
+    # Postgres only: the database itself refuses overlapping non-canceled shifts
+    # for the same staff. Columns are naive timestamps, hence tsrange.
+    # Existing overlaps must be resolved before this can be applied.
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        op.execute(
+            """
+            ALTER TABLE assignments
+            ADD CONSTRAINT ex_assignments_staff_no_overlap
+            EXCLUDE USING gist (
+                staff_id WITH =,
+                tsrange(start_datetime, end_datetime, '[)') WITH &&
+            )
+            WHERE (status <> 'Canceled')
+            """
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE assignments DROP CONSTRAINT IF EXISTS ex_assignments_staff_no_overlap')
+    op.drop_table('staff_locks')
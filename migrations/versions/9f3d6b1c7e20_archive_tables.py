@@ -0,0 +1,88 @@
+"""archive tables for past assignments/requests
+
+Revision ID: 9f3d6b1c7e20
+Revises: e17b5c9d2a48
+Create Date: 2026-02-16 09:41:05.226318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f3d6b1c7e20'
+down_revision = 'e17b5c9d2a48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('archive_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cutoff', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('requests_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('unit_id', sa.Integer(), nullable=False),
+    sa.Column('coordinator_name', sa.String(length=140), nullable=False),
+    sa.Column('staff_needed', sa.Integer(), nullable=False),
+    sa.Column('start_datetime', sa.DateTime(), nullable=False),
+    sa.Column('end_datetime', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.SmallInteger(), nullable=False),
+    sa.Column('filled_count', sa.Integer(), nullable=False),
+    sa.Column('created_by_admin_id', sa.Integer(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('recurring_id', sa.Integer(), nullable=True),
+    sa.Column('occurrence_date', sa.Date(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_admin_id'], ['admins.id'], ),
+    sa.ForeignKeyConstraint(['unit_id'], ['units.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('requests_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_requests_archive_unit_start', ['unit_id', 'start_datetime'], unique=False)
+        batch_op.create_index('ix_requests_archive_start', ['start_datetime'], unique=False)
+
+    op.create_table('assignments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('unit_id', sa.Integer(), nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=True),
+    sa.Column('start_datetime', sa.DateTime(), nullable=False),
+    sa.Column('end_datetime', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.SmallInteger(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_by_admin_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('recurring_id', sa.Integer(), nullable=True),
+    sa.Column('occurrence_date', sa.Date(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_admin_id'], ['admins.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.ForeignKeyConstraint(['unit_id'], ['units.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('assignments_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_assignments_archive_staff_start', ['staff_id', 'start_datetime'], unique=False)
+        batch_op.create_index('ix_assignments_archive_unit_start', ['unit_id', 'start_datetime'], unique=False)
+        batch_op.create_index('ix_assignments_archive_start', ['start_datetime'], unique=False)
+        batch_op.create_index('ix_assignments_archive_request', ['request_id'], unique=False)
+
+
+def downgrade():
+    # NOTE: drops any rows still in the archive
+    with op.batch_alter_table('assignments_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_assignments_archive_request')
+        batch_op.drop_index('ix_assignments_archive_start')
+        batch_op.drop_index('ix_assignments_archive_unit_start')
+        batch_op.drop_index('ix_assignments_archive_staff_start')
+    op.drop_table('assignments_archive')
+
+    with op.batch_alter_table('requests_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_requests_archive_start')
+        batch_op.drop_index('ix_requests_archive_unit_start')
+    op.drop_table('requests_archive')
+    op.drop_table('archive_state')
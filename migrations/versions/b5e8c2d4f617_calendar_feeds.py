@@ -0,0 +1,38 @@
+"""calendar feed tokens and change versions
+
+Revision ID: b5e8c2d4f617
+Revises: 9f3d6b1c7e20
+Create Date: 2026-02-23 10:12:48.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e8c2d4f617'
+down_revision = '9f3d6b1c7e20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('calendar_feeds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kind', 'entity_id', name='uq_calendar_feeds_entity')
+    )
+    with op.batch_alter_table('calendar_feeds', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_calendar_feeds_token'), ['token'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('calendar_feeds', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_calendar_feeds_token'))
+    op.drop_table('calendar_feeds')
@@ -0,0 +1,113 @@
+"""smallint status codes + partial indexes on live rows
+
+Revision ID: c4e9a7f2b350
+Revises: 8b71c3e0d6a2
+Create Date: 2026-01-26 09:41:05.507219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e9a7f2b350'
+down_revision = '8b71c3e0d6a2'
+branch_labels = None
+depends_on = None
+
+# label -> code; Canceled is 0 in both tables (see app.models)
+ASSIGNMENT_CODES = {'Canceled': 0, 'Scheduled': 1, 'Confirmed': 2}
+REQUEST_CODES = {'Canceled': 0, 'Open': 1, 'Satisfied': 2}
+
+NOT_CANCELED = sa.text('status <> 0')
+REQUEST_OPEN = sa.text('status = 1')
+
+EXCLUSION_SQL = """
+    ALTER TABLE assignments
+    ADD CONSTRAINT ex_assignments_staff_no_overlap
+    EXCLUDE USING gist (
+        staff_id WITH =,
+        tsrange(start_datetime, end_datetime, '[)') WITH &&
+    )
+    WHERE ({predicate})
+"""
+
+
+def _labels_to_codes(table, codes, default):
+    whens = ' '.join(f"WHEN '{label}' THEN '{code}'" for label, code in codes.items())
+    op.execute(f"UPDATE {table} SET status = CASE status {whens} ELSE '{default}' END")
+
+
+def _codes_to_labels(table, codes):
+    whens = ' '.join(f"WHEN '{code}' THEN '{label}'" for label, code in codes.items())
+    op.execute(f"UPDATE {table} SET status = CASE status {whens} END")
+
+
+def upgrade():
+    is_pg = op.get_bind().dialect.name == 'postgresql'
+    if is_pg:
+        op.execute('ALTER TABLE assignments DROP CONSTRAINT IF EXISTS ex_assignments_staff_no_overlap')
+
+    # rewrite labels as numeric text first, so the type change is a plain cast
+    _labels_to_codes('assignments', ASSIGNMENT_CODES, ASSIGNMENT_CODES['Scheduled'])
+    _labels_to_codes('requests', REQUEST_CODES, REQUEST_CODES['Open'])
+
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_requests_status')
+        batch_op.alter_column('status',
+               existing_type=sa.String(length=20),
+               type_=sa.SmallInteger(),
+               existing_nullable=False,
+               postgresql_using='status::smallint')
+        batch_op.create_index(batch_op.f('ix_requests_status'), ['status'], unique=False)
+        batch_op.create_index('ix_requests_open_start', ['start_datetime'], unique=False,
+                              sqlite_where=REQUEST_OPEN, postgresql_where=REQUEST_OPEN)
+
+    with op.batch_alter_table('assignments', schema=None) as batch_op:
+        batch_op.alter_column('status',
+               existing_type=sa.String(length=20),
+               type_=sa.SmallInteger(),
+               existing_nullable=False,
+               postgresql_using='status::smallint')
+        batch_op.create_index('ix_assignments_staff_active', ['staff_id', 'start_datetime', 'end_datetime'],
+                              unique=False, sqlite_where=NOT_CANCELED, postgresql_where=NOT_CANCELED)
+        batch_op.create_index('ix_assignments_unit_active', ['unit_id', 'start_datetime', 'end_datetime'],
+                              unique=False, sqlite_where=NOT_CANCELED, postgresql_where=NOT_CANCELED)
+        batch_op.create_index('ix_assignments_start_active', ['start_datetime'],
+                              unique=False, sqlite_where=NOT_CANCELED, postgresql_where=NOT_CANCELED)
+        batch_op.create_index('ix_assignments_request_active', ['request_id'],
+                              unique=False, sqlite_where=NOT_CANCELED, postgresql_where=NOT_CANCELED)
+
+    if is_pg:
+        op.execute(EXCLUSION_SQL.format(predicate='status <> 0'))
+
+
+def downgrade():
+    is_pg = op.get_bind().dialect.name == 'postgresql'
+    if is_pg:
+        op.execute('ALTER TABLE assignments DROP CONSTRAINT IF EXISTS ex_assignments_staff_no_overlap')
+
+    with op.batch_alter_table('assignments', schema=None) as batch_op:
+        batch_op.drop_index('ix_assignments_request_active')
+        batch_op.drop_index('ix_assignments_start_active')
+        batch_op.drop_index('ix_assignments_unit_active')
+        batch_op.drop_index('ix_assignments_staff_active')
+        batch_op.alter_column('status',
+               existing_type=sa.SmallInteger(),
+               type_=sa.String(length=20),
+               existing_nullable=False)
+
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_requests_open_start')
+        batch_op.drop_index(batch_op.f('ix_requests_status'))
+        batch_op.alter_column('status',
+               existing_type=sa.SmallInteger(),
+               type_=sa.String(length=20),
+               existing_nullable=False)
+        batch_op.create_index(batch_op.f('ix_requests_status'), ['status'], unique=False)
+
+    _codes_to_labels('assignments', ASSIGNMENT_CODES)
+    _codes_to_labels('requests', REQUEST_CODES)
+
+    if is_pg:
+        op.execute(EXCLUSION_SQL.format(predicate="status <> 'Canceled'"))
@@ -0,0 +1,42 @@
+"""published bi-week periods and their schedule snapshots
+
+Revision ID: d2a6f0b8c391
+Revises: b5e8c2d4f617
+Create Date: 2026-03-09 16:40:12.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6f0b8c391'
+down_revision = 'b5e8c2d4f617'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('published_periods',
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('published_by_admin_id', sa.Integer(), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['published_by_admin_id'], ['admins.id'], ),
+    sa.PrimaryKeyConstraint('start_date')
+    )
+    op.create_table('period_snapshots',
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=140), nullable=False),
+    sa.Column('total_seconds', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['period_start'], ['published_periods.start_date'], ),
+    sa.PrimaryKeyConstraint('period_start', 'kind', 'entity_id')
+    )
+
+
+def downgrade():
+    op.drop_table('period_snapshots')
+    op.drop_table('published_periods')
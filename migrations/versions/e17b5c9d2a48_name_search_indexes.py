@@ -0,0 +1,73 @@
+"""name search: sqlite fts5 trigram tables / postgres pg_trgm indexes
+
+Revision ID: e17b5c9d2a48
+Revises: c4e9a7f2b350
+Create Date: 2026-02-02 11:15:32.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e17b5c9d2a48'
+down_revision = 'c4e9a7f2b350'
+branch_labels = None
+depends_on = None
+
+# (content table, name column, fts table)
+SEARCHABLE = [
+    ('staff', 'full_name', 'staff_fts'),
+    ('units', 'unit_name', 'units_fts'),
+]
+
+
+def _sqlite_upgrade():
+    # NOTE: a later batch_alter_table on staff/units recreates the table and drops
+    # these triggers; such a migration must re-run this function.
+    for table, column, fts in SEARCHABLE:
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{column}, content='{table}', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _sqlite_downgrade():
+    for table, column, fts in SEARCHABLE:
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _sqlite_upgrade()
+    elif dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column, _ in SEARCHABLE:
+            op.create_index(f'ix_{table}_{column}_trgm', table, [column], unique=False,
+                            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _sqlite_downgrade()
+    elif dialect == 'postgresql':
+        for table, column, _ in SEARCHABLE:
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
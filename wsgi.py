@@ -0,0 +1,28 @@
+"""
+Production WSGI entry point: `gunicorn wsgi:app` (settings in gunicorn.conf.py).
+
+Builds the app and warms it (app/warmup.py) at import time, so with
+preload_app the warm state is built once in the gunicorn master and shared by
+every worker. run.py remains the development server.
+"""
+import logging
+
+from app import create_app
+from app.config import env_bool
+
+app = create_app()
+
+if env_bool("WARMUP", True):
+    from app.warmup import warm_up
+
+    _log = logging.getLogger("gunicorn.error")
+    try:
+        _done = warm_up(app)
+    except Exception:  # a cold app still serves; e.g. `flask db upgrade` hasn't run yet
+        _log.exception("warmup failed; starting cold")
+    else:
+        _log.info(
+            "warmup: %d templates, %d pages in %d ms%s",
+            _done["templates"], _done["pages"], _done["ms"],
+            f"; failed: {', '.join(_done['failed'])}" if _done["failed"] else "",
+        )